@@ -0,0 +1,67 @@
+import json
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict
+
+def request_key(data: Any) -> str:
+    """
+    Content hash of a request, ignoring key order, case and extra whitespace
+    in string values
+    """
+    def normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.lower().split())
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        return value
+
+    payload = json.dumps(normalize(data), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class AsyncSingleFlight:
+    """
+    Coalesces concurrent coroutines that share a key into one asyncio task.
+
+    The first caller starts the task and later callers with the same key
+    await it too, so they all receive its result or exception. Each caller
+    waits through asyncio.shield, so cancelling one caller only detaches it;
+    the shared task is cancelled once its last caller has gone. Finished
+    tasks are forgotten, so failures are never cached.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+    async def do(self, key: str, factory: Callable[[], Awaitable]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.calls += 1
+        else:
+            self.shared += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters[key] == 1:
+                # Last caller left; stop the work and let the next caller start afresh
+                self._forget(key, task)
+                task.cancel()
+            raise
+        finally:
+            if key in self._waiters and self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            del self._waiters[key]
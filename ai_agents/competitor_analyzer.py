@@ -1,13 +1,17 @@
 from crewai import Agent
-from serper_dev import SerperDev
-from firecrawl import Firecrawl
+from tools import VERBOSE, ToolRegistry, ask, get_registry
+from knowledge_base import IndustryKnowledgeBase, industry_context, load_research
 from typing import Dict, List
 from datetime import datetime
 
 class CompetitorAnalyzer:
-    def __init__(self):
-        self.serper = SerperDev()
-        self.firecrawl = Firecrawl()
+    # Knowledge base entry holding this analyzer's industry-wide research
+    KNOWLEDGE_KIND = "competitors"
+
+    def __init__(self, tools: ToolRegistry = None, knowledge: IndustryKnowledgeBase = None):
+        self.tools = tools or get_registry()
+        # Industry research shared across startups; None researches inline on every run
+        self.knowledge = knowledge
         
     def create_agent(self) -> Agent:
         return Agent(
@@ -16,26 +20,42 @@ class CompetitorAnalyzer:
             backstory="""You are a competitive intelligence expert who excels at 
             analyzing market competition, identifying key players, and evaluating 
             competitive advantages and threats.""",
-            tools=[self.serper.search, self.firecrawl.scrape],
-            verbose=True
+            tools=self.tools.agent_tools(),
+            verbose=VERBOSE
         )
     
-    async def analyze_competitors(self, startup_data: Dict) -> Dict:
-        agent = self.create_agent()
+    async def research_industry(self, industry: str, agent: Agent = None) -> Dict:
+        """
+        The industry's main competitors, the same for every startup in the industry
+        """
+        agent = agent or self.create_agent()
         
         # Search for competitors
-        competitors = await agent.execute(
-            f"Search for main competitors and market players in {startup_data['industry']} industry"
+        competitors = await ask(
+            agent,
+            f"Search for main competitors and market players in {industry} industry"
         )
         
         # Scrape competitor details
-        competitor_details = await agent.execute(
-            f"Scrape detailed information about top competitors in {startup_data['industry']}"
+        competitor_details = await ask(
+            agent,
+            f"Scrape detailed information about top competitors in {industry}"
         )
+
+        return {"competitor_list": competitors, "competitor_details": competitor_details}
+    
+    async def analyze_competitors(self, startup_data: Dict) -> Dict:
+        agent = self.create_agent()
+        industry = startup_data["industry"]
+        research = await load_research(self.knowledge, self.KNOWLEDGE_KIND, industry,
+                                       lambda: self.research_industry(industry, agent))
         
         # Generate competitive analysis
-        analysis = await agent.execute(
-            f"""Based on the competitor data, provide:
+        analysis = await ask(
+            agent,
+            f"""{industry_context(industry, research)}
+
+            Based on the competitor data, provide:
             1. Key competitors and their market share
             2. Competitive advantages and disadvantages
             3. Market positioning analysis
@@ -47,7 +67,7 @@ class CompetitorAnalyzer:
         return {
             "timestamp": datetime.now().isoformat(),
             "startup_name": startup_data["name"],
-            "competitor_list": competitors,
-            "competitor_details": competitor_details,
+            **research["value"],
+            "research_updated": datetime.fromtimestamp(research["updatedAt"]).isoformat(),
             "analysis_summary": analysis
         } 
\ No newline at end of file
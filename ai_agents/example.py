@@ -2,8 +2,8 @@ import asyncio
 from orchestrator import StartupAnalysisOrchestrator
 
 async def main():
-    # Initialize the orchestrator
-    orchestrator = StartupAnalysisOrchestrator()
+    # Initialize the orchestrator, refreshing industry research in the background
+    orchestrator = StartupAnalysisOrchestrator().start()
     
     # Example startup data
     startup_data = {
@@ -13,7 +13,10 @@ async def main():
     }
     
     # Run the analysis
-    results = await orchestrator.analyze_startup(startup_data)
+    try:
+        results = await orchestrator.analyze_startup(startup_data)
+    finally:
+        orchestrator.stop()
     
     # Print results
     print("\nStartup Analysis Results:")
@@ -1,13 +1,17 @@
 from crewai import Agent
-from serper_dev import SerperDev
-from firecrawl import Firecrawl
+from tools import VERBOSE, ToolRegistry, ask, get_registry
+from knowledge_base import IndustryKnowledgeBase, industry_context, load_research
 from typing import Dict, List
 from datetime import datetime
 
 class FinancialAnalyzer:
-    def __init__(self):
-        self.serper = SerperDev()
-        self.firecrawl = Firecrawl()
+    # Knowledge base entry holding this analyzer's industry-wide research
+    KNOWLEDGE_KIND = "benchmarks"
+
+    def __init__(self, tools: ToolRegistry = None, knowledge: IndustryKnowledgeBase = None):
+        self.tools = tools or get_registry()
+        # Industry research shared across startups; None researches inline on every run
+        self.knowledge = knowledge
         
     def create_agent(self) -> Agent:
         return Agent(
@@ -16,26 +20,42 @@ class FinancialAnalyzer:
             backstory="""You are an experienced financial analyst specializing in 
             startup valuation and financial health assessment. You have expertise in 
             analyzing financial metrics and identifying key performance indicators.""",
-            tools=[self.serper.search, self.firecrawl.scrape],
-            verbose=True
+            tools=self.tools.agent_tools(),
+            verbose=VERBOSE
         )
     
-    async def analyze_financials(self, startup_data: Dict) -> Dict:
-        agent = self.create_agent()
+    async def research_industry(self, industry: str, agent: Agent = None) -> Dict:
+        """
+        Industry-wide financial benchmarks, the same for every startup in the industry
+        """
+        agent = agent or self.create_agent()
         
         # Search for financial benchmarks
-        benchmarks = await agent.execute(
-            f"Search for financial benchmarks and KPIs in {startup_data['industry']} industry"
+        benchmarks = await ask(
+            agent,
+            f"Search for financial benchmarks and KPIs in {industry} industry"
         )
         
         # Scrape detailed financial data
-        financial_data = await agent.execute(
-            f"Scrape financial performance data for similar startups in {startup_data['industry']}"
+        financial_data = await ask(
+            agent,
+            f"Scrape financial performance data for similar startups in {industry}"
         )
+
+        return {"industry_benchmarks": benchmarks, "financial_data": financial_data}
+    
+    async def analyze_financials(self, startup_data: Dict) -> Dict:
+        agent = self.create_agent()
+        industry = startup_data["industry"]
+        research = await load_research(self.knowledge, self.KNOWLEDGE_KIND, industry,
+                                       lambda: self.research_industry(industry, agent))
         
         # Generate financial analysis
-        analysis = await agent.execute(
-            f"""Based on the financial data, provide:
+        analysis = await ask(
+            agent,
+            f"""{industry_context(industry, research)}
+
+            Based on the financial data, provide:
             1. Revenue metrics and growth
             2. Cost structure analysis
             3. Profitability assessment
@@ -47,7 +67,7 @@ class FinancialAnalyzer:
         return {
             "timestamp": datetime.now().isoformat(),
             "startup_name": startup_data["name"],
-            "industry_benchmarks": benchmarks,
-            "financial_data": financial_data,
+            **research["value"],
+            "research_updated": datetime.fromtimestamp(research["updatedAt"]).isoformat(),
             "analysis_summary": analysis
         } 
\ No newline at end of file
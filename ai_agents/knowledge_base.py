@@ -0,0 +1,286 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from coalesce import AsyncSingleFlight
+
+# Research older than this is refreshed by the scheduler but still served
+DEFAULT_STALE_AFTER = 24 * 3600
+# Research older than this is never served; the analyzer researches inline
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+DEFAULT_REFRESH_INTERVAL = 600
+DEFAULT_TOP_N = 20
+# Local hours [start, end) when warming and routine refreshes run
+DEFAULT_OFF_PEAK = (1, 6)
+MAX_CONTEXT_CHARS = 6000
+
+Research = Callable[[], Awaitable[Dict]]
+
+def normalize_industry(industry: str) -> str:
+    return " ".join(str(industry).lower().split())
+
+class IndustryKnowledgeBase:
+    """
+    Persistent per-industry research shared by every startup analysis:
+    market data, financial benchmarks, competitors and common risks, one
+    entry per (industry, kind). Entries past stale_after are still served
+    while the scheduler refreshes them; entries past max_age are not served
+    at all. Every analysis also counts towards its industry's demand, which
+    decides what the scheduler warms first.
+    """
+
+    def __init__(self, db_path: str = ":memory:", stale_after: float = DEFAULT_STALE_AFTER,
+                 max_age: float = DEFAULT_MAX_AGE):
+        self.stale_after = stale_after
+        self.max_age = max_age
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "researched": 0, "shared": 0}
+        self.flights = AsyncSingleFlight()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS industry_knowledge (
+                industry TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (industry, kind)
+            )
+        """)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS industry_demand (
+                industry TEXT PRIMARY KEY,
+                requests INTEGER NOT NULL,
+                last_requested REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS industry_knowledge_updated ON industry_knowledge (updated_at)")
+        self._db.commit()
+
+    def get(self, industry: str, kind: str) -> Optional[Dict]:
+        """
+        Returns {"value", "updatedAt", "stale"} for servable research, or None
+        when there is none or it is past max_age
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, updated_at FROM industry_knowledge WHERE industry = ? AND kind = ?",
+                (normalize_industry(industry), kind)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                self.stats["misses"] += 1
+                return None
+            stale = now - row[1] > self.stale_after
+            self.stats["stale" if stale else "hits"] += 1
+        return {"value": json.loads(row[0]), "updatedAt": row[1], "stale": stale}
+
+    def put(self, industry: str, kind: str, value: Dict, updated_at: Optional[float] = None):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO industry_knowledge (industry, kind, value, updated_at) VALUES (?, ?, ?, ?)",
+                (normalize_industry(industry), kind, json.dumps(value, default=str),
+                 time.time() if updated_at is None else updated_at)
+            )
+            self._db.commit()
+
+    async def fetch(self, industry: str, kind: str, research: Research) -> Dict:
+        """
+        Returns the stored research for industry, running research() and
+        storing its result when there is none that may be served. Concurrent
+        analyses of one industry share a single research run.
+        """
+        entry = self.get(industry, kind)
+        if entry is not None:
+            return entry
+
+        async def run():
+            value = await research()
+            self.put(industry, kind, value)
+            with self._lock:
+                self.stats["researched"] += 1
+            return {"value": value, "updatedAt": time.time(), "stale": False}
+
+        before = self.flights.shared
+        entry = await self.flights.do(f"{normalize_industry(industry)}\x1f{kind}", run)
+        if self.flights.shared > before:
+            with self._lock:
+                self.stats["shared"] += 1
+        return entry
+
+    def record_request(self, industry: str):
+        """Counts one analysis towards the industry's demand"""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO industry_demand (industry, requests, last_requested) VALUES (?, 1, ?) "
+                "ON CONFLICT (industry) DO UPDATE SET requests = requests + 1, last_requested = excluded.last_requested",
+                (normalize_industry(industry), time.time())
+            )
+            self._db.commit()
+
+    def top_industries(self, n: int) -> List[str]:
+        """The n industries analyzed most often"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT industry FROM industry_demand ORDER BY requests DESC, last_requested DESC LIMIT ?", (n,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def due(self, older_than: float, limit: int) -> List[Tuple[str, str]]:
+        """(industry, kind) entries last updated more than older_than seconds ago, most demanded first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT k.industry, k.kind FROM industry_knowledge k "
+                "LEFT JOIN industry_demand d ON d.industry = k.industry "
+                "WHERE k.updated_at < ? ORDER BY COALESCE(d.requests, 0) DESC, k.updated_at LIMIT ?",
+                (time.time() - older_than, limit)
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def missing(self, industries: Sequence[str], kinds: Sequence[str]) -> List[Tuple[str, str]]:
+        """The (industry, kind) pairs with no stored research at all"""
+        with self._lock:
+            stored = set(self._db.execute("SELECT industry, kind FROM industry_knowledge").fetchall())
+        return [(normalize_industry(industry), kind) for industry in industries for kind in kinds
+                if (normalize_industry(industry), kind) not in stored]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM industry_knowledge")
+            self._db.execute("DELETE FROM industry_demand")
+            self._db.commit()
+
+    def hit_rate(self) -> float:
+        """Share of lookups served from the store, stale entries included"""
+        with self._lock:
+            served = self.stats["hits"] + self.stats["stale"]
+            lookups = served + self.stats["misses"]
+        return served / lookups if lookups else 0.0
+
+async def load_research(knowledge: Optional[IndustryKnowledgeBase], kind: str, industry: str,
+                        research: Research) -> Dict:
+    """
+    Industry research for one analyzer: from the knowledge base when there is
+    one, otherwise researched inline as part of the analysis
+    """
+    if knowledge is None:
+        return {"value": await research(), "updatedAt": time.time(), "stale": False}
+    return await knowledge.fetch(industry, kind, research)
+
+def industry_context(industry: str, entry: Dict, max_chars: int = MAX_CONTEXT_CHARS) -> str:
+    """Renders stored research as the opening of a per-startup prompt"""
+    parts = [f"Research on the {industry} industry:"]
+    for key, value in entry["value"].items():
+        parts.append(f"{key.replace('_', ' ').capitalize()}:\n{value}")
+    return "\n\n".join(parts)[:max_chars]
+
+class KnowledgeRefresher:
+    """
+    Background scheduler that keeps the knowledge base current.
+
+    Every interval seconds it refreshes up to batch entries, most demanded
+    industries first. Off-peak it refreshes everything past stale_after and
+    warms the top_n industries (plus any listed in industries) that have no
+    research yet; at other hours it only refreshes entries that would pass
+    max_age before the next off-peak window could catch them.
+    researchers maps each kind to a coroutine function taking the industry.
+    """
+
+    def __init__(self, knowledge: IndustryKnowledgeBase, researchers: Dict[str, Callable[[str], Awaitable[Dict]]],
+                 interval: float = DEFAULT_REFRESH_INTERVAL, top_n: int = DEFAULT_TOP_N,
+                 off_peak: Tuple[int, int] = DEFAULT_OFF_PEAK, industries: Sequence[str] = (),
+                 batch: int = 10, concurrency: int = 4):
+        self.knowledge = knowledge
+        self.researchers = researchers
+        self.interval = interval
+        self.top_n = top_n
+        self.off_peak = off_peak
+        self.industries = list(industries)
+        self.batch = batch
+        self.concurrency = concurrency
+        self.stats = {"runs": 0, "refreshed": 0, "warmed": 0, "failed": 0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def is_off_peak(self, now: Optional[float] = None) -> bool:
+        start, end = self.off_peak
+        hour = datetime.fromtimestamp(time.time() if now is None else now).hour
+        return start <= hour < end if start <= end else hour >= start or hour < end
+
+    def plan(self, now: Optional[float] = None) -> List[Tuple[str, str, str]]:
+        """(industry, kind, reason) entries the next run will research"""
+        kinds = list(self.researchers)
+        if self.is_off_peak(now):
+            due = self.knowledge.due(self.knowledge.stale_after, self.batch)
+            warm = self.knowledge.missing(self.industries + self.knowledge.top_industries(self.top_n), kinds)
+        else:
+            # A day of headroom covers the wait until the next off-peak window
+            due = self.knowledge.due(max(self.knowledge.max_age - 24 * 3600, 0), self.batch)
+            warm = []
+        entries = [(industry, kind, "refreshed") for industry, kind in due if kind in self.researchers]
+        entries += [(industry, kind, "warmed") for industry, kind in dict.fromkeys(warm)]
+        return entries[:self.batch]
+
+    async def run_once(self, now: Optional[float] = None) -> Dict:
+        """Researches what plan() returns, a few entries at a time"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        counts = {"refreshed": 0, "warmed": 0, "failed": 0}
+
+        async def refresh(industry, kind, reason):
+            async with semaphore:
+                try:
+                    value = await self.researchers[kind](industry)
+                except Exception as e:
+                    print(f"Error refreshing {kind} research for {industry}: {e}")
+                    counts["failed"] += 1
+                    return
+                self.knowledge.put(industry, kind, value)
+                counts[reason] += 1
+
+        await asyncio.gather(*(refresh(*entry) for entry in self.plan(now)))
+        self.stats["runs"] += 1
+        for key, value in counts.items():
+            self.stats[key] += value
+        return counts
+
+    def start(self) -> "KnowledgeRefresher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="knowledge-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                asyncio.run(self.run_once())
+            except Exception as e:
+                print(f"Knowledge refresh failed: {e}")
+            self._stop.wait(self.interval)
+
+_knowledge = None
+_knowledge_lock = threading.Lock()
+
+def get_knowledge_base() -> IndustryKnowledgeBase:
+    """
+    Returns the process-wide knowledge base, creating it on first use
+    """
+    global _knowledge
+    if _knowledge is None:
+        with _knowledge_lock:
+            if _knowledge is None:
+                # Kept on disk across restarts and shared by processes; KNOWLEDGE_DB=:memory: to keep it per process
+                _knowledge = IndustryKnowledgeBase(
+                    os.getenv("KNOWLEDGE_DB", "knowledge.db"),
+                    stale_after=float(os.getenv("KNOWLEDGE_STALE_AFTER", str(DEFAULT_STALE_AFTER))),
+                    max_age=float(os.getenv("KNOWLEDGE_MAX_AGE", str(DEFAULT_MAX_AGE)))
+                )
+    return _knowledge
@@ -1,16 +1,55 @@
-from typing import Dict, List
+from typing import Dict, List, Sequence
 import numpy as np
 from datetime import datetime
 from crewai import Agent
-from serper_dev import SerperDev
-from firecrawl import Firecrawl
+from tools import VERBOSE, ToolRegistry, ask, get_registry
+from knowledge_base import IndustryKnowledgeBase, industry_context, load_research
+
+# Scoring constants shared by the scalar and batch paths
+MARKET_SIZE_NORM = 1000000000  # Normalize to 1B market size
+GROWTH_RATE_NORM = 0.2  # Normalize to 20% growth rate
+SIZE_WEIGHT = 0.6
+GROWTH_WEIGHT = 0.4
+TREND_THRESHOLD = 0.3
+GROWTH_POTENTIAL_NORM = 100000000
+
+def market_columns(markets: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Converts market dicts into the columnar input of analyze_market_data_batch.
+    Trend impacts are flattened, with row i's trends at
+    trend_impacts[trend_offsets[i]:trend_offsets[i + 1]]
+    """
+    counts = np.fromiter((len(market.get("trends", [])) for market in markets),
+                         dtype=np.int64, count=len(markets))
+    offsets = np.zeros(len(markets) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return {
+        "market_size": np.fromiter((market.get("market_size", 0) for market in markets),
+                                   dtype=np.float64, count=len(markets)),
+        "growth_rate": np.fromiter((market.get("growth_rate", 0) for market in markets),
+                                   dtype=np.float64, count=len(markets)),
+        "trend_impacts": np.fromiter((trend.get("impact", 0) for market in markets
+                                      for trend in market.get("trends", [])),
+                                     dtype=np.float64, count=int(offsets[-1])),
+        "trend_offsets": offsets
+    }
+
+def _min(a, b):
+    # Elementwise builtin min(a, b), including how it treats NaN
+    return np.where(b < a, b, a)
+
+def _max(a, b):
+    # Elementwise builtin max(a, b), including how it treats NaN
+    return np.where(b > a, b, a)
 
 class MarketAnalyzer:
-    def __init__(self):
-        self.serper = SerperDev()
-        self.firecrawl = Firecrawl()
-        self.market_trends = {}
-        self.industry_metrics = {}
+    # Knowledge base entry holding this analyzer's industry-wide research
+    KNOWLEDGE_KIND = "market"
+
+    def __init__(self, tools: ToolRegistry = None, knowledge: IndustryKnowledgeBase = None):
+        self.tools = tools or get_registry()
+        # Industry research shared across startups; None researches inline on every run
+        self.knowledge = knowledge
         
     def create_agent(self) -> Agent:
         return Agent(
@@ -19,38 +58,54 @@ class MarketAnalyzer:
             backstory="""You are an expert market research analyst with deep knowledge 
             of startup ecosystems and market dynamics. You excel at identifying market 
             opportunities and analyzing industry trends.""",
-            tools=[self.serper.search, self.firecrawl.scrape],
-            verbose=True
+            tools=self.tools.agent_tools(),
+            verbose=VERBOSE
         )
-    
-    async def analyze_market(self, startup_data: Dict) -> Dict:
-        agent = self.create_agent()
+
+    async def research_industry(self, industry: str, agent: Agent = None) -> Dict:
+        """
+        Industry-wide market research, the same for every startup in the industry
+        """
+        agent = agent or self.create_agent()
         
         # Search for market data
-        market_search = await agent.execute(
-            f"Search for market size, growth rate, and trends in {startup_data['industry']} industry"
+        market_search = await ask(
+            agent,
+            f"Search for market size, growth rate, and trends in {industry} industry"
         )
         
         # Scrape detailed market information
-        market_details = await agent.execute(
-            f"Scrape detailed market analysis for {startup_data['industry']} from industry reports"
+        market_details = await ask(
+            agent,
+            f"Scrape detailed market analysis for {industry} from industry reports"
         )
         
+        return {"market_data": market_search, "detailed_analysis": market_details}
+    
+    async def analyze_market(self, startup_data: Dict) -> Dict:
+        agent = self.create_agent()
+        industry = startup_data["industry"]
+        research = await load_research(self.knowledge, self.KNOWLEDGE_KIND, industry,
+                                       lambda: self.research_industry(industry, agent))
+        
         # Generate market analysis
-        analysis = await agent.execute(
-            f"""Based on the market data, provide:
+        analysis = await ask(
+            agent,
+            f"""{industry_context(industry, research)}
+
+            Based on the market data, provide:
             1. Market size and growth rate
             2. Key trends and opportunities
             3. Market score (0-1)
             4. Key insights
-            For {startup_data['industry']} industry"""
+            For {startup_data['name']} in the {industry} industry"""
         )
         
         return {
             "timestamp": datetime.now().isoformat(),
-            "industry": startup_data["industry"],
-            "market_data": market_search,
-            "detailed_analysis": market_details,
+            "industry": industry,
+            **research["value"],
+            "research_updated": datetime.fromtimestamp(research["updatedAt"]).isoformat(),
             "analysis_summary": analysis
         }
     
@@ -74,9 +129,9 @@ class MarketAnalyzer:
         market_analysis["market_metrics"]["growth_rate"] = growth_rate
         
         # Calculate market score based on size and growth
-        size_score = min(market_size / 1000000000, 1.0)  # Normalize to 1B market size
-        growth_score = min(growth_rate / 0.2, 1.0)  # Normalize to 20% growth rate
-        market_analysis["market_score"] = (size_score * 0.6 + growth_score * 0.4)
+        size_score = min(market_size / MARKET_SIZE_NORM, 1.0)
+        growth_score = min(growth_rate / GROWTH_RATE_NORM, 1.0)
+        market_analysis["market_score"] = (size_score * SIZE_WEIGHT + growth_score * GROWTH_WEIGHT)
         
         # Analyze market trends
         trends = self._analyze_trends(market_data.get("trends", []))
@@ -97,6 +152,57 @@ class MarketAnalyzer:
         
         return market_analysis
     
+    def analyze_market_data_batch(self, market_size: Sequence[float], growth_rate: Sequence[float],
+                                  trend_impacts: Sequence[float],
+                                  trend_offsets: Sequence[int]) -> Dict[str, np.ndarray]:
+        """
+        Scores many markets at once from columnar arrays, as built by
+        market_columns. Every score equals what analyze_market_data returns
+        for the same row; trend buckets come back as per-row counts plus a
+        flat trend_bucket array (1 positive, -1 negative, 0 neutral) aligned
+        with trend_impacts.
+        """
+        market_size = np.asarray(market_size, dtype=np.float64)
+        growth_rate = np.asarray(growth_rate, dtype=np.float64)
+        impacts = np.asarray(trend_impacts, dtype=np.float64)
+        offsets = np.asarray(trend_offsets, dtype=np.int64)
+        counts = np.diff(offsets)
+
+        size_score = _min(market_size / MARKET_SIZE_NORM, 1.0)
+        growth_score = _min(growth_rate / GROWTH_RATE_NORM, 1.0)
+        market_score = size_score * SIZE_WEIGHT + growth_score * GROWTH_WEIGHT
+
+        bucket = np.zeros(len(impacts), dtype=np.int8)
+        bucket[impacts > TREND_THRESHOLD] = 1
+        bucket[impacts < -TREND_THRESHOLD] = -1
+        row_of_trend = np.repeat(np.arange(len(counts)), counts)
+        positive = np.bincount(row_of_trend[bucket == 1], minlength=len(counts))
+        negative = np.bincount(row_of_trend[bucket == -1], minlength=len(counts))
+
+        # np.mean over each row's trends. Rows are grouped by trend count so
+        # each group is a dense 2D block whose row means are summed in the
+        # same order as the scalar path, keeping the results bit-identical.
+        trend_impact_score = np.zeros(len(counts), dtype=np.float64)
+        for count in np.unique(counts[counts > 0]):
+            rows = np.flatnonzero(counts == count)
+            block = impacts[offsets[rows][:, None] + np.arange(count)]
+            trend_impact_score[rows] = block.mean(axis=1)
+
+        base_potential = _min(market_size * growth_rate / GROWTH_POTENTIAL_NORM, 1.0)
+        growth_potential = _max(0.0, _min(1.0, base_potential * (1 + trend_impact_score)))
+
+        return {
+            "size_score": size_score,
+            "growth_score": growth_score,
+            "market_score": market_score,
+            "positive_trends": positive,
+            "negative_trends": negative,
+            "neutral_trends": counts - positive - negative,
+            "trend_bucket": bucket,
+            "trend_impact_score": trend_impact_score,
+            "growth_potential": growth_potential
+        }
+    
     def _analyze_trends(self, trends_data: List[Dict]) -> Dict:
         """
         Analyzes market trends and their impact
@@ -108,18 +214,19 @@ class MarketAnalyzer:
             "trend_impact_score": 0.0
         }
         
+        impacts = []
         for trend in trends_data:
             impact = trend.get("impact", 0)
-            if impact > 0.3:
+            impacts.append(impact)
+            if impact > TREND_THRESHOLD:
                 trend_analysis["positive_trends"].append(trend)
-            elif impact < -0.3:
+            elif impact < -TREND_THRESHOLD:
                 trend_analysis["negative_trends"].append(trend)
             else:
                 trend_analysis["neutral_trends"].append(trend)
                 
         # Calculate overall trend impact score
-        if trends_data:
-            impacts = [t.get("impact", 0) for t in trends_data]
+        if impacts:
             trend_analysis["trend_impact_score"] = np.mean(impacts)
             
         return trend_analysis
@@ -129,7 +236,7 @@ class MarketAnalyzer:
         """
         Calculates the growth potential score
         """
-        base_potential = min(market_size * growth_rate / 100000000, 1.0)
+        base_potential = min(market_size * growth_rate / GROWTH_POTENTIAL_NORM, 1.0)
         trend_impact = trends.get("trend_impact_score", 0)
         
         # Adjust growth potential based on trend impact
@@ -1,108 +1,155 @@
-from crewai import Crew, Process
+import re
+import time
+import asyncio
 from typing import Dict, List
 from datetime import datetime
 from market_analyzer import MarketAnalyzer
 from financial_analyzer import FinancialAnalyzer
 from competitor_analyzer import CompetitorAnalyzer
 from risk_assessor import RiskAssessor
+from tools import ToolRegistry, get_registry
+from coalesce import AsyncSingleFlight, request_key
+from knowledge_base import IndustryKnowledgeBase, KnowledgeRefresher, get_knowledge_base
+from portfolio import CATEGORY_WEIGHTS, Portfolio, category_scores
+
+# Seconds each analyzer may run before it is reported as timed out
+ANALYZER_TIMEOUT = 300
 
 class StartupAnalysisOrchestrator:
-    def __init__(self):
-        self.market_analyzer = MarketAnalyzer()
-        self.financial_analyzer = FinancialAnalyzer()
-        self.competitor_analyzer = CompetitorAnalyzer()
-        self.risk_assessor = RiskAssessor()
+    def __init__(self, analyzer_timeout: float = ANALYZER_TIMEOUT, tools: ToolRegistry = None,
+                 portfolio: Portfolio = None, knowledge: IndustryKnowledgeBase = None, history=None):
+        # One registry for all analyzers, so they share connections and limits
+        self.tools = tools or get_registry()
+        # Industry-wide research, done once per industry instead of once per startup
+        self.knowledge = knowledge or get_knowledge_base()
+        self.market_analyzer = MarketAnalyzer(self.tools, self.knowledge)
+        self.financial_analyzer = FinancialAnalyzer(self.tools, self.knowledge)
+        self.competitor_analyzer = CompetitorAnalyzer(self.tools, self.knowledge)
+        self.risk_assessor = RiskAssessor(self.tools, self.knowledge)
+        self.analyzer_timeout = analyzer_timeout
+        # Analyses in progress, keyed by normalized startup data
+        self.flights = AsyncSingleFlight()
+        # Category scores of every startup analyzed, for ranking and re-weighting
+        self.portfolio = portfolio if portfolio is not None else Portfolio()
+        # Optional store that keeps every report, e.g. backend/history.py's AnalysisHistory
+        self.history = history
+        # Keeps the knowledge base current in the background between start() and stop()
+        self.refresher = None
         
     async def analyze_startup(self, startup_data: Dict) -> Dict:
         """
-        Orchestrates the complete startup analysis process using CrewAI
+        Orchestrates the complete startup analysis by running the four
+        analyzers concurrently. A slow or failing analyzer only affects its
+        own category, which then scores 0.
+
+        Identical requests made while one is still running share its report
+        instead of starting their own analyzers. Industry-wide research comes
+        from the knowledge base, so each analyzer only makes its
+        startup-specific call once the industry has been researched.
         """
-        # Create agents
-        market_agent = self.market_analyzer.create_agent()
-        financial_agent = self.financial_analyzer.create_agent()
-        competitor_agent = self.competitor_analyzer.create_agent()
-        risk_agent = self.risk_assessor.create_agent()
-        
-        # Create crew with agents
-        crew = Crew(
-            agents=[market_agent, financial_agent, competitor_agent, risk_agent],
-            tasks=[
-                self._create_market_analysis_task(startup_data),
-                self._create_financial_analysis_task(startup_data),
-                self._create_competitor_analysis_task(startup_data),
-                self._create_risk_assessment_task(startup_data)
-            ],
-            process=Process.sequential
+        return await self.flights.do(
+            request_key(startup_data), lambda: self._analyze_startup(startup_data)
         )
+
+    def knowledge_refresher(self, **options) -> KnowledgeRefresher:
+        """
+        Scheduler that keeps this orchestrator's knowledge base current using
+        its analyzers' industry research; call start() on it to run it in the
+        background. options are passed on to KnowledgeRefresher.
+        """
+        researchers = {
+            analyzer.KNOWLEDGE_KIND: analyzer.research_industry
+            for analyzer in (self.market_analyzer, self.financial_analyzer,
+                             self.competitor_analyzer, self.risk_assessor)
+        }
+        return KnowledgeRefresher(self.knowledge, researchers, **options)
+
+    def start(self, **options) -> "StartupAnalysisOrchestrator":
+        """
+        Starts refreshing and warming the knowledge base in the background,
+        for long-running processes; call stop() on shutdown. options are
+        passed on to knowledge_refresher()
+        """
+        if self.refresher is None:
+            self.refresher = self.knowledge_refresher(**options).start()
+        return self
+
+    def stop(self, timeout: float = 5):
+        """
+        Stops the background refresher, waiting up to timeout seconds for a
+        refresh in progress
+        """
+        if self.refresher is not None:
+            self.refresher.stop(timeout)
+            self.refresher = None
+    
+    async def _analyze_startup(self, startup_data: Dict) -> Dict:
+        self.knowledge.record_request(startup_data["industry"])
+        analyzers = {
+            "market": self.market_analyzer.analyze_market,
+            "financial": self.financial_analyzer.analyze_financials,
+            "competition": self.competitor_analyzer.analyze_competitors,
+            "risk": self.risk_assessor.assess_risks
+        }
         
         # Execute analysis
-        results = await crew.kickoff()
+        results = await asyncio.gather(*(
+            self._run_analyzer(category, analyze, startup_data)
+            for category, analyze in analyzers.items()
+        ))
         
         # Compile final report
-        return {
+        report = {
             "timestamp": datetime.now().isoformat(),
             "startup_name": startup_data["name"],
             "industry": startup_data["industry"],
             "analysis_results": results,
             "overall_score": self._calculate_overall_score(results)
         }
+        self.portfolio.add_report(report)
+        if self.history is not None:
+            self.history.record_report(startup_data, report)
+        return report
     
-    def _create_market_analysis_task(self, startup_data: Dict) -> str:
-        return f"""Analyze market conditions for {startup_data['name']} in {startup_data['industry']}:
-        1. Market size and growth potential
-        2. Industry trends and opportunities
-        3. Market entry barriers
-        4. Market score (0-1)"""
-    
-    def _create_financial_analysis_task(self, startup_data: Dict) -> str:
-        return f"""Analyze financial aspects for {startup_data['name']}:
-        1. Revenue metrics and growth
-        2. Cost structure and efficiency
-        3. Profitability assessment
-        4. Financial health score (0-1)"""
-    
-    def _create_competitor_analysis_task(self, startup_data: Dict) -> str:
-        return f"""Analyze competitive landscape for {startup_data['name']}:
-        1. Key competitors and market share
-        2. Competitive advantages
-        3. Market positioning
-        4. Competition score (0-1)"""
+    async def _run_analyzer(self, category: str, analyze, startup_data: Dict) -> Dict:
+        """
+        Runs one analyzer with a timeout and tags its result with the category
+        and score. Errors are returned as results instead of being raised, so
+        they never cancel the other analyzers.
+        """
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(analyze(startup_data), timeout=self.analyzer_timeout)
+        except asyncio.TimeoutError:
+            error = f"Timed out after {self.analyzer_timeout} seconds"
+            result = {"error": error, "analysis_summary": f"Analysis failed: {error}"}
+        except Exception as e:
+            result = {"error": str(e), "analysis_summary": f"Analysis failed: {e}"}
+        
+        return {
+            **result,
+            "category": category,
+            "score": self._parse_score(result.get("analysis_summary")),
+            "duration": round(time.perf_counter() - start, 3)
+        }
     
-    def _create_risk_assessment_task(self, startup_data: Dict) -> str:
-        return f"""Assess risks for {startup_data['name']}:
-        1. Key risk factors
-        2. Risk mitigation strategies
-        3. Risk score (0-1)
-        4. Recommendations"""
+    def _parse_score(self, summary) -> float:
+        """
+        Pulls the 0-1 score out of an analyzer's summary
+        """
+        if isinstance(summary, dict):
+            return float(summary.get("score", 0))
+        # Drop the "(0-1)" range hint the prompts ask the agents to echo
+        text = re.sub(r"\(?\b0\s*-\s*1\b\)?", "", str(summary or ""))
+        match = re.search(r"score\D{0,20}?(0(?:\.\d+)?|1(?:\.0+)?)(?!\d)", text, re.IGNORECASE)
+        return float(match.group(1)) if match else 0.0
     
     def _calculate_overall_score(self, results: List[Dict]) -> float:
         """
         Calculate overall startup score based on all analysis components
         """
-        weights = {
-            "market": 0.3,
-            "financial": 0.25,
-            "competition": 0.25,
-            "risk": 0.2
-        }
-        
-        scores = {
-            "market": self._extract_score(results, "market"),
-            "financial": self._extract_score(results, "financial"),
-            "competition": self._extract_score(results, "competition"),
-            "risk": self._extract_score(results, "risk")
-        }
-        
-        overall_score = sum(score * weights[category] 
+        scores = category_scores(results)
+        overall_score = sum(score * CATEGORY_WEIGHTS[category]
                           for category, score in scores.items())
         
         return round(overall_score, 2)
-    
-    def _extract_score(self, results: List[Dict], category: str) -> float:
-        """
-        Extract score from results for a specific category
-        """
-        for result in results:
-            if category in result.get("category", "").lower():
-                return float(result.get("score", 0))
-        return 0.0 
\ No newline at end of file
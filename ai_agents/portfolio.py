@@ -0,0 +1,178 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+# Weight of each analysis category in a startup's overall score
+CATEGORY_WEIGHTS = {
+    "market": 0.3,
+    "financial": 0.25,
+    "competition": 0.25,
+    "risk": 0.2
+}
+CATEGORIES = list(CATEGORY_WEIGHTS)
+
+def category_scores(results: Iterable[Dict]) -> Dict[str, float]:
+    """
+    Maps each category to its score in one pass over an analysis' results.
+    Missing categories score 0
+    """
+    scores = dict.fromkeys(CATEGORIES, 0.0)
+    for result in results:
+        category = result.get("category", "").lower()
+        if category in scores:
+            scores[category] = float(result.get("score", 0))
+    return scores
+
+class Portfolio:
+    """
+    Per-category scores of many startups, stored as one float64 row per
+    startup so they can be re-weighted and ranked without re-running any
+    agent.
+
+    Overall scores under the current weights are kept up to date as rows are
+    added or replaced; passing other weights to a query scores every row
+    with a single matrix-vector product. Wherever weights are given, the
+    categories they leave out keep their current weight.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, capacity: int = 1024):
+        self._scores = np.zeros((capacity, len(CATEGORIES)), dtype=np.float64)
+        self._overall = np.zeros(capacity, dtype=np.float64)
+        self._names: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self.weights = self._weight_vector({**CATEGORY_WEIGHTS, **(weights or {})})
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rows
+
+    def upsert(self, name: str, scores: Dict[str, float]):
+        """
+        Adds a startup, or replaces its scores after it was re-analyzed.
+        Categories missing from scores keep their previous value (0 for a
+        new startup)
+        """
+        row = self._rows.get(name)
+        if row is None:
+            row = len(self._names)
+            if row == len(self._scores):
+                self._grow()
+            self._rows[name] = row
+            self._names.append(name)
+            self._scores[row] = 0.0
+        for category, score in scores.items():
+            self._scores[row, self._column(category)] = score
+        self._overall[row] = self._scores[row] @ self.weights
+
+    def add_report(self, report: Dict):
+        """
+        Stores the category scores from an analyze_startup report
+        """
+        self.upsert(report["startup_name"], category_scores(report["analysis_results"]))
+
+    def upsert_many(self, names: List[str], scores: np.ndarray):
+        """
+        Adds or replaces many startups at once; scores has one column per
+        category, in CATEGORIES order
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        for name in names:
+            if name not in self._rows:
+                if len(self._names) == len(self._scores):
+                    self._grow()
+                self._rows[name] = len(self._names)
+                self._names.append(name)
+        rows = np.fromiter((self._rows[name] for name in names), dtype=np.int64, count=len(names))
+        self._scores[rows] = scores
+        self._overall[rows] = scores @ self.weights
+
+    def remove(self, name: str):
+        """
+        Drops a startup, moving the last row into its place
+        """
+        row = self._rows.pop(name)
+        last = len(self._names) - 1
+        if row != last:
+            moved = self._names[last]
+            self._scores[row] = self._scores[last]
+            self._overall[row] = self._overall[last]
+            self._names[row] = moved
+            self._rows[moved] = row
+        self._names.pop()
+
+    def get(self, name: str) -> Dict:
+        """
+        Category and overall scores of one startup
+        """
+        row = self._rows[name]
+        scores = dict(zip(CATEGORIES, self._scores[row].tolist()))
+        return {**scores, "overall": float(self._overall[row])}
+
+    def set_weights(self, weights: Dict[str, float]):
+        """
+        Re-weights the categories and rescores every startup. Categories
+        left out of weights keep their current weight
+        """
+        vector = self._weight_vector(weights, self.weights)
+        self.weights = vector
+        size = len(self._names)
+        self._overall[:size] = self._scores[:size] @ vector
+
+    def overall(self, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        Overall score of every startup, in insertion order. weights
+        override the current weights of the categories they name
+        """
+        size = len(self._names)
+        if weights is None:
+            return self._overall[:size]
+        return self._scores[:size] @ self._weight_vector(weights, self.weights)
+
+    def top_k(self, k: int, weights: Optional[Dict[str, float]] = None) -> List[Tuple[str, float]]:
+        """
+        The k best startups as (name, overall score), best first
+        """
+        overall = self.overall(weights)
+        k = min(k, len(overall))
+        if k <= 0:
+            return []
+        candidates = np.argpartition(-overall, k - 1)[:k]
+        ranked = candidates[np.lexsort((candidates, -overall[candidates]))]
+        return [(self._names[row], float(overall[row])) for row in ranked]
+
+    def percentile_rank(self, name: str, weights: Optional[Dict[str, float]] = None) -> float:
+        """
+        Percentage of startups whose overall score is at or below this one's
+        """
+        overall = self.overall(weights)
+        score = overall[self._rows[name]]
+        return 100.0 * np.count_nonzero(overall <= score) / len(overall)
+
+    def score_at_percentile(self, q: float, weights: Optional[Dict[str, float]] = None) -> float:
+        """
+        Overall score at the q-th percentile (0-100) of the portfolio
+        """
+        overall = self.overall(weights)
+        return float(np.percentile(overall, q)) if len(overall) else 0.0
+
+    def _weight_vector(self, weights: Dict[str, float], base: Optional[np.ndarray] = None) -> np.ndarray:
+        # base (all zeros by default) with the categories in weights replaced
+        vector = np.zeros(len(CATEGORIES), dtype=np.float64) if base is None else base.copy()
+        for category, weight in weights.items():
+            vector[self._column(category)] = weight
+        return vector
+
+    def _column(self, category: str) -> int:
+        try:
+            return CATEGORIES.index(category)
+        except ValueError:
+            raise ValueError(f"Unknown category: {category}") from None
+
+    def _grow(self):
+        capacity = max(1, 2 * len(self._scores))
+        scores = np.zeros((capacity, len(CATEGORIES)), dtype=np.float64)
+        scores[:len(self._scores)] = self._scores
+        overall = np.zeros(capacity, dtype=np.float64)
+        overall[:len(self._overall)] = self._overall
+        self._scores, self._overall = scores, overall
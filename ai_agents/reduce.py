@@ -0,0 +1,312 @@
+import re
+import math
+import threading
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Union
+
+# Tokens of tool output one call may hand to the LLM
+DEFAULT_TOKEN_BUDGET = 3000
+MAX_CHUNK_WORDS = 120
+# Share of a chunk's word 3-grams already seen in a kept chunk that makes it a duplicate
+DUPLICATE_THRESHOLD = 0.8
+MAX_SEARCH_RESULTS = 8
+
+_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_BARE_URL = re.compile(r"https?://\S+")
+_HEADING = re.compile(r"^#{1,6}\s+(.*)$")
+_LIST_MARKER = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'])")
+_WORD = re.compile(r"[a-z0-9]+(?:[.,][0-9]+)*")
+_BOILERPLATE = re.compile(
+    r"cookie|subscribe|newsletter|sign (?:in|up)|log ?in|create an account|all rights reserved|©|"
+    r"privacy policy|terms (?:of|and) (?:use|service|conditions)|share (?:this|on)|follow us|"
+    r"skip to (?:main )?content|advertisement|related (?:articles|posts|stories)|read more|"
+    r"back to top|table of contents|you may also like|download the app|accept all",
+    re.IGNORECASE
+)
+_BYLINE = re.compile(r"^(?:by|posted (?:on|by)|published|updated|last updated)\b", re.IGNORECASE)
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the their this to
+was were will with what which who how about over than then there these those our your we you
+""".split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, at about four characters per token for English text"""
+    return (len(text) + 3) // 4
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words without stopwords, with plurals folded onto their singular"""
+    words = []
+    for word in _WORD.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+class Chunk:
+    """A passage of a page, with the heading it sits under"""
+
+    __slots__ = ("source", "heading", "text", "position", "tokens", "score")
+
+    def __init__(self, source: str, heading: str, text: str, position: int):
+        self.source = source
+        self.heading = heading
+        self.text = text
+        self.position = position
+        self.tokens = estimate_tokens(text)
+        self.score = 0.0
+
+
+def _is_boilerplate(line: str) -> bool:
+    """Navigation, link lists, cookie banners, share buttons and footers"""
+    text = _LIST_MARKER.sub("", line).strip()
+    if not text:
+        return True
+    plain = _BARE_URL.sub("", _LINK.sub(r"\1", text)).strip()
+    words = len(plain.split())
+    if words <= 25 and _BOILERPLATE.search(plain):
+        return True
+    # Bylines and metadata strips: "By Jane Doe | March 5, 2024 | 4 min read"
+    if plain.count(" | ") >= 2 or (words <= 15 and _BYLINE.match(plain)):
+        return True
+    # Mostly link markup: menus, breadcrumbs and "related" lists
+    links = sum(len(match.group(0)) for match in _LINK.finditer(text))
+    if links and links / len(text) > 0.6:
+        return True
+    # Lone short fragments ("Menu", "Home | About") carry nothing to rank
+    return words < 4 and not any(char.isdigit() for char in plain)
+
+
+def _split_long(text: str, max_words: int) -> List[str]:
+    """Split a long paragraph on sentence boundaries into pieces of at most max_words"""
+    if len(text.split()) <= max_words:
+        return [text]
+    pieces, current, count = [], [], 0
+    for sentence in _SENTENCE_END.split(text):
+        words = len(sentence.split())
+        if current and count + words > max_words:
+            pieces.append(" ".join(current))
+            current, count = [], 0
+        current.append(sentence)
+        count += words
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def page_chunks(markdown: str, source: str = "", max_words: int = MAX_CHUNK_WORDS) -> List[Chunk]:
+    """Strip boilerplate from a scraped page and split what is left into passages"""
+    chunks, heading, paragraph = [], "", []
+    skipping = False
+
+    def flush():
+        if paragraph:
+            text = " ".join(paragraph)
+            for piece in _split_long(text, max_words):
+                chunks.append(Chunk(source, heading, piece, len(chunks)))
+            paragraph.clear()
+
+    for line in markdown.splitlines():
+        stripped = line.strip()
+        match = _HEADING.match(stripped)
+        if match:
+            flush()
+            heading = _LINK.sub(r"\1", match.group(1)).strip()
+            # Everything under "Table of contents" or "Related articles" is navigation
+            skipping = bool(_BOILERPLATE.search(heading))
+            continue
+        if skipping or not stripped or _is_boilerplate(stripped):
+            flush()
+            continue
+        text = _BARE_URL.sub("", _LINK.sub(r"\1", stripped)).strip()
+        if _LIST_MARKER.match(stripped):
+            # Keep list items separate so one relevant bullet doesn't drag in the rest
+            flush()
+            paragraph.append("- " + _LIST_MARKER.sub("", text))
+            flush()
+        else:
+            paragraph.append(text)
+    flush()
+    return chunks
+
+
+def _shingles(text: str) -> set:
+    words = _WORD.findall(text.lower())
+    if len(words) < 3:
+        return {zlib.crc32(" ".join(words).encode())}
+    return {zlib.crc32(" ".join(words[i:i + 3]).encode()) for i in range(len(words) - 2)}
+
+
+def drop_duplicates(chunks: Sequence[Chunk], threshold: float = DUPLICATE_THRESHOLD) -> List[Chunk]:
+    """
+    Drops passages whose word 3-grams mostly appear in an earlier kept
+    passage, such as a press release syndicated across several pages. Only
+    passages sharing a 3-gram are compared, through an inverted index.
+    """
+    kept = []
+    index = defaultdict(list)
+    for chunk in chunks:
+        shingles = _shingles(chunk.text)
+        overlap = Counter(i for shingle in shingles for i in index.get(shingle, ()))
+        if any(count / len(shingles) >= threshold for count in overlap.values()):
+            continue
+        for shingle in shingles:
+            index[shingle].append(len(kept))
+        kept.append(chunk)
+    return kept
+
+
+class BM25:
+    """Okapi BM25 over a fixed set of passages"""
+
+    def __init__(self, documents: Sequence[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(document) for document in documents]
+        self.lengths = [len(document) for document in documents]
+        self.average_length = sum(self.lengths) / len(documents) if documents else 0.0
+        frequencies = Counter(term for counts in self.term_counts for term in counts)
+        n = len(documents)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in frequencies.items()}
+
+    def scores(self, query: List[str]) -> List[float]:
+        terms = [term for term in set(query) if term in self.idf]
+        scores = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+            scores.append(sum(
+                self.idf[term] * counts[term] * (self.k1 + 1) / (counts[term] + norm)
+                for term in terms if term in counts
+            ))
+        return scores
+
+
+Page = Union[str, Dict]
+
+
+def _page_content(page: Page, index: int):
+    """(source, markdown) of a Firecrawl result, or of plain text"""
+    if isinstance(page, str):
+        return f"page {index + 1}", page
+    metadata = page.get("metadata") or {}
+    source = metadata.get("sourceURL") or metadata.get("url") or page.get("url") or f"page {index + 1}"
+    return source, page.get("markdown") or page.get("content") or ""
+
+
+class ContentReducer:
+    """
+    Cuts scraped pages down to what a task needs before they reach the LLM:
+    boilerplate and navigation are stripped, passages repeated across pages
+    are dropped, the rest are ranked against the query with BM25 and the
+    best ones are kept up to a hard token budget. Kept passages are returned
+    in page order, under their source and heading.
+    """
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, max_chunk_words: int = MAX_CHUNK_WORDS,
+                 duplicate_threshold: float = DUPLICATE_THRESHOLD):
+        self.token_budget = token_budget
+        self.max_chunk_words = max_chunk_words
+        self.duplicate_threshold = duplicate_threshold
+        self.stats = {"calls": 0, "tokensIn": 0, "tokensOut": 0}
+        self._lock = threading.Lock()
+
+    def reduce(self, query: str, pages: Sequence[Page], token_budget: Optional[int] = None) -> Dict:
+        budget = self.token_budget if token_budget is None else token_budget
+        tokens_in, chunks, sources = 0, [], []
+        for i, page in enumerate(pages):
+            source, markdown = _page_content(page, i)
+            tokens_in += estimate_tokens(markdown)
+            sources.append(source)
+            chunks.extend(page_chunks(markdown, source, self.max_chunk_words))
+        extracted = len(chunks)
+        chunks = drop_duplicates(chunks, self.duplicate_threshold)
+        duplicates = extracted - len(chunks)
+
+        query_terms = tokenize(query or "")
+        if chunks and query_terms:
+            texts = [tokenize(chunk.text) for chunk in chunks]
+            ranking = BM25([tokenize(chunk.heading) + words for chunk, words in zip(chunks, texts)])
+            for chunk, score in zip(chunks, ranking.scores(query_terms)):
+                chunk.score = score
+            # The heading adds context but can't make a passage relevant on its own
+            wanted = set(query_terms)
+            candidates = sorted((chunk for chunk, words in zip(chunks, texts) if wanted.intersection(words)),
+                                key=lambda c: -c.score)
+        else:
+            candidates = list(chunks)
+
+        selected, used = [], 0
+        for chunk in candidates:
+            # Skip passages that don't fit but keep looking for smaller ones that do
+            cost = chunk.tokens + estimate_tokens(chunk.heading) + 2
+            if used + cost <= budget:
+                selected.append(chunk)
+                used += cost
+
+        content = self._render(selected, sources)
+        tokens_out = estimate_tokens(content)
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["tokensIn"] += tokens_in
+            self.stats["tokensOut"] += tokens_out
+        return {
+            "content": content,
+            "sources": sources,
+            "stats": {
+                "tokensIn": tokens_in,
+                "tokensOut": tokens_out,
+                "chunks": extracted,
+                "duplicates": duplicates,
+                "kept": len(selected)
+            }
+        }
+
+    def _render(self, chunks: List[Chunk], sources: List[str]) -> str:
+        by_source = defaultdict(list)
+        for chunk in chunks:
+            by_source[chunk.source].append(chunk)
+        sections = []
+        for source in sources:
+            kept = sorted(by_source.pop(source, []), key=lambda c: c.position)
+            if not kept:
+                continue
+            lines, heading = [f"Source: {source}"], None
+            for chunk in kept:
+                if chunk.heading and chunk.heading != heading:
+                    lines.append(f"## {chunk.heading}")
+                    heading = chunk.heading
+                lines.append(chunk.text)
+            sections.append("\n".join(lines))
+        return "\n\n".join(sections)
+
+    def compact_search(self, result: Dict, max_results: int = MAX_SEARCH_RESULTS) -> Dict:
+        """
+        Keeps the parts of a Serper response a prompt can use: the answer box,
+        knowledge graph description and the title, link, snippet and date of
+        the top organic results, minus near-duplicate snippets
+        """
+        compact = {}
+        for key, fields in (("answerBox", ("title", "answer", "snippet")),
+                            ("knowledgeGraph", ("title", "type", "description"))):
+            if isinstance(result.get(key), dict):
+                compact[key] = {field: result[key][field] for field in fields if result[key].get(field)}
+        organic, seen = [], []
+        for item in result.get("organic", []):
+            snippet = item.get("snippet", "")
+            shingles = _shingles(snippet)
+            if snippet and any(len(shingles & other) / len(shingles) >= self.duplicate_threshold for other in seen):
+                continue
+            seen.append(shingles)
+            organic.append({field: item[field] for field in ("title", "link", "snippet", "date") if item.get(field)})
+            if len(organic) >= max_results:
+                break
+        compact["organic"] = organic
+        return compact
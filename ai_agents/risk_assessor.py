@@ -1,13 +1,17 @@
 from crewai import Agent
-from serper_dev import SerperDev
-from firecrawl import Firecrawl
+from tools import VERBOSE, ToolRegistry, ask, get_registry
+from knowledge_base import IndustryKnowledgeBase, industry_context, load_research
 from typing import Dict, List
 from datetime import datetime
 
 class RiskAssessor:
-    def __init__(self):
-        self.serper = SerperDev()
-        self.firecrawl = Firecrawl()
+    # Knowledge base entry holding this analyzer's industry-wide research
+    KNOWLEDGE_KIND = "risks"
+
+    def __init__(self, tools: ToolRegistry = None, knowledge: IndustryKnowledgeBase = None):
+        self.tools = tools or get_registry()
+        # Industry research shared across startups; None researches inline on every run
+        self.knowledge = knowledge
         
     def create_agent(self) -> Agent:
         return Agent(
@@ -16,26 +20,42 @@ class RiskAssessor:
             backstory="""You are a risk assessment expert who specializes in 
             identifying and evaluating various types of risks in startup ventures, 
             including market risks, financial risks, and operational risks.""",
-            tools=[self.serper.search, self.firecrawl.scrape],
-            verbose=True
+            tools=self.tools.agent_tools(),
+            verbose=VERBOSE
         )
     
-    async def assess_risks(self, startup_data: Dict) -> Dict:
-        agent = self.create_agent()
+    async def research_industry(self, industry: str, agent: Agent = None) -> Dict:
+        """
+        Common risks of the industry, the same for every startup in the industry
+        """
+        agent = agent or self.create_agent()
         
         # Search for industry risks
-        industry_risks = await agent.execute(
-            f"Search for common risks and challenges in {startup_data['industry']} industry"
+        industry_risks = await ask(
+            agent,
+            f"Search for common risks and challenges in {industry} industry"
         )
         
         # Scrape risk assessment data
-        risk_data = await agent.execute(
-            f"Scrape risk assessment reports and case studies for {startup_data['industry']}"
+        risk_data = await ask(
+            agent,
+            f"Scrape risk assessment reports and case studies for {industry}"
         )
+
+        return {"industry_risks": industry_risks, "risk_data": risk_data}
+    
+    async def assess_risks(self, startup_data: Dict) -> Dict:
+        agent = self.create_agent()
+        industry = startup_data["industry"]
+        research = await load_research(self.knowledge, self.KNOWLEDGE_KIND, industry,
+                                       lambda: self.research_industry(industry, agent))
         
         # Generate risk analysis
-        analysis = await agent.execute(
-            f"""Based on the risk data, provide:
+        analysis = await ask(
+            agent,
+            f"""{industry_context(industry, research)}
+
+            Based on the risk data, provide:
             1. Key risk factors and their impact
             2. Risk mitigation strategies
             3. Risk score (0-1)
@@ -46,7 +66,7 @@ class RiskAssessor:
         return {
             "timestamp": datetime.now().isoformat(),
             "startup_name": startup_data["name"],
-            "industry_risks": industry_risks,
-            "risk_data": risk_data,
+            **research["value"],
+            "research_updated": datetime.fromtimestamp(research["updatedAt"]).isoformat(),
             "analysis_summary": analysis
         } 
\ No newline at end of file
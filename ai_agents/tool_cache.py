@@ -0,0 +1,128 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
+
+# Search results go stale faster than scraped pages, which can be revalidated
+DEFAULT_TTLS = {"search": 6 * 3600, "scrape": 24 * 3600}
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class ToolCache:
+    """
+    Persistent cache for search and scrape results backed by SQLite.
+
+    Entries expire after a per-kind TTL. The store is bounded by total payload
+    size, and the least recently used entries are evicted first. Scraped
+    pages keep the origin's ETag/Last-Modified so a stale entry can be
+    revalidated instead of scraped again.
+    """
+
+    def __init__(self, db_path: str = ":memory:", ttls: Optional[Dict[str, float]] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "evicted": 0, "deduped": 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS tool_cache (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS tool_cache_last_used ON tool_cache (last_used)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(kind: str, request: str) -> str:
+        normalized = " ".join(request.lower().split()) if kind == "search" else request.strip()
+        return hashlib.sha256(f"{kind}\x1f{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, kind: str, request: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Returns (value, None) for a fresh hit, (None, validators) for a stale
+        entry that can be revalidated, and (None, None) for a miss
+        """
+        key = self.make_key(kind, request)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, etag, last_modified, expires_at FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None, None
+            value, etag, last_modified, expires_at = row
+            self._db.execute("UPDATE tool_cache SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            if expires_at > now:
+                self.stats["hits"] += 1
+                return json.loads(value), None
+            self.stats["stale"] += 1
+            if etag or last_modified:
+                return None, {"etag": etag, "last_modified": last_modified}
+            return None, None
+
+    def set(self, kind: str, request: str, value: Dict,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        payload = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tool_cache "
+                "(key, kind, value, size, etag, last_modified, expires_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.make_key(kind, request), kind, payload, len(payload), etag,
+                 last_modified, now + self.ttls[kind], now)
+            )
+            self._evict()
+            self._db.commit()
+
+    def refresh(self, kind: str, request: str) -> Optional[Dict]:
+        """
+        Extends a stale entry's lifetime after the origin confirmed it is
+        unchanged, and returns its value
+        """
+        key = self.make_key(kind, request)
+        with self._lock:
+            self._db.execute(
+                "UPDATE tool_cache SET expires_at = ?, last_used = ? WHERE key = ?",
+                (time.time() + self.ttls[kind], time.time(), key)
+            )
+            self._db.commit()
+            row = self._db.execute("SELECT value FROM tool_cache WHERE key = ?", (key,)).fetchone()
+            self.stats["revalidated"] += 1
+        return json.loads(row[0]) if row else None
+
+    def record_dedupe(self):
+        with self._lock:
+            self.stats["deduped"] += 1
+
+    def hit_rate(self) -> float:
+        """
+        Share of lookups served without a new external call
+        """
+        with self._lock:
+            served = self.stats["hits"] + self.stats["revalidated"] + self.stats["deduped"]
+            lookups = self.stats["hits"] + self.stats["misses"] + self.stats["stale"] + self.stats["deduped"]
+        return served / lookups if lookups else 0.0
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM tool_cache").fetchone()[0]
+        while total > self.max_bytes:
+            row = self._db.execute(
+                "SELECT key, size FROM tool_cache ORDER BY last_used LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM tool_cache WHERE key = ?", (row[0],))
+            total -= row[1]
+            self.stats["evicted"] += 1
@@ -0,0 +1,260 @@
+import json
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from crewai.tools import BaseTool, tool
+from reduce import DEFAULT_TOKEN_BUDGET, ContentReducer
+from tool_cache import ToolCache
+
+SERPER_URL = "https://google.serper.dev/search"
+FIRECRAWL_URL = "https://api.firecrawl.dev/v1/scrape"
+
+# Requests per minute allowed per provider, and in flight across all providers
+DEFAULT_RATE_LIMITS = {"serper": 100, "firecrawl": 20}
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Set VERBOSE=false to silence the analyzers' per-step console output
+VERBOSE = os.getenv("VERBOSE", "true").strip().lower() not in ("0", "false", "no", "off")
+
+class RateLimiter:
+    """Token bucket allowing `per_minute` requests per minute across threads"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute / 60.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class ToolRegistry:
+    """
+    Search and scrape tools shared by every analyzer. Each provider gets one
+    pooled keep-alive HTTP session, requests are rate limited per provider,
+    and a global semaphore caps how many are in flight at once.
+
+    With a ToolCache, results are reused across runs, identical calls made
+    while one is already in flight wait for it instead of hitting the
+    provider again, and stale scraped pages are revalidated against the
+    origin with a conditional HEAD before being scraped again.
+
+    With a ContentReducer, search results are compacted and scrapes made
+    with a query are cut down to the passages relevant to it before they
+    reach the LLM. Raw results are what gets cached.
+    """
+
+    def __init__(self, serper_api_key: Optional[str] = None,
+                 firecrawl_api_key: Optional[str] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 serper_url: str = SERPER_URL,
+                 firecrawl_url: str = FIRECRAWL_URL,
+                 timeout: float = 30,
+                 cache: Optional[ToolCache] = None,
+                 reducer: Optional[ContentReducer] = None):
+        self.serper_url = serper_url
+        self.firecrawl_url = firecrawl_url
+        self.timeout = timeout
+        self.sessions = {
+            "serper": self._create_session(max_concurrency, {
+                "X-API-KEY": serper_api_key or os.getenv("SERPER_API_KEY", "")
+            }),
+            "firecrawl": self._create_session(max_concurrency, {
+                "Authorization": f"Bearer {firecrawl_api_key or os.getenv('FIRECRAWL_API_KEY', '')}"
+            })
+        }
+        limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self.limiters = {provider: RateLimiter(limits[provider]) for provider in self.sessions}
+        # Plain session for revalidating scraped pages against their origin
+        self.origin_session = self._create_session(max_concurrency, {})
+        self._in_flight = threading.BoundedSemaphore(max_concurrency)
+        self.cache = cache
+        self.reducer = reducer
+        self.max_concurrency = max_concurrency
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+
+    def _create_session(self, pool_size: int, headers: Dict) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(headers)
+        # Back off on 429/503 and honour Retry-After instead of failing the analyzer
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 503],
+                      allowed_methods=None, respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_size, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _post(self, provider: str, url: str, payload: Dict) -> Dict:
+        self.limiters[provider].acquire()
+        with self._in_flight:
+            response = self.sessions[provider].post(url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def search(self, query: str) -> Dict:
+        """Search the web with SerperDev"""
+        result = self._cached("search", query, lambda: (
+            self._post("serper", self.serper_url, {"q": query}), {}
+        ))
+        return self.reducer.compact_search(result) if self.reducer else result
+
+    def scrape(self, url: str, query: Optional[str] = None) -> Dict:
+        """
+        Scrape a page with Firecrawl, returning its markdown content. With a
+        query, only the passages most relevant to it are kept
+        """
+        page = self._scrape(url)
+        if not query or self.reducer is None:
+            return page
+        return {**page, "markdown": self.reducer.reduce(query, [page])["content"]}
+
+    def scrape_pages(self, urls: List[str], query: str) -> Dict:
+        """
+        Scrape several pages at once and keep the passages most relevant to
+        the query, without repeats across pages, within one token budget
+        """
+        def fetch(url):
+            try:
+                return self._scrape(url)
+            except requests.RequestException:
+                # One unreachable page shouldn't cost the others
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(urls), self.max_concurrency))) as pool:
+            pages = [page for page in pool.map(fetch, urls) if page is not None]
+        if self.reducer is None:
+            return {"pages": pages}
+        return self.reducer.reduce(query, pages)
+
+    def _scrape(self, url: str) -> Dict:
+        def fetch():
+            result = self._post("firecrawl", self.firecrawl_url, {"url": url, "formats": ["markdown"]})
+            return result.get("data", result), self._page_validators(url)
+        return self._cached("scrape", url, fetch, lambda validators: self._not_modified(url, validators))
+
+    def _cached(self, kind: str, request: str, fetch: Callable, revalidate: Callable = None) -> Dict:
+        """
+        Serves a call from the cache, from an identical call already in
+        flight, or by running fetch(), which returns (value, validators)
+        """
+        if self.cache is None:
+            return fetch()[0]
+
+        key = ToolCache.make_key(kind, request)
+        with self._pending_lock:
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = Future()
+        if not owner:
+            self.cache.record_dedupe()
+            return pending.result()
+
+        try:
+            value, validators = self.cache.get(kind, request)
+            if value is None and validators and revalidate and revalidate(validators):
+                value = self.cache.refresh(kind, request)
+            if value is None:
+                value, validators = fetch()
+                self.cache.set(kind, request, value, **validators)
+            pending.set_result(value)
+            return value
+        except Exception as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._pending_lock:
+                self._pending.pop(key, None)
+
+    def _page_validators(self, url: str) -> Dict:
+        """Best-effort ETag/Last-Modified of the origin page"""
+        try:
+            with self._in_flight:
+                response = self.origin_session.head(url, timeout=self.timeout, allow_redirects=True)
+        except requests.RequestException:
+            return {}
+        return {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+
+    def _not_modified(self, url: str, validators: Dict) -> bool:
+        """Asks the origin whether a cached page is still current"""
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        try:
+            with self._in_flight:
+                response = self.origin_session.head(url, headers=headers, timeout=self.timeout,
+                                                    allow_redirects=True)
+        except requests.RequestException:
+            return False
+        return response.status_code == 304
+
+    def agent_tools(self) -> List[BaseTool]:
+        """
+        The registry's search and scrape calls as crewai tools. Built per
+        agent, since crewai keeps usage counts on each tool instance
+        """
+        @tool("Search the web")
+        def search(query: str) -> str:
+            """Search the web with SerperDev and return the top results as JSON"""
+            return json.dumps(self.search(query))
+
+        @tool("Scrape a page")
+        def scrape(url: str, query: str = "") -> str:
+            """Scrape a web page as markdown, keeping only the passages relevant to the query if one is given"""
+            return json.dumps(self.scrape(url, query or None))
+
+        @tool("Scrape pages")
+        def scrape_pages(urls: List[str], query: str) -> str:
+            """Scrape several web pages and return the passages most relevant to the query"""
+            return json.dumps(self.scrape_pages(urls, query))
+
+        return [search, scrape, scrape_pages]
+
+    def close(self):
+        for session in [*self.sessions.values(), self.origin_session]:
+            session.close()
+
+async def ask(agent, prompt: str) -> str:
+    """Runs one prompt through a crewai agent and returns its answer"""
+    return (await agent.kickoff_async(prompt)).raw
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry() -> ToolRegistry:
+    """
+    Returns the process-wide tool registry, creating it on first use
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                # Set TOOL_CACHE_DB to keep search/scrape results across restarts
+                _registry = ToolRegistry(
+                    cache=ToolCache(os.getenv("TOOL_CACHE_DB", ":memory:")),
+                    reducer=ContentReducer(int(os.getenv("TOOL_TOKEN_BUDGET", str(DEFAULT_TOKEN_BUDGET))))
+                )
+    return _registry
@@ -1,179 +1,1139 @@
 import os
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew, Process, LLM
+from crewai.events import crewai_event_bus
 from crewai_tools import SerperDevTool
 import json
+import math
+import time
+import threading
+from functools import lru_cache
+from typing import Any
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+from cache import AnalysisCache, SingleFlight, make_key, normalize_idea
+from history import AnalysisHistory
+from governor import QuotaGovernor, QuotaWaitExceeded, RateLimiter, estimate_tokens, record_call, track, untrack
+from extract import ExtractionError, extract_json, model_from_schema, parse_structured, schema_from_example
+from similarity import IdeaIndex
+from tracing import VERBOSE, metrics, record_cache, tracer
 
 # Load environment variables
 load_dotenv()
 
-# Set environment variables
-os.environ["GEMINI_API_KEY"] = os.getenv("GEMINI_API_KEY")
+MODEL_NAME = "gemini/gemini-2.0-flash"
 
-# Initialize LLM
-llm = LLM(
-    model="gemini/gemini-2.0-flash"
+# Result sections, in the order their tasks are created
+SECTIONS = ["marketResearch", "teamResources", "swotAnalysis"]
+
+# Agent roles keyed by the name create_agents returns them under
+AGENT_ROLES = {
+    "researcher": "Market Research Analyst",
+    "strategist": "Business Strategist",
+    "team_advisor": "Team Building Consultant"
+}
+
+# Prompt templates for each section. They are hashed into the cache keys, so
+# editing one only invalidates the cached results for that section.
+TASK_TEMPLATES = {
+    "marketResearch": {
+        "agent": "researcher",
+        "description": """Analyze the following startup idea and provide detailed market research:
+            {startup_idea}
+            
+            Include:
+            1. Market size and growth potential
+            2. Key competitors and their strengths
+            3. Current market trends
+            4. Cite your sources""",
+        "expected_output": """JSON object with the following structure:
+            {
+                "marketSize": {"value": "string", "year": number, "cagr": "string"},
+                "competitors": [{"name": "string", "description": "string", "strengths": ["string"]}],
+                "trends": ["string"],
+                "sources": ["string"]
+            }"""
+    },
+    "teamResources": {
+        "agent": "team_advisor",
+        "description": """Based on this startup idea, recommend the essential team members needed:
+            {startup_idea}
+            
+            For each role, provide:
+            1. Role title
+            2. Key responsibilities
+            3. Required skills
+            4. Estimated salary range
+            5. Priority level (High/Medium/Low)""",
+        "expected_output": """JSON array with the following structure:
+            [{
+                "role": "string",
+                "description": "string",
+                "keySkills": ["string"],
+                "estimatedSalary": "string",
+                "priority": "string"
+            }]"""
+    },
+    "swotAnalysis": {
+        "agent": "strategist",
+        "description": """Conduct a SWOT analysis for this startup idea:
+            {startup_idea}""",
+        "expected_output": """JSON object with the following structure:
+            {
+                "strengths": ["string"],
+                "weaknesses": ["string"],
+                "opportunities": ["string"],
+                "threats": ["string"]
+            }"""
+    }
+}
+
+# Expected JSON shape of each section, read from the templates' expected_output
+SCHEMAS = {
+    section: schema_from_example(template["expected_output"])
+    for section, template in TASK_TEMPLATES.items()
+}
+
+# What each analysis detail level (Basic/Standard/Comprehensive in the app) runs:
+# - basic: every section from one schema-constrained LLM call without tools,
+#   with lists capped at BASIC_LIST_ITEMS items, for an answer in seconds
+# - standard: one task per section; the researcher searches the web
+# - comprehensive: every agent searches the web, and each section's crew first
+#   runs the section's RESEARCH_TEMPLATES task, whose notes the section builds on
+DETAIL_LEVELS = {
+    "basic": {"fused": True, "search": (), "research": False},
+    "standard": {"fused": False, "search": ("researcher",), "research": False},
+    "comprehensive": {"fused": False, "search": tuple(AGENT_ROLES), "research": True}
+}
+DEFAULT_DETAIL = "standard"
+
+RESEARCH_TEMPLATES = {
+    "marketResearch": """Search the web for facts about the market for this startup idea:
+            {startup_idea}
+            
+            Find recent market size estimates and growth rates, the main competitors
+            with what they offer, their pricing and funding, and the trends analysts
+            report. Note the URL of every source.""",
+    "teamResources": """Search the web for what it takes to build this startup:
+            {startup_idea}
+            
+            Find which roles comparable startups hired first, how their early teams
+            were structured, and current salary ranges for those roles. Note the URL
+            of every source.""",
+    "swotAnalysis": """Search the web for evidence to weigh this startup idea against:
+            {startup_idea}
+            
+            Find advantages incumbents lack, why similar startups failed, regulation
+            that applies, and market shifts that open or close opportunities. Note
+            the URL of every source."""
+}
+RESEARCH_OUTPUT = "Research notes as bullet points, each with the URL of its source"
+
+BASIC_LIST_ITEMS = 3
+BASIC_SECTIONS = {
+    "marketResearch": "market size and growth potential, key competitors and their strengths, "
+                      "current market trends and your sources",
+    "teamResources": "the essential team members, each with key responsibilities, required skills, "
+                     "an estimated salary range and a priority level (High/Medium/Low)",
+    "swotAnalysis": "a SWOT analysis"
+}
+BASIC_PROMPT = """Give a quick first analysis of this startup idea:
+{startup_idea}
+
+Reply with only one JSON object, without code fences or any other text, with these keys:
+{sections}
+
+Keep every list to at most {items} items and every description to one sentence."""
+
+# Short follow-up sent when a task's output cannot be used as-is. Only that
+# task is asked again, and only this many times.
+CORRECTION_ATTEMPTS = int(os.getenv("CORRECTION_ATTEMPTS", "1"))
+CORRECTION_PROMPT = """Your previous answer could not be used because:
+{problems}
+
+Reply with only the corrected JSON, without code fences or any other text.
+Expected format: {expected_output}
+
+Previous answer:
+{previous}"""
+
+def template_hash(section):
+    """Hash of a section's prompt template and expected output"""
+    template = TASK_TEMPLATES[section]
+    return make_key(template["agent"], template["description"], template["expected_output"])
+
+# Changes whenever any prompt template changes, so full cached results are not reused
+PROMPT_VERSION = make_key(*(template_hash(section) for section in SECTIONS))[:12]
+
+def check_detail(detail):
+    """Raise ValueError for a detail level that is not in DETAIL_LEVELS"""
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"Unknown detail level: {detail}")
+
+def detail_hash(detail):
+    """Hash of what a detail level runs beyond the section templates"""
+    level = DETAIL_LEVELS[detail]
+    parts = [detail, json.dumps(level, sort_keys=True)]
+    if level["fused"]:
+        parts += [BASIC_PROMPT, json.dumps(BASIC_SECTIONS), BASIC_LIST_ITEMS]
+    if level["research"]:
+        parts += [*RESEARCH_TEMPLATES.values(), RESEARCH_OUTPUT]
+    return make_key(*parts)
+
+@lru_cache(maxsize=None)
+def basic_answer_model(sections):
+    """Pydantic model of a Basic answer holding the given sections, to constrain the LLM to"""
+    return model_from_schema("BasicAnalysis", {section: SCHEMAS[section] for section in sections})
+
+def task_chain(task):
+    """A section task preceded by the research tasks it builds on (Comprehensive level)"""
+    context = task.context
+    return [*context, task] if isinstance(context, list) else [task]
+
+# Cache of finished analyses, shared by every workflow in this process.
+# Set ANALYSIS_CACHE_DB to also keep results on disk across restarts.
+analysis_cache = AnalysisCache(
+    max_entries=int(os.getenv("ANALYSIS_CACHE_SIZE", "256")),
+    ttl=int(os.getenv("ANALYSIS_CACHE_TTL", str(24 * 3600))),
+    db_path=os.getenv("ANALYSIS_CACHE_DB")
+)
+
+# Cache of individual parsed sections, keyed per task
+task_cache = AnalysisCache(
+    max_entries=int(os.getenv("ANALYSIS_CACHE_SIZE", "256")) * len(SECTIONS),
+    ttl=int(os.getenv("ANALYSIS_CACHE_TTL", str(24 * 3600))),
+    db_path=os.getenv("TASK_CACHE_DB")
+)
+
+# Search results shared by every analysis in the process.
+# Set SEARCH_CACHE_DB to also keep them on disk across restarts.
+search_cache = AnalysisCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", "1024")),
+    ttl=int(os.getenv("SEARCH_CACHE_TTL", str(6 * 3600))),
+    db_path=os.getenv("SEARCH_CACHE_DB"),
+    max_disk_entries=int(os.getenv("SEARCH_CACHE_DISK_SIZE", "100000"))
 )
+# Searches currently going to Serper, so identical concurrent queries send one request
+search_flights = SingleFlight()
+
+# Section tasks currently running, so identical concurrent analyses share them
+task_flights = SingleFlight()
+
+# Market research of past ideas, so rewordings of an idea can reuse it.
+# Similarity is the exact Jaccard similarity of the ideas' content words, with
+# plurals and common synonyms (professionals/workers, kit/delivery) folded. At
+# SIMILAR_IDEA_THRESHOLD the prior research is returned as is. Swapping one
+# word of an eight-word idea ("in Berlin" for "in Lagos") scores 7/9 = 0.78,
+# so the default only lets wording, word order and a dropped or added word
+# change. From SIMILAR_IDEA_SEED_THRESHOLD it is handed to the research task
+# as a starting point instead; at 0.7 the ideas differ in at most one detail,
+# while another product for the same audience and place scores about 0.6 and
+# is never seeded. "Meal kit for busy professionals" and "healthy meal delivery
+# for busy workers" score 0.8 and are seeded. Paraphrases sharing few words,
+# or synonyms outside similarity.py's short list, are not matched.
+# Set IDEA_INDEX_DB to keep the index across restarts.
+SIMILAR_IDEA_THRESHOLD = float(os.getenv("SIMILAR_IDEA_THRESHOLD", "0.85"))
+SIMILAR_IDEA_SEED_THRESHOLD = float(os.getenv("SIMILAR_IDEA_SEED_THRESHOLD", "0.7"))
+SEED_PROMPT = """
+
+Research on a similar idea ("{idea}") found the following. Use it as a
+starting point: keep what applies to this idea, correct what doesn't and
+fill in anything missing.
+{research}"""
+idea_index = IdeaIndex(
+    db_path=os.getenv("IDEA_INDEX_DB"),
+    version=make_key(template_hash("marketResearch"), MODEL_NAME)[:12],
+    max_age=int(os.getenv("IDEA_INDEX_MAX_AGE", str(30 * 24 * 3600)))
+)
+
+# LLM quota shared with every other process using the same LLM_QUOTA_DB, so
+# API and job workers together stay under LLM_RPM and LLM_TPM
+llm_governor = QuotaGovernor()
+# Rough size of what crewai wraps around a task prompt (role, output rules,
+# tool descriptions) and of one tool result, for estimating a task's tokens
+# before it has ever run
+AGENT_PROMPT_TOKENS = 400
+TOOL_RESULT_TOKENS = 800
+TOOL_STEPS = 2
+# Answers fill each list of expected_output with several items
+ANSWER_EXPANSION = 3
+
+# Every analysis this process finishes, written in batches by a background
+# thread. Set HISTORY_DB to choose the file (history.db by default)
+analysis_history = AnalysisHistory()
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool that reuses recent results for the same query
+
+    Identical queries that miss the cache at the same time share one
+    request. With a limiter, every request that reaches Serper waits for
+    it first.
+    """
+
+    # A governor.RateLimiter
+    limiter: Any = None
+
+    def _make_api_request(self, search_query, search_type):
+        key = make_key(normalize_idea(search_query), search_type, self.n_results,
+                       self.country, self.location, self.locale)
+        results = search_cache.get(key)
+        record_cache("search", results is not None)
+        if results is None:
+            results = search_flights.do(key, self._fetch, key, search_query, search_type)
+        return results
+
+    def _fetch(self, key, search_query, search_type):
+        # A flight that finished just before this one started has already cached the answer
+        results = search_cache.get(key)
+        if results is None:
+            if self.limiter is not None:
+                self.limiter.acquire()
+            results = super()._make_api_request(search_query, search_type)
+            search_cache.set(key, results)
+        return results
+
+# The LLM client and search tool are created on first use and shared by every
+# workflow in the process, so importing this module has no side effects
+_llm = None
+_search_tool = None
+_search_tool_ready = False
+_init_lock = threading.Lock()
+
+def get_llm():
+    """Return the shared LLM client, creating it on first use"""
+    global _llm
+    if _llm is None:
+        with _init_lock:
+            if _llm is None:
+                _llm = LLM(model=MODEL_NAME)
+    return _llm
+
+def get_search_tool():
+    """Return the shared search tool, or None if SERPER_API_KEY is not set"""
+    global _search_tool, _search_tool_ready
+    if not _search_tool_ready:
+        with _init_lock:
+            if not _search_tool_ready:
+                if os.getenv("SERPER_API_KEY"):
+                    # Set SEARCH_RPM to cap the Serper requests this process sends per minute
+                    search_rpm = float(os.getenv("SEARCH_RPM", "0"))
+                    _search_tool = CachedSerperDevTool(api_key=os.getenv("SERPER_API_KEY"),
+                                                       limiter=RateLimiter(search_rpm) if search_rpm > 0 else None)
+                _search_tool_ready = True
+    return _search_tool
+
+_trace_listeners_ready = False
+
+def install_trace_listeners():
+    """Turn crewai's LLM and tool events into spans under their task's span
+
+    crewai hands events to its own worker threads, so spans are parented
+    through the task id each event carries rather than the current context.
+    """
+    global _trace_listeners_ready
+    with _init_lock:
+        if _trace_listeners_ready:
+            return
+        _trace_listeners_ready = True
+
+    from crewai.events import (
+        crewai_event_bus, LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent,
+        ToolUsageFinishedEvent, ToolUsageErrorEvent
+    )
+    # Started and finished events may be handled in either order
+    pending_calls = {}
+    pending_lock = threading.Lock()
+
+    def pair_llm_event(event):
+        with pending_lock:
+            other = pending_calls.pop(event.call_id, None)
+            if other is None:
+                pending_calls[event.call_id] = event
+                return
+        started, finished = (other, event) if isinstance(other, LLMCallStartedEvent) else (event, other)
+        parent, attributes = tracer.linked(finished.task_id)
+        usage = getattr(finished, "usage", None) or {}
+        failed = isinstance(finished, LLMCallFailedEvent)
+        record_call(finished.task_id, usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0))
+        tracer.record(
+            finished.model or "llm", "llm",
+            started.timestamp.timestamp(), finished.timestamp.timestamp(), parent,
+            status="error" if failed else "ok", role=finished.agent_role,
+            promptTokens=usage.get("prompt_tokens", 0),
+            completionTokens=usage.get("completion_tokens", 0),
+            **({"error": finished.error} if failed else {}), **attributes
+        )
 
-# Initialize search tool if API key is available
-search_tool = None
-if os.getenv("SERPER_API_KEY"):
-    search_tool = SerperDevTool(api_key=os.getenv("SERPER_API_KEY"))
+    for event_type in (LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent):
+        crewai_event_bus.on(event_type)(lambda source, event: pair_llm_event(event))
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def on_tool_finished(source, event):
+        parent, attributes = tracer.linked(event.task_id)
+        tracer.record(
+            event.tool_name, "tool", event.started_at.timestamp(), event.finished_at.timestamp(),
+            parent, role=event.agent_role, cacheHit=event.from_cache,
+            retries=max(0, event.run_attempts - 1), **attributes
+        )
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def on_tool_error(source, event):
+        parent, attributes = tracer.linked(event.task_id)
+        at = event.timestamp.timestamp()
+        tracer.record(event.tool_name, "tool", at, at, parent, status="error",
+                      role=event.agent_role, error=str(event.error), **attributes)
+
+def task_output_text(output):
+    """Return the raw text of a task output"""
+    if hasattr(output, 'raw_output'):
+        return str(output.raw_output)
+    elif hasattr(output, 'raw'):
+        return str(output.raw)
+    elif isinstance(output, (dict, list)):
+        return json.dumps(output)
+    return str(output)
 
 def parse_task_output(output):
     """Parse task output into a dictionary"""
-    if hasattr(output, 'raw_output'):
-        try:
-            return json.loads(output.raw_output)
-        except json.JSONDecodeError:
-            return {"raw_response": output.raw_output}
-    elif isinstance(output, str):
-        try:
-            return json.loads(output)
-        except json.JSONDecodeError:
-            return {"raw_response": output}
-    elif isinstance(output, dict):
+    if isinstance(output, dict):
         return output
-    return {"raw_response": str(output)}
+    text = task_output_text(output)
+    try:
+        return extract_json(text)
+    except ExtractionError:
+        return {"raw_response": text}
+
+def is_parsed(section):
+    """Check whether a parsed section holds real data rather than a fallback"""
+    items = section if isinstance(section, list) else [section]
+    return all(
+        isinstance(item, dict) and "raw_response" not in item and "error" not in item
+        and "validationErrors" not in item
+        for item in items
+    )
+
+class AnalysisTimeout(Exception):
+    """Raised inside a task once the analysis deadline has passed"""
+
+def timeout_marker(section):
+    """Placeholder result for a section that did not finish before the deadline"""
+    marker = {"error": "Timed out before this section finished", "timedOut": True}
+    return [marker] if section == "teamResources" else marker
+
+def failure_marker(section, error):
+    """Placeholder result for a section whose task raised an error"""
+    marker = {"error": f"Could not complete {section}: {str(error)}"}
+    return [marker] if section == "teamResources" else marker
+
+def parse_section(section, output):
+    """Parse a task output for the given section; return (data, problems)
+
+    The JSON is pulled out of any surrounding prose or code fences and shaped
+    to the section's schema. problems lists what could not be repaired.
+    """
+    text = task_output_text(output)
+    data, problems = parse_structured(text, SCHEMAS[section])
+    if data is None:
+        data = {"raw_response": text}
+    # Team resources are always a list of roles
+    if section == "teamResources" and not isinstance(data, list):
+        data = [data]
+    return data, problems
+
+def flag_invalid(section, data, problems):
+    """Mark a section that still has problems so it is shown but never cached"""
+    items = data if isinstance(data, list) else [data]
+    if items and isinstance(items[0], dict) and "raw_response" not in items[0]:
+        items[0]["validationErrors"] = problems
+        return data
+    marker = {"error": f"Could not parse {section}: {'; '.join(problems)}"}
+    if items and isinstance(items[0], dict) and "raw_response" in items[0]:
+        marker["raw_response"] = items[0]["raw_response"]
+    return [marker] if section == "teamResources" else marker
 
 class StartupResearchWorkflow:
-    def __init__(self):
+    def __init__(self, cache=analysis_cache, task_cache=task_cache, flights=task_flights, ideas=idea_index,
+                 history=analysis_history, governor=llm_governor):
         """Initialize the startup research workflow"""
-        self.llm = llm
-        self.search_tool = search_tool
+        self._llm = None
+        self._search_tool = None
+        self._search_tool_set = False
+        self._local = threading.local()
+        self.cache = cache
+        self.task_cache = task_cache
+        self.flights = flights
+        self.ideas = ideas
+        self.history = history
+        self.governor = governor
+        install_trace_listeners()
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            self._llm = get_llm()
+        return self._llm
+
+    @llm.setter
+    def llm(self, value):
+        self._llm = value
+        self._local = threading.local()
+
+    @property
+    def search_tool(self):
+        if not self._search_tool_set:
+            return get_search_tool()
+        return self._search_tool
+
+    @search_tool.setter
+    def search_tool(self, value):
+        self._search_tool = value
+        self._search_tool_set = True
+        self._local = threading.local()
+
+    @property
+    def model_name(self):
+        """Model used for cache keys, without forcing the LLM client to load"""
+        if self._llm is None:
+            return MODEL_NAME
+        return getattr(self._llm, "model", MODEL_NAME)
+
+    def cache_key(self, startup_idea, detail=DEFAULT_DETAIL):
+        """Cache key for a full analysis of startup_idea at a detail level"""
+        if detail == DEFAULT_DETAIL:
+            return make_key(normalize_idea(startup_idea), self.model_name, PROMPT_VERSION)
+        return make_key(normalize_idea(startup_idea), self.model_name, PROMPT_VERSION, detail_hash(detail))
         
-    def create_agents(self):
-        """Create the agents for the workflow"""
-        tools = [self.search_tool] if self.search_tool else []
+    def create_agents(self, detail=DEFAULT_DETAIL):
+        """Create the agents for the workflow; the detail level decides which ones search"""
+        searchers = DETAIL_LEVELS[detail]["search"]
+
+        def tools(name):
+            return [self.search_tool] if self.search_tool and name in searchers else []
         
         researcher = Agent(
-            role='Market Research Analyst',
+            role=AGENT_ROLES["researcher"],
             goal='Conduct thorough market research and competitive analysis',
             backstory="""You are an experienced market research analyst with expertise in 
             startup ecosystems and industry analysis. You use data-driven approaches to 
             uncover market opportunities and challenges.""",
-            tools=tools,
+            tools=tools("researcher"),
             llm=self.llm,
-            verbose=True
+            verbose=VERBOSE
         )
 
         strategist = Agent(
-            role='Business Strategist',
+            role=AGENT_ROLES["strategist"],
             goal='Analyze business potential and provide strategic recommendations',
             backstory="""You are a seasoned business strategist who has helped numerous 
             startups succeed. You excel at identifying strengths, weaknesses, opportunities, 
             and threats.""",
+            tools=tools("strategist"),
             llm=self.llm,
-            verbose=True
+            verbose=VERBOSE
         )
 
         team_advisor = Agent(
-            role='Team Building Consultant',
+            role=AGENT_ROLES["team_advisor"],
             goal='Recommend optimal team structure and key roles',
             backstory="""You are an expert in startup team building and organizational 
             development. You help founders build effective teams by identifying crucial 
             roles and required skill sets.""",
+            tools=tools("team_advisor"),
             llm=self.llm,
-            verbose=True
+            verbose=VERBOSE
         )
         
         return researcher, strategist, team_advisor
+
+    def get_agents(self, detail=DEFAULT_DETAIL):
+        """Return this workflow's agents for a detail level, creating them on first use
+
+        Agents are reused across analyses. Crew runs mutate their agents, so
+        each calling thread keeps its own set and concurrent analyses never
+        share one. A run that abandons a task at its deadline drops the set
+        (see discard_agents), since the task may still be running on it.
+        """
+        agents = getattr(self._local, "agents", None)
+        if agents is None:
+            agents = self._local.agents = {}
+        if detail not in agents:
+            agents[detail] = self.create_agents(detail)
+        return agents[detail]
     
-    def create_tasks(self, agents, startup_idea):
-        """Create tasks for each agent based on the startup idea"""
-        researcher, strategist, team_advisor = agents
-        
-        research_task = Task(
-            description=f"""Analyze the following startup idea and provide detailed market research:
-            {startup_idea}
-            
-            Include:
-            1. Market size and growth potential
-            2. Key competitors and their strengths
-            3. Current market trends
-            4. Cite your sources""",
-            expected_output="""JSON object with the following structure:
-            {
-                "marketSize": {"value": "string", "year": number, "cagr": "string"},
-                "competitors": [{"name": "string", "description": "string", "strengths": ["string"]}],
-                "trends": ["string"],
-                "sources": ["string"]
-            }""",
-            agent=researcher
-        )
+    def discard_agents(self):
+        """Forget this thread's agents so the next analysis creates new ones"""
+        self._local.agents = None
 
-        team_task = Task(
-            description=f"""Based on this startup idea, recommend the essential team members needed:
-            {startup_idea}
-            
-            For each role, provide:
-            1. Role title
-            2. Key responsibilities
-            3. Required skills
-            4. Estimated salary range
-            5. Priority level (High/Medium/Low)""",
-            expected_output="""JSON array with the following structure:
-            [{
-                "role": "string",
-                "description": "string",
-                "keySkills": ["string"],
-                "estimatedSalary": "string",
-                "priority": "string"
-            }]""",
-            agent=team_advisor
-        )
+    def create_tasks(self, agents, startup_idea, detail=DEFAULT_DETAIL):
+        """Create tasks for each agent based on the startup idea
 
-        swot_task = Task(
-            description=f"""Conduct a SWOT analysis for this startup idea:
-            {startup_idea}""",
-            expected_output="""JSON object with the following structure:
-            {
-                "strengths": ["string"],
-                "weaknesses": ["string"],
-                "opportunities": ["string"],
-                "threats": ["string"]
-            }""",
-            agent=strategist
-        )
+        At the Comprehensive level each section task gets the section's
+        research task as context; task_chain returns both.
+        """
+        agents_by_name = dict(zip(AGENT_ROLES, agents))
+        research = DETAIL_LEVELS[detail]["research"]
         
-        return [research_task, team_task, swot_task]
+        tasks = []
+        for section in SECTIONS:
+            agent = agents_by_name[TASK_TEMPLATES[section]["agent"]]
+            context = {}
+            if research:
+                context["context"] = [Task(
+                    description=RESEARCH_TEMPLATES[section].format(startup_idea=startup_idea),
+                    expected_output=RESEARCH_OUTPUT,
+                    agent=agent
+                )]
+            tasks.append(Task(
+                description=TASK_TEMPLATES[section]["description"].format(startup_idea=startup_idea),
+                expected_output=TASK_TEMPLATES[section]["expected_output"],
+                agent=agent,
+                **context
+            ))
+        return tasks
+
+    def task_cache_key(self, startup_idea, section, detail=DEFAULT_DETAIL):
+        """Cache key for one section: template hash, agent role, idea hash, model and detail level"""
+        role = AGENT_ROLES[TASK_TEMPLATES[section]["agent"]]
+        idea_hash = make_key(normalize_idea(startup_idea))
+        if detail == DEFAULT_DETAIL:
+            return make_key(template_hash(section), role, idea_hash, self.model_name)
+        return make_key(template_hash(section), role, idea_hash, self.model_name, detail_hash(detail))
+
+    def invalidate_section(self, startup_idea, section):
+        """Forget one cached section, at every detail level, so the next run re-executes only that task"""
+        if section not in TASK_TEMPLATES:
+            raise ValueError(f"Unknown section: {section}")
+        for detail in DETAIL_LEVELS:
+            if self.task_cache is not None:
+                self.task_cache.invalidate(self.task_cache_key(startup_idea, section, detail))
+            if self.cache is not None:
+                self.cache.invalidate(self.cache_key(startup_idea, detail))
+        if section == "marketResearch" and self.ideas is not None:
+            self.ideas.remove(startup_idea)
     
-    def run_analysis(self, startup_idea):
-        """Run the complete analysis workflow"""
-        agents = self.create_agents()
-        tasks = self.create_tasks(agents, startup_idea)
-        
+    def run_task(self, task, deadline=None, section=None):
+        """Run a single task in its own crew and return the task output
+
+        With a deadline (a time.monotonic() value) the agent's execution time
+        is capped at the time remaining, and every agent step (LLM or tool
+        call) checks the deadline so an overrunning task stops early.
+
+        The task first waits for the LLM quota it is expected to use (see
+        estimate_task); that wait counts towards the deadline.
+        """
+        section = section or task.agent.role
+        reservation = self._reserve_quota([(section, task)], deadline)
+        finished = False
+        try:
+            # Agents are reused, so always reset the cap from a previous run
+            task.agent.max_execution_time = None
+            step_callback = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise AnalysisTimeout("Deadline passed before the task started")
+                task.agent.max_execution_time = max(1, math.ceil(remaining))
+                step_callback = self._deadline_callback(deadline)
+
+            tasks = task_chain(task)
+            crew = Crew(
+                agents=[task.agent],
+                tasks=tasks,
+                process=Process.sequential,
+                step_callback=step_callback,
+                verbose=VERBOSE
+            )
+            with tracer.span(section, "crew", role=task.agent.role, tasks=len(tasks)) as span:
+                # LLM and tool spans find their parent through the task id
+                for step in tasks:
+                    tracer.link(str(step.id), span, section=section)
+                crew.kickoff()
+            finished = True
+        finally:
+            self._settle_quota(reservation, [(section, task)], learn=finished)
+        return task.output
+
+    def estimate_task(self, task, section):
+        """LLM requests and tokens one task is expected to use, from its prompt template
+
+        Research tasks the task builds on (task_chain) count towards it. Once
+        tasks for the section have run, the governor's average of what they
+        really used replaces this guess.
+        """
+        agent = task.agent
+        chain = task_chain(task)
+        steps = TOOL_STEPS if agent.tools else 0
+        requests = tokens = 0
+        for step in chain:
+            prompt = AGENT_PROMPT_TOKENS + estimate_tokens(
+                agent.role + agent.goal + agent.backstory + step.description + step.expected_output)
+            # Every tool step sends the conversation so far again, with its result appended
+            requests += steps + 1
+            tokens += ((steps + 1) * prompt + TOOL_RESULT_TOKENS * steps * (steps + 1) // 2
+                       + ANSWER_EXPANSION * estimate_tokens(step.expected_output))
+        mode = "researched" if len(chain) > 1 else "tools" if steps else "plain"
+        key = f"{self.model_name}:{section}:{mode}"
+        return key, *self.governor.estimate(key, requests, tokens)
+
+    def _reserve_quota(self, pending, deadline=None):
+        """Wait for the LLM quota the (section, task) pairs are expected to use"""
+        if self.governor is None:
+            return None
+        estimates = [self.estimate_task(task, section) for section, task in pending]
+        max_wait = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            reservation = self.governor.reserve(
+                sum(requests for _, requests, _ in estimates), sum(tokens for _, _, tokens in estimates),
+                # Only a single task's usage is worth learning from
+                key=estimates[0][0] if len(estimates) == 1 else None, max_wait=max_wait
+            )
+        except QuotaWaitExceeded as e:
+            raise AnalysisTimeout(str(e)) from e
+        metrics.observe("startup_llm_quota_wait_seconds", reservation.wait,
+                        section=pending[0][0] if len(pending) == 1 else "sequential")
+        for _, task in pending:
+            for step in task_chain(task):
+                track(step.id, reservation)
+        return reservation
+
+    def _settle_quota(self, reservation, pending, learn=True):
+        """Give back the reserved quota the tasks didn't use"""
+        if reservation is None:
+            return
+        # LLM call events are handled on crewai's threads; let them be charged first
+        crewai_event_bus.flush(timeout=2)
+        for _, task in pending:
+            for step in task_chain(task):
+                untrack(step.id)
+        reservation.settle(learn=learn)
+
+    def _deadline_callback(self, deadline):
+        def check_deadline(step):
+            if time.monotonic() > deadline:
+                raise AnalysisTimeout("Analysis deadline exceeded")
+        return check_deadline
+
+    def run_analysis(self, startup_idea, parallel=True, max_workers=3, use_cache=True, timeout=None,
+                     detail=DEFAULT_DETAIL):
+        """Run the complete analysis workflow
+
+        The research, team and SWOT tasks only read the startup idea, so by
+        default each one runs in its own crew on a bounded thread pool and the
+        outputs are joined afterwards. Pass parallel=False to run them as one
+        sequential crew. detail picks one of DETAIL_LEVELS; at "basic" all
+        sections come from a single LLM call instead of crews.
+
+        Results are served from the cache when the same normalized idea was
+        already analyzed with the same model and prompts. Each section is also
+        cached on its own, so a rerun only executes the tasks whose template
+        changed or whose previous output could not be parsed. Only parsed
+        output is ever cached. Market research also comes from the idea
+        index when a reworded idea was already researched (see
+        SIMILAR_IDEA_THRESHOLD); such a section carries a "reusedFrom" key.
+        Analyses that were not served from the cache are recorded in the
+        history store.
+
+        With a timeout (seconds), tasks still running at the deadline are
+        abandoned and their sections come back as {"error": ..., "timedOut":
+        True} markers next to the sections that did finish. A task that fails
+        is reported the same way with an error marker.
+
+        In parallel mode, a task that an identical analysis (same normalized
+        idea, model and template) is already running is not started again;
+        this call waits for the running one and shares its output or error.
+        """
+        check_detail(detail)
+        use_cache = use_cache and self.cache is not None
+        with tracer.span("run_analysis", "analysis", model=self.model_name, parallel=parallel,
+                         detail=detail) as span:
+            cached = self._cached_result(startup_idea, detail) if use_cache else None
+            span.set(cacheHit=cached is not None)
+            if cached is not None:
+                return cached
+
+            results = {}
+            raw_outputs = []
+            deadline = time.monotonic() + timeout if timeout else None
+            if parallel:
+                sections = self._iter_sections(startup_idea, max_workers, use_cache, deadline, detail=detail)
+            else:
+                sections = self._run_sequential(startup_idea, use_cache, deadline, detail)
+            for section, data, raw_output in sections:
+                results[section] = data
+                if raw_output:
+                    raw_outputs.append(raw_output)
+
+            results = {section: results[section] for section in SECTIONS}
+            results["rawResults"] = "\n\n".join(raw_outputs)  # Include raw results for debugging
+            if use_cache:
+                self._store_result(startup_idea, results, detail)
+            self._record_history(startup_idea, results)
+            return results
+
+    def iter_analysis(self, startup_idea, max_workers=3, use_cache=True, timeout=None, detail=DEFAULT_DETAIL):
+        """Yield (section, result) pairs as soon as each task finishes
+
+        Cached sections are yielded first, then the remaining tasks in the order
+        they complete, so callers can render the first section without waiting
+        for the slowest one. Sections that miss the timeout are yielded last as
+        timeout markers, as in run_analysis, and the finished analysis is
+        recorded in the history store. At the "basic" detail level every
+        section arrives at once, from a single LLM call.
+        """
+        check_detail(detail)
+        use_cache = use_cache and self.cache is not None
+        # A generator can't hold the span current across its yields, so the
+        # span is passed to the task threads explicitly
+        span = tracer.start_span("iter_analysis", "analysis", model=self.model_name, detail=detail)
+        error = None
+        try:
+            cached = self._cached_result(startup_idea, detail) if use_cache else None
+            span.set(cacheHit=cached is not None)
+            if cached is not None:
+                for section in SECTIONS:
+                    yield section, cached[section]
+                return
+
+            deadline = time.monotonic() + timeout if timeout else None
+            results = {}
+            for section, data, _ in self._iter_sections(startup_idea, max_workers, use_cache,
+                                                        deadline, parent=span, detail=detail):
+                results[section] = data
+                yield section, data
+
+            results = {section: results[section] for section in SECTIONS}
+            results["rawResults"] = ""
+            if use_cache:
+                self._store_result(startup_idea, results, detail)
+            self._record_history(startup_idea, results)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            tracer.end_span(span, error)
+
+    def _cached_result(self, startup_idea, detail=DEFAULT_DETAIL):
+        cached = self.cache.get(self.cache_key(startup_idea, detail))
+        record_cache("analysis", cached is not None)
+        return cached
+
+    def _store_result(self, startup_idea, results, detail=DEFAULT_DETAIL):
+        if all(is_parsed(results[section]) for section in SECTIONS):
+            self.cache.set(self.cache_key(startup_idea, detail), results)
+
+    def _record_history(self, startup_idea, results):
+        if self.history is not None:
+            self.history.record(startup_idea, results)
+
+    def _cached_sections(self, startup_idea, use_cache, detail=DEFAULT_DETAIL):
+        """Sections of startup_idea already in the task cache at this detail level"""
+        cached_sections = {}
+        if not use_cache or self.task_cache is None:
+            return cached_sections
+        for section in SECTIONS:
+            cached = self.task_cache.get(self.task_cache_key(startup_idea, section, detail))
+            record_cache("task", cached is not None)
+            if cached is not None:
+                cached_sections[section] = cached
+        return cached_sections
+
+    def _pending_tasks(self, startup_idea, use_cache, detail=DEFAULT_DETAIL):
+        """Split the tasks into cached sections and (section, task) pairs still to run
+
+        Reworded ideas only reuse market research at the standard level, the
+        one the idea index is filled from.
+        """
+        agents = self.get_agents(detail)
+        tasks = self.create_tasks(agents, startup_idea, detail)
+
+        cached_sections = self._cached_sections(startup_idea, use_cache, detail)
+        pending = []
+        for section, task in zip(SECTIONS, tasks):
+            cached = cached_sections.get(section)
+            if cached is None and section == "marketResearch" and use_cache and detail == DEFAULT_DETAIL:
+                cached = self._similar_research(startup_idea, task)
+            if cached is not None:
+                cached_sections[section] = cached
+            else:
+                pending.append((section, task))
+        return cached_sections, pending
+
+    def _similar_research(self, startup_idea, task):
+        """Reuse the market research of a near-identical past idea, or seed the task with it
+
+        Returns the reused section, marked with the idea it came from, or
+        None when the research task still has to run.
+        """
+        if self.ideas is None:
+            return None
+        threshold = min(SIMILAR_IDEA_THRESHOLD, SIMILAR_IDEA_SEED_THRESHOLD)
+        try:
+            match = self.ideas.lookup(startup_idea, threshold)
+        except Exception as e:
+            # Reuse only saves work; the research task runs as if nothing matched
+            print(f"Error looking up similar ideas: {e}")
+            return None
+        reuse = match is not None and match["similarity"] >= SIMILAR_IDEA_THRESHOLD
+        record_cache("similar_idea", reuse)
+        if match is None:
+            return None
+        if reuse:
+            return {**match["value"], "reusedFrom": {"idea": match["idea"], "similarity": match["similarity"]}}
+        task.description += SEED_PROMPT.format(idea=match["idea"], research=json.dumps(match["value"]))
+        return None
+
+    def correct_section(self, section, previous, problems):
+        """Ask the LLM to fix one section's output and return its new answer"""
+        prompt = CORRECTION_PROMPT.format(
+            problems="\n".join(f"- {problem}" for problem in problems),
+            expected_output=" ".join(TASK_TEMPLATES[section]["expected_output"].split()),
+            previous=previous[:4000]
+        )
+        if self.governor is None:
+            return self.llm.call(prompt)
+        expected = estimate_tokens(prompt) + ANSWER_EXPANSION * estimate_tokens(TASK_TEMPLATES[section]["expected_output"])
+        with self.governor.reserve(1, expected) as reservation:
+            answer = self.llm.call(prompt)
+            reservation.consume(1, estimate_tokens(prompt) + estimate_tokens(answer))
+        return answer
+
+    def _finish_section(self, startup_idea, section, task, use_cache, deadline=None, detail=DEFAULT_DETAIL):
+        """Parse a finished task's output and cache it when it parsed cleanly
+
+        Output that cannot be repaired locally gets a short correction request
+        for this task alone, rather than a rerun of the crew.
+        """
+        return self._finish_output(startup_idea, section, task_output_text(task.output), use_cache,
+                                   deadline, detail)
+
+    def _finish_output(self, startup_idea, section, text, use_cache, deadline=None, detail=DEFAULT_DETAIL):
+        """Parse, correct if need be and cache one section's raw answer"""
+        data, problems = parse_section(section, text)
+        for _ in range(CORRECTION_ATTEMPTS):
+            if not problems or (deadline is not None and time.monotonic() > deadline):
+                break
+            try:
+                with tracer.span(section, "correction", section=section, retries=1,
+                                 problems=len(problems)):
+                    text = self.correct_section(section, text, problems)
+            except Exception as e:
+                print(f"Error correcting {section}: {e}")
+                break
+            corrected, still = parse_section(section, text)
+            if len(still) <= len(problems):
+                data, problems = corrected, still
+        if problems:
+            data = flag_invalid(section, data, problems)
+        if use_cache and self.task_cache is not None and is_parsed(data):
+            self.task_cache.set(self.task_cache_key(startup_idea, section, detail), data)
+        if (use_cache and section == "marketResearch" and detail == DEFAULT_DETAIL
+                and self.ideas is not None and is_parsed(data)):
+            try:
+                self.ideas.add(startup_idea, data)
+            except Exception as e:
+                print(f"Error indexing {startup_idea!r} for similar ideas: {e}")
+        return data
+
+    def _run_section(self, startup_idea, section, task, use_cache, deadline=None, detail=DEFAULT_DETAIL):
+        """Run one task and return (data, raw output)
+
+        Concurrent calls for the same section of the same idea share a single
+        run. If the shared run stopped at its caller's deadline, a waiter with
+        time left runs the task itself.
+        """
+        def run():
+            output = self.run_task(task, deadline, section)
+            return self._finish_section(startup_idea, section, task, use_cache, deadline, detail), str(output)
+
+        with tracer.span(section, "task", section=section, role=task.agent.role):
+            if self.flights is None:
+                return run()
+            return self.flights.do(self.task_cache_key(startup_idea, section, detail), run,
+                                   retry_on=(AnalysisTimeout, TimeoutError))
+
+    def _iter_sections(self, startup_idea, max_workers, use_cache, deadline=None, parent=None,
+                       detail=DEFAULT_DETAIL):
+        """Run the uncached tasks concurrently, yielding (section, data, raw) as each finishes"""
+        if DETAIL_LEVELS[detail]["fused"]:
+            yield from tracer.within(parent or tracer.current(), self._run_basic,
+                                     startup_idea, use_cache, deadline, detail)
+            return
+        cached_sections, pending = self._pending_tasks(startup_idea, use_cache, detail)
+        for section, data in cached_sections.items():
+            yield section, data, ""
+        if not pending:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        parent = parent or tracer.current()
+        futures = {
+            executor.submit(tracer.within, parent, self._run_section,
+                            startup_idea, section, task, use_cache, deadline, detail): section
+            for section, task in pending
+        }
+        remaining = None if deadline is None else max(0, deadline - time.monotonic())
+        try:
+            for future in as_completed(futures, timeout=remaining):
+                section = futures.pop(future)
+                try:
+                    data, raw_output = future.result()
+                except Exception as e:
+                    yield section, failure_marker(section, e), ""
+                    continue
+                yield section, data, raw_output
+        except FutureTimeout:
+            # Whatever is left missed the deadline and may still be running on this thread's agents
+            self.discard_agents()
+            for future, section in futures.items():
+                future.cancel()
+                yield section, timeout_marker(section), ""
+        finally:
+            # Don't wait for abandoned tasks; their deadline checks stop them
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_sequential(self, startup_idea, use_cache, deadline=None, detail=DEFAULT_DETAIL):
+        """Run the uncached tasks as one sequential crew"""
+        if DETAIL_LEVELS[detail]["fused"]:
+            return self._run_basic(startup_idea, use_cache, deadline, detail)
+        cached_sections, pending = self._pending_tasks(startup_idea, use_cache, detail)
+        sections = [(section, data, "") for section, data in cached_sections.items()]
+        if not pending:
+            return sections
+
+        try:
+            reservation = self._reserve_quota(pending, deadline)
+        except AnalysisTimeout:
+            return sections + [(section, timeout_marker(section), "") for section, _ in pending]
+        step_callback = None
+        for _, task in pending:
+            task.agent.max_execution_time = None
+            if deadline is not None:
+                task.agent.max_execution_time = max(1, math.ceil(deadline - time.monotonic()))
+        if deadline is not None:
+            step_callback = self._deadline_callback(deadline)
         crew = Crew(
-            agents=list(agents),
-            tasks=tasks,
+            agents=[task.agent for _, task in pending],
+            tasks=[step for _, task in pending for step in task_chain(task)],
             process=Process.sequential,
-            verbose=True
+            step_callback=step_callback,
+            verbose=VERBOSE
         )
-        
-        results = crew.kickoff()
-        
-        # Process results
+
+        raw_results = ""
+        span = tracer.start_span("sequential", "crew", sections=len(pending))
+        for section, task in pending:
+            for step in task_chain(task):
+                tracer.link(str(step.id), span, section=section)
+        executor = ThreadPoolExecutor(max_workers=1)
+        error = None
         try:
-            # Parse each task's output
-            market_research = parse_task_output(tasks[0].output)
-            team_resources = parse_task_output(tasks[1].output)
-            if not isinstance(team_resources, list):
-                team_resources = [team_resources]
-            swot_analysis = parse_task_output(tasks[2].output)
-            
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            raw_results = str(executor.submit(crew.kickoff).result(timeout=remaining))
+        except FutureTimeout as e:
+            # The crew keeps running on this thread's agents
+            self.discard_agents()
+            error = e
         except Exception as e:
-            print(f"Error processing results: {e}")
-            # Provide fallback values
-            market_research = {"error": f"Could not parse market research: {str(e)}"}
-            team_resources = [{"error": f"Could not parse team resources: {str(e)}"}]
-            swot_analysis = {"error": f"Could not parse SWOT analysis: {str(e)}"}
-        
-        return {
-            "marketResearch": market_research,
-            "teamResources": team_resources,
-            "swotAnalysis": swot_analysis,
-            "rawResults": str(results)  # Include raw results for debugging
-        }
+            # Deadline stops as well as task errors; tasks that finished keep their output
+            error = e
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            tracer.end_span(span, error)
+            self._settle_quota(reservation, pending, learn=False)
+
+        for index, (section, task) in enumerate(pending):
+            if task.output is None:
+                # Only reachable when the deadline or a task error cut the crew short
+                failed = error is not None and not isinstance(error, (FutureTimeout, AnalysisTimeout))
+                sections.append((section, failure_marker(section, error) if failed else timeout_marker(section), ""))
+                continue
+            data = self._finish_section(startup_idea, section, task, use_cache, deadline, detail)
+            # The crew output covers every task, so report it once
+            sections.append((section, data, raw_results if index == 0 else ""))
+        return sections
+
+    def basic_answer(self, startup_idea, sections, deadline=None):
+        """Ask for the given sections in one LLM call without tools and return its raw text
+
+        The answer is constrained to basic_answer_model(sections) where the
+        LLM supports it. The call first waits for its LLM quota, and raises
+        AnalysisTimeout when that wait or the call runs past the deadline.
+        """
+        prompt = BASIC_PROMPT.format(
+            startup_idea=startup_idea, items=BASIC_LIST_ITEMS,
+            sections="\n".join(
+                f'- "{section}": {BASIC_SECTIONS[section]}, as {json.dumps(SCHEMAS[section])}'
+                for section in sections
+            )
+        )
+        reservation = None
+        if self.governor is not None:
+            expected = estimate_tokens(prompt) + BASIC_LIST_ITEMS * sum(
+                estimate_tokens(TASK_TEMPLATES[section]["expected_output"]) for section in sections)
+            key = f"{self.model_name}:basic:{'+'.join(sections)}"
+            max_wait = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                reservation = self.governor.reserve(*self.governor.estimate(key, 1, expected), key=key,
+                                                    max_wait=max_wait)
+            except QuotaWaitExceeded as e:
+                raise AnalysisTimeout(str(e)) from e
+            metrics.observe("startup_llm_quota_wait_seconds", reservation.wait, section="basic")
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        answer = None
+        try:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            future = executor.submit(self.llm.call, prompt, response_model=basic_answer_model(tuple(sections)))
+            answer = future.result(timeout=remaining)
+        except FutureTimeout as e:
+            raise AnalysisTimeout("Analysis deadline exceeded") from e
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if reservation is not None:
+                if answer is not None:
+                    reservation.consume(1, estimate_tokens(prompt) + estimate_tokens(str(answer)))
+                reservation.settle(learn=answer is not None)
+        # Providers that validate against the model hand back an instance of it
+        return answer.model_dump_json() if hasattr(answer, "model_dump_json") else str(answer)
+
+    def _run_basic(self, startup_idea, use_cache, deadline=None, detail="basic"):
+        """Answer every uncached section from one basic_answer call; return (section, data, raw) tuples
+
+        Each section of the answer is then checked, corrected and cached on
+        its own, as a task's output would be. Identical concurrent analyses
+        share the call.
+        """
+        cached_sections = self._cached_sections(startup_idea, use_cache, detail)
+        sections = [(section, data, "") for section, data in cached_sections.items()]
+        missing = [section for section in SECTIONS if section not in cached_sections]
+        if not missing:
+            return sections
+
+        def run():
+            text = self.basic_answer(startup_idea, missing, deadline)
+            try:
+                answer = extract_json(text)
+            except ExtractionError:
+                answer = None
+            return [
+                (section, self._finish_output(
+                    startup_idea, section,
+                    # Without the section's key, let its parser report what is wrong with the whole answer
+                    json.dumps(answer[section]) if isinstance(answer, dict) and section in answer else text,
+                    use_cache, deadline, detail
+                ), text if index == 0 else "")
+                for index, section in enumerate(missing)
+            ]
+
+        try:
+            with tracer.span("basic", "task", sections=len(missing)):
+                if self.flights is None:
+                    return sections + run()
+                key = make_key(self.cache_key(startup_idea, detail), *missing)
+                return sections + self.flights.do(key, run, retry_on=(AnalysisTimeout, TimeoutError))
+        except AnalysisTimeout:
+            return sections + [(section, timeout_marker(section), "") for section in missing]
+        except Exception as e:
+            return sections + [(section, failure_marker(section, e), "") for section in missing]
 
 def format_json_for_display(json_data):
     """Format JSON data for better display in Streamlit"""
@@ -0,0 +1,320 @@
+import os
+import json
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Literal, Optional
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel, ConfigDict
+
+# Load environment variables
+load_dotenv()
+
+from Agents import StartupResearchWorkflow, analysis_history, llm_governor
+from jobs import FINISHED, CANCELLED, FAILED, JobQueue, WorkerPool
+from tracing import metrics, tracer
+
+# Crew runs are blocking, so they go to a bounded pool instead of the event loop
+MAX_CONCURRENT_ANALYSES = int(os.getenv("MAX_CONCURRENT_ANALYSES", "4"))
+# Seconds before unfinished sections are returned as timeout markers
+ANALYSIS_TIMEOUT = int(os.getenv("ANALYSIS_TIMEOUT", "240"))
+ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:8080").split(",")
+
+executor = ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_ANALYSES,
+    thread_name_prefix="analysis"
+)
+workflow = StartupResearchWorkflow()
+# Background jobs, opened on startup so importing the API never creates JOB_DB;
+# set JOB_WORKERS=0 and run `python jobs.py worker` to scale workers separately
+job_queue: Optional[JobQueue] = None
+worker_pool: Optional[WorkerPool] = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global job_queue, worker_pool
+    job_queue = JobQueue()
+    worker_pool = WorkerPool().start()
+    yield
+    worker_pool.stop()
+    analysis_history.close()
+
+
+app = FastAPI(title="Startup Analyzer API", lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=ALLOWED_ORIGINS,
+    allow_methods=["*"],
+    allow_headers=["*"]
+)
+
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    """Time every request by route template, so ideas don't become label values"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.observe(
+            "startup_http_request_duration_seconds", time.perf_counter() - start,
+            route=getattr(route, "path", "unmatched"), method=request.method, status=status
+        )
+
+
+# "basic" answers from one LLM call in seconds; see DETAIL_LEVELS in Agents.py
+Detail = Literal["basic", "standard", "comprehensive"]
+
+
+class AnalyzeRequest(BaseModel):
+    idea: str
+    detail: Detail = "standard"
+
+
+class JobRequest(BaseModel):
+    idea: str
+    timeout: Optional[int] = None
+    detail: Detail = "standard"
+
+
+class InvalidateRequest(BaseModel):
+    idea: str
+    section: str
+
+
+# Response models mirror src/types/analysis.ts. Extra keys are kept so that
+# unparsed or error sections still reach the client instead of failing validation.
+class Section(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+class MarketSize(Section):
+    value: Optional[str] = None
+    year: Optional[int] = None
+    cagr: Optional[str] = None
+
+
+class Competitor(Section):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    strengths: List[str] = []
+
+
+class MarketResearch(Section):
+    competitors: List[Competitor] = []
+    trends: List[str] = []
+    marketSize: Optional[MarketSize] = None
+    sources: List[str] = []
+
+
+class TeamResource(Section):
+    role: Optional[str] = None
+    description: Optional[str] = None
+    keySkills: List[str] = []
+    estimatedSalary: Optional[str] = None
+    priority: Optional[str] = None
+
+
+class SwotAnalysis(Section):
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+    opportunities: List[str] = []
+    threats: List[str] = []
+
+
+class AnalysisResponse(BaseModel):
+    marketResearch: MarketResearch
+    teamResources: List[TeamResource]
+    swotAnalysis: SwotAnalysis
+
+
+async def run_in_executor(fn, *args):
+    """Run a blocking call on the analysis pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, fn, *args)
+
+
+@app.post("/api/analyze", response_model=AnalysisResponse)
+async def analyze(request: AnalyzeRequest):
+    """Analyze a startup idea with the research crew"""
+    idea = request.idea.strip()
+    if not idea:
+        raise HTTPException(status_code=400, detail="Please provide a startup idea to analyze")
+
+    try:
+        results = await run_in_executor(partial(workflow.run_analysis, idea, timeout=ANALYSIS_TIMEOUT,
+                                                detail=request.detail))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+    return results
+
+
+async def stream_sections(idea, detail="standard"):
+    """Yield NDJSON lines, one per section, as the workflow finishes them
+
+    The whole analysis runs on one slot of the analysis pool and hands each
+    section back to the event loop through a queue.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def produce():
+        try:
+            for section, data in workflow.iter_analysis(idea, timeout=ANALYSIS_TIMEOUT, detail=detail):
+                loop.call_soon_threadsafe(queue.put_nowait, {"section": section, "data": data})
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, {"error": f"Analysis failed: {str(e)}"})
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    producer = loop.run_in_executor(executor, produce)
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        yield json.dumps(item) + "\n"
+    await producer
+
+
+@app.post("/api/analyze/stream")
+async def analyze_stream(request: AnalyzeRequest):
+    """Stream each analysis section as newline-delimited JSON when it is ready"""
+    idea = request.idea.strip()
+    if not idea:
+        raise HTTPException(status_code=400, detail="Please provide a startup idea to analyze")
+    return StreamingResponse(stream_sections(idea, request.detail), media_type="application/x-ndjson")
+
+
+@app.post("/api/analyze/invalidate")
+async def invalidate(request: InvalidateRequest):
+    """Drop one cached section so the next analysis re-runs only that task"""
+    try:
+        workflow.invalidate_section(request.idea, request.section)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"invalidated": request.section}
+
+
+# Job endpoints are plain functions so FastAPI runs their SQLite calls off the event loop
+@app.post("/api/jobs", status_code=202)
+def submit_job(request: JobRequest):
+    """Queue an analysis and return its job id at once; poll GET /api/jobs/{id}"""
+    idea = request.idea.strip()
+    if not idea:
+        raise HTTPException(status_code=400, detail="Please provide a startup idea to analyze")
+    return job_queue.submit(idea, timeout=request.timeout or ANALYSIS_TIMEOUT, detail=request.detail)
+
+
+@app.get("/api/jobs")
+def list_jobs(status: Optional[str] = None, limit: int = 50):
+    """The newest jobs without their results, plus counts per status"""
+    return {"stats": job_queue.stats(), "jobs": job_queue.list(status, limit)}
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    """A job's status, with the sections finished so far or its final result"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Cancel a queued job, or ask the worker running it to stop"""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] in FINISHED and job["status"] != CANCELLED:
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    return job
+
+
+@app.post("/api/jobs/{job_id}/retry")
+def retry_job(job_id: str):
+    """Queue a failed or cancelled job again"""
+    job = job_queue.get(job_id, with_result=False)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] not in (FAILED, CANCELLED):
+        raise HTTPException(status_code=409, detail=f"Only failed or cancelled jobs can be retried, not {job['status']}")
+    return job_queue.retry(job_id)
+
+
+# History endpoints are plain functions too; pass "next" back as cursor for the following page
+@app.get("/api/history")
+def list_history(idea: Optional[str] = None, industry: Optional[str] = None, order: str = "createdAt",
+                 descending: bool = True, limit: int = 50, cursor: Optional[str] = None):
+    """Past analyses without their results, filtered by idea or industry and ordered by time or a score"""
+    try:
+        return analysis_history.list(idea, industry, order, descending, min(limit, 500), cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/history/search")
+def search_history(q: str, field: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None):
+    """Past analyses whose idea or competitor names contain every word of q"""
+    try:
+        return analysis_history.search(q, field, min(limit, 500), cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/history/compare")
+def compare_history(left: int, right: int):
+    """Two past analyses side by side, with their score and competitor differences"""
+    comparison = analysis_history.compare(left, right)
+    if comparison is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return comparison
+
+
+@app.get("/api/history/{analysis_id}")
+def get_history(analysis_id: int):
+    """One past analysis with its full result"""
+    analysis = analysis_history.get(analysis_id)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return analysis
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Latency histograms and counters in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/quota")
+def quota_report(window: int = 60):
+    """LLM quota use across every process sharing LLM_QUOTA_DB, and queueing in this one"""
+    return llm_governor.report(window)
+
+
+@app.get("/api/traces")
+async def recent_spans(limit: int = 200, kind: Optional[str] = None):
+    """The most recent finished spans, newest last"""
+    spans = [span for span in list(tracer.spans) if kind is None or span.kind == kind]
+    return {"spans": [span.to_dict() for span in spans[-limit:]]}
+
+
+@app.get("/api/health")
+async def health():
+    return {"status": "ok"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", "8000")))
@@ -1,6 +1,7 @@
 import os
 import sys
 import json
+import time
 import traceback
 import streamlit as st
 from dotenv import load_dotenv
@@ -8,8 +9,25 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Import the market research workflow
-from Agents import StartupResearchWorkflow, format_json_for_display
+# Analyses run as background jobs on worker processes
+from Agents import format_json_for_display
+from jobs import FINISHED, JobQueue, WorkerPool
+
+# Result tabs, in display order
+SECTION_TABS = {
+    "marketResearch": "📊 Market Research",
+    "teamResources": "👥 Team Resources",
+    "swotAnalysis": "📈 SWOT Analysis"
+}
+
+@st.cache_resource
+def get_job_queue():
+    return JobQueue()
+
+@st.cache_resource
+def start_workers():
+    """Worker processes for this server; JOB_WORKERS=0 when they run on their own"""
+    return WorkerPool().start()
 
 def main():
     st.set_page_config(
@@ -28,13 +46,16 @@ def main():
     
     if not os.getenv("SERPER_API_KEY"):
         st.warning("⚠️ Serper API key not found. The search tool will be disabled. Set SERPER_API_KEY in your .env file for enhanced research capabilities.")
+
+    start_workers()
     
     # Sidebar configuration
     st.sidebar.header("Configuration")
     analysis_detail = st.sidebar.radio(
         "Analysis Detail Level",
         ["Basic", "Standard", "Comprehensive"],
-        index=1
+        index=1,
+        help="Basic answers in seconds from a single model call; Comprehensive searches the web for every section"
     )
     
     # Main input area
@@ -53,175 +74,284 @@ def main():
             if not startup_idea:
                 st.error("Please enter a startup idea to analyze")
             else:
-                run_analysis(startup_idea, analysis_detail)
+                start_analysis(startup_idea, analysis_detail)
+        elif "job" in st.query_params:
+            # Reruns (widget changes, refreshes) show the stored results instead of fetching them again
+            analysis = st.session_state.get("analysis")
+            if analysis and analysis["jobId"] == st.query_params["job"]:
+                show_analysis(analysis)
+            else:
+                follow_job(st.query_params["job"])
 
     # Footer
     st.sidebar.markdown("---")
+    job_stats = get_job_queue().stats()
+    st.sidebar.caption(f"Jobs: {job_stats['queued']} queued / {job_stats['running']} running")
     st.sidebar.info("This tool uses AI agents to analyze startup ideas. The analysis includes market research, team recommendations, and SWOT analysis.")
 
-def run_analysis(startup_idea, detail_level):
-    """Run the startup idea analysis with CrewAI agents"""
+def start_analysis(startup_idea, detail_level):
+    """Queue the analysis as a background job and follow it"""
+    # Analysis timeout based on detail level
+    timeout_map = {"Basic": 120, "Standard": 240, "Comprehensive": 360}
+    job = get_job_queue().submit(startup_idea, timeout=timeout_map.get(detail_level, 240),
+                                 detail=detail_level.lower())
+    # Keep the job in the URL so a refresh picks it back up instead of starting over
+    st.query_params["job"] = job["id"]
+    follow_job(job["id"])
+
+def follow_job(job_id):
+    """Render a job's sections as its worker finishes them, until the job is done"""
     try:
+        queue = get_job_queue()
+        job = queue.get(job_id)
+        if job is None:
+            st.warning("This analysis is no longer available. Please run it again.")
+            del st.query_params["job"]
+            return
+
+        if job["status"] not in FINISHED and st.button("Cancel analysis"):
+            job = queue.cancel(job_id)
+
         analysis_start = st.empty()
         analysis_start.info("🔍 Starting analysis... This may take several minutes depending on the detail level.")
-        
         progress_bar = st.progress(0)
         status_text = st.empty()
-        
-        # Initialize the workflow
-        status_text.text("Initializing AI agents...")
-        progress_bar.progress(10)
-        workflow = StartupResearchWorkflow()
-        
-        # Run the analysis
-        status_text.text("Conducting market research and competitive analysis...")
-        progress_bar.progress(30)
-        
-        # Analysis timeout based on detail level
-        timeout_map = {"Basic": 120, "Standard": 240, "Comprehensive": 360}
-        timeout = timeout_map.get(detail_level, 240)
-        
-        results = workflow.run_analysis(startup_idea)
-        progress_bar.progress(100)
-        status_text.text("Analysis complete!")
-        analysis_start.success("✅ Analysis completed successfully!")
-        
-        # Display results
-        display_results(results)
-        
+
+        # Render each section as soon as its task finishes
+        placeholders = create_result_tabs()
+        rendered = set()
+        while True:
+            results = job.get("result") or {}
+            for section in SECTION_TABS:
+                if section not in rendered and results.get(section) is not None:
+                    render_section(placeholders[section], section, results[section])
+                    rendered.add(section)
+            progress_bar.progress(10 + 90 * len(rendered) // len(SECTION_TABS))
+            if job["status"] in FINISHED:
+                break
+            if job["status"] == "queued":
+                status_text.text("Waiting for a free analysis worker...")
+            else:
+                status_text.text(f"Finished {len(rendered)} of {len(SECTION_TABS)} sections...")
+            time.sleep(1)
+            job = queue.get(job_id)
+
+        results = {section: data for section, data in results.items() if section in SECTION_TABS}
+        # Kept for the rest of the session, so later reruns never refetch or recompute them
+        analysis = st.session_state["analysis"] = {
+            "jobId": job_id,
+            "status": job["status"],
+            "error": job["error"],
+            "timeout": job["timeout"],
+            "results": results
+        }
+        status_text.text({"cancelled": "Analysis cancelled", "failed": "Analysis failed"}.get(
+            job["status"], "Analysis complete!"))
+        show_outcome(analysis_start, analysis)
+
+        # Advanced: Raw data viewing for debugging
+        with st.expander("View Raw Response Data"):
+            st.json(results)
+
     except Exception as e:
         st.error(f"An error occurred during analysis: {str(e)}")
         st.error(traceback.format_exc())
 
+def show_outcome(placeholder, analysis):
+    """Show how a finished analysis ended"""
+    if analysis["status"] == "cancelled":
+        placeholder.warning("⏹️ Analysis cancelled.")
+    elif analysis["status"] == "failed":
+        placeholder.error(f"An error occurred during analysis: {analysis['error']}")
+    else:
+        timed_out = [SECTION_TABS[section] for section, data in analysis["results"].items() if is_timed_out(data)]
+        if timed_out:
+            placeholder.warning(f"⏱️ Analysis hit the {analysis['timeout']}s limit before finishing: {', '.join(timed_out)}")
+        else:
+            placeholder.success("✅ Analysis completed successfully!")
+
+def show_analysis(analysis):
+    """Render a finished analysis kept in the session"""
+    show_outcome(st.empty(), analysis)
+    display_results(analysis["results"])
+
+def is_timed_out(data):
+    """Check whether a section came back as a timeout marker"""
+    items = data if isinstance(data, list) else [data]
+    return any(isinstance(item, dict) and item.get("timedOut") for item in items)
+
+def create_result_tabs():
+    """Create a tab per section, each holding a placeholder to render into"""
+    tabs = st.tabs(list(SECTION_TABS.values()))
+    placeholders = {}
+    for section, tab in zip(SECTION_TABS, tabs):
+        with tab:
+            placeholders[section] = st.empty()
+            placeholders[section].info("⏳ Waiting for this section...")
+    return placeholders
+
+def render_section(placeholder, section, data):
+    """Replace a section's placeholder with its rendered results"""
+    renderers = {
+        "marketResearch": render_market_research,
+        "teamResources": render_team_resources,
+        "swotAnalysis": render_swot_analysis
+    }
+    with placeholder.container():
+        items = data if isinstance(data, list) else [data]
+        problems = items[0].get("validationErrors") if items and isinstance(items[0], dict) else None
+        if problems:
+            st.warning(f"⚠️ Parts of this section could not be read: {'; '.join(problems)}")
+        renderers[section](data)
+
 def display_results(results):
     """Display the analysis results in a structured format"""
     # Create tabs for different sections
-    tab1, tab2, tab3 = st.tabs(["📊 Market Research", "👥 Team Resources", "📈 SWOT Analysis"])
+    placeholders = create_result_tabs()
+    for section in SECTION_TABS:
+        if results.get(section) is None:
+            # Cancelled or failed before this section finished
+            placeholders[section].info("This section was not completed.")
+        else:
+            render_section(placeholders[section], section, results[section])
     
-    with tab1:
-        st.header("Market Research")
-        market_data = results.get("marketResearch", {})
-        
-        # Market size
-        if "marketSize" in market_data:
-            market_size = market_data["marketSize"]
-            st.subheader("Market Size")
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Market Value", market_size.get("value", "N/A"))
-            with col2:
-                st.metric("Year", market_size.get("year", "N/A"))
-            with col3:
-                st.metric("CAGR", market_size.get("cagr", "N/A"))
-                
-        # Competitors
-        if "competitors" in market_data:
-            st.subheader("Key Competitors")
-            for i, competitor in enumerate(market_data["competitors"]):
-                with st.expander(f"{competitor.get('name', f'Competitor {i+1}')}"):
-                    st.write(competitor.get('description', 'No description available'))
-                    st.subheader("Strengths")
-                    strengths = competitor.get('strengths', [])
-                    if strengths:
-                        for strength in strengths:
-                            st.markdown(f"- {strength}")
-                    else:
-                        st.write("No strengths listed")
-        
-        # Trends
-        if "trends" in market_data:
-            st.subheader("Current Market Trends")
-            for trend in market_data["trends"]:
-                st.markdown(f"- {trend}")
-                
-        # Sources
-        if "sources" in market_data:
-            st.subheader("Sources")
-            for source in market_data["sources"]:
-                st.markdown(f"- {source}")
-                
-        # If we have error data instead
-        if "error" in market_data:
-            st.error(market_data["error"])
-            st.json(market_data)
+    # Advanced: Raw data viewing for debugging
+    with st.expander("View Raw Response Data"):
+        st.json(results)
+
+def render_market_research(market_data):
+    """Render the market research section"""
+    st.header("Market Research")
+    market_data = market_data or {}
+    if "reusedFrom" in market_data:
+        source = market_data["reusedFrom"]
+        st.caption(f"Reused from the research on a similar idea: \"{source.get('idea')}\" "
+                   f"(similarity {source.get('similarity', 0):.0%})")
     
-    with tab2:
-        st.header("Recommended Team Structure")
-        team_data = results.get("teamResources", [])
-        
-        if isinstance(team_data, list) and len(team_data) > 0:
-            # Create columns for filtering
-            col1, col2 = st.columns(2)
-            with col1:
-                priority_filter = st.multiselect(
-                    "Filter by Priority",
-                    ["High", "Medium", "Low"],
-                    default=["High", "Medium", "Low"]
-                )
+    # Market size
+    if "marketSize" in market_data:
+        market_size = market_data["marketSize"]
+        st.subheader("Market Size")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Market Value", market_size.get("value", "N/A"))
+        with col2:
+            st.metric("Year", market_size.get("year", "N/A"))
+        with col3:
+            st.metric("CAGR", market_size.get("cagr", "N/A"))
             
-            # Display team members in cards
-            for role in team_data:
-                # Skip if doesn't match filter
-                if "priority" in role and role["priority"] not in priority_filter:
-                    continue
-                    
-                with st.expander(f"{role.get('role', 'Team Member')} ({role.get('priority', 'N/A')} Priority)"):
-                    st.write(role.get('description', 'No description available'))
-                    
-                    st.subheader("Key Skills")
-                    skills = role.get('keySkills', [])
-                    if skills:
-                        for skill in skills:
-                            st.markdown(f"- {skill}")
-                    else:
-                        st.write("No skills listed")
-                        
-                    st.metric("Estimated Salary", role.get('estimatedSalary', 'N/A'))
-        else:
-            if isinstance(team_data, list) and "error" in team_data[0]:
-                st.error(team_data[0]["error"])
-            st.json(team_data)
+    # Competitors
+    if "competitors" in market_data:
+        st.subheader("Key Competitors")
+        for i, competitor in enumerate(market_data["competitors"]):
+            with st.expander(f"{competitor.get('name', f'Competitor {i+1}')}"):
+                st.write(competitor.get('description', 'No description available'))
+                st.subheader("Strengths")
+                strengths = competitor.get('strengths', [])
+                if strengths:
+                    for strength in strengths:
+                        st.markdown(f"- {strength}")
+                else:
+                    st.write("No strengths listed")
     
-    with tab3:
-        st.header("SWOT Analysis")
-        swot_data = results.get("swotAnalysis", {})
-        
-        if not "error" in swot_data:
-            # Create a 2x2 grid for SWOT
-            col1, col2 = st.columns(2)
+    # Trends
+    if "trends" in market_data:
+        st.subheader("Current Market Trends")
+        for trend in market_data["trends"]:
+            st.markdown(f"- {trend}")
             
-            with col1:
-                # Strengths
-                st.subheader("💪 Strengths")
-                strengths = swot_data.get("strengths", [])
-                for strength in strengths:
-                    st.success(f"✓ {strength}")
-                    
-                # Weaknesses
-                st.subheader("🔍 Weaknesses")
-                weaknesses = swot_data.get("weaknesses", [])
-                for weakness in weaknesses:
-                    st.error(f"✗ {weakness}")
+    # Sources
+    if "sources" in market_data:
+        st.subheader("Sources")
+        for source in market_data["sources"]:
+            st.markdown(f"- {source}")
             
-            with col2:
-                # Opportunities
-                st.subheader("🚀 Opportunities")
-                opportunities = swot_data.get("opportunities", [])
-                for opportunity in opportunities:
-                    st.info(f"➤ {opportunity}")
+    # If we have error data instead
+    if "error" in market_data:
+        st.error(market_data["error"])
+        st.json(market_data)
+
+@st.fragment
+def render_team_resources(team_data):
+    """Render the recommended team section
+
+    A fragment, so changing the priority filter reruns only this function
+    rather than the whole script.
+    """
+    st.header("Recommended Team Structure")
+    team_data = team_data or []
+    
+    if isinstance(team_data, list) and len(team_data) > 0:
+        # Create columns for filtering
+        col1, col2 = st.columns(2)
+        with col1:
+            priority_filter = st.multiselect(
+                "Filter by Priority",
+                ["High", "Medium", "Low"],
+                default=["High", "Medium", "Low"],
+                key="team_priority_filter"
+            )
+        
+        # Display team members in cards
+        for role in team_data:
+            # Skip if doesn't match filter
+            if "priority" in role and role["priority"] not in priority_filter:
+                continue
                 
-                # Threats
-                st.subheader("⚠️ Threats")
-                threats = swot_data.get("threats", [])
-                for threat in threats:
-                    st.warning(f"! {threat}")
-        else:
-            st.error(swot_data["error"])
-            st.json(swot_data)
+            with st.expander(f"{role.get('role', 'Team Member')} ({role.get('priority', 'N/A')} Priority)"):
+                st.write(role.get('description', 'No description available'))
+                
+                st.subheader("Key Skills")
+                skills = role.get('keySkills', [])
+                if skills:
+                    for skill in skills:
+                        st.markdown(f"- {skill}")
+                else:
+                    st.write("No skills listed")
+                    
+                st.metric("Estimated Salary", role.get('estimatedSalary', 'N/A'))
+    else:
+        if isinstance(team_data, list) and "error" in team_data[0]:
+            st.error(team_data[0]["error"])
+        st.json(team_data)
+
+def render_swot_analysis(swot_data):
+    """Render the SWOT analysis section"""
+    st.header("SWOT Analysis")
+    swot_data = swot_data or {}
     
-    # Advanced: Raw data viewing for debugging
-    with st.expander("View Raw Response Data"):
-        st.json(results)
+    if not "error" in swot_data:
+        # Create a 2x2 grid for SWOT
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Strengths
+            st.subheader("💪 Strengths")
+            strengths = swot_data.get("strengths", [])
+            for strength in strengths:
+                st.success(f"✓ {strength}")
+                
+            # Weaknesses
+            st.subheader("🔍 Weaknesses")
+            weaknesses = swot_data.get("weaknesses", [])
+            for weakness in weaknesses:
+                st.error(f"✗ {weakness}")
+        
+        with col2:
+            # Opportunities
+            st.subheader("🚀 Opportunities")
+            opportunities = swot_data.get("opportunities", [])
+            for opportunity in opportunities:
+                st.info(f"➤ {opportunity}")
+            
+            # Threats
+            st.subheader("⚠️ Threats")
+            threats = swot_data.get("threats", [])
+            for threat in threats:
+                st.warning(f"! {threat}")
+    else:
+        st.error(swot_data["error"])
+        st.json(swot_data)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
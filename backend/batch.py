@@ -0,0 +1,165 @@
+"""Analyze a file of startup ideas with bounded parallelism.
+
+Ideas are read from a CSV file (an "idea" column, optional "id") or JSONL
+({"idea": ..., "id": ...} per line). Results are appended to a JSONL file as
+each idea finishes, so a crash loses at most the ideas in flight, and a rerun
+skips every idea that already has a successful result. An idea is "ok" only
+when every section parsed; "partial" and "error" ideas are analyzed again.
+
+LLM calls are paced by the workflow's QuotaGovernor (LLM_RPM, LLM_TPM), which
+every process sharing LLM_QUOTA_DB draws from; --search-rpm caps the requests
+the search tool sends to Serper, however many searches each idea makes.
+
+    python batch.py ideas.csv -o results.jsonl --concurrency 4
+"""
+import os
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from Agents import StartupResearchWorkflow, SECTIONS, is_parsed
+from cache import make_key, normalize_idea
+from governor import RateLimiter
+
+# Gemini 2.0 Flash list prices, USD per million tokens
+DEFAULT_INPUT_PRICE = 0.10
+DEFAULT_OUTPUT_PRICE = 0.40
+
+
+def read_ideas(path):
+    """Read (id, idea) pairs from a CSV or JSONL file"""
+    ideas = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            rows = (json.loads(line) for line in f if line.strip())
+            rows = ({"idea": row} if isinstance(row, str) else row for row in rows)
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            idea = (row.get("idea") or "").strip()
+            if idea:
+                # Hash-based ids stay stable across reruns, which resuming relies on
+                ideas.append((row.get("id") or make_key(normalize_idea(idea))[:16], idea))
+    return ideas
+
+
+def result_status(result):
+    """"ok" when every section parsed, "partial" when some did, "error" when none did
+
+    run_analysis reports timeouts and task failures as section markers
+    instead of raising, so the sections decide.
+    """
+    parsed = sum(is_parsed(result[section]) for section in SECTIONS)
+    if parsed == len(SECTIONS):
+        return "ok"
+    return "partial" if parsed else "error"
+
+
+def completed_ids(path):
+    """Ids that already have a fully parsed result in the output file"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line
+                continue
+            if record.get("status") == "ok":
+                done.add(record["id"])
+    return done
+
+
+def run_batch(ideas, output_path, workflow, concurrency=4, timeout=None,
+              input_price=DEFAULT_INPUT_PRICE, output_price=DEFAULT_OUTPUT_PRICE):
+    """Analyze ideas, appending one JSON line per idea to output_path
+
+    Returns a summary dict.
+    """
+    done = completed_ids(output_path)
+    todo = [(idea_id, idea) for idea_id, idea in ideas if idea_id not in done]
+
+    def analyze(idea_id, idea):
+        start = time.perf_counter()
+        try:
+            result = workflow.run_analysis(idea, timeout=timeout)
+            record = {"id": idea_id, "idea": idea, "status": result_status(result), "result": result}
+        except Exception as e:
+            record = {"id": idea_id, "idea": idea, "status": "error", "error": str(e)}
+        record["seconds"] = round(time.perf_counter() - start, 3)
+        return record
+
+    usage_before = workflow.llm.get_token_usage_summary()
+    start = time.perf_counter()
+    succeeded = partial = failed = 0
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(analyze, idea_id, idea) for idea_id, idea in todo]
+        for future in as_completed(futures):
+            record = future.result()
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            if record["status"] == "ok":
+                succeeded += 1
+            elif record["status"] == "partial":
+                partial += 1
+            else:
+                failed += 1
+            processed = succeeded + partial + failed
+            elapsed = time.perf_counter() - start
+            print(f"[{processed}/{len(todo)}] {record['status']:<7} {record['id']} "
+                  f"({60 * processed / elapsed:.1f} ideas/min)")
+
+    elapsed = time.perf_counter() - start
+    usage = workflow.llm.get_token_usage_summary()
+    prompt_tokens = usage.prompt_tokens - usage_before.prompt_tokens
+    completion_tokens = usage.completion_tokens - usage_before.completion_tokens
+    cost = (prompt_tokens * input_price + completion_tokens * output_price) / 1e6
+    processed = succeeded + partial + failed
+    return {
+        "skipped": len(ideas) - len(todo),
+        "succeeded": succeeded,
+        "partial": partial,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "ideasPerMinute": round(60 * processed / elapsed, 2) if elapsed and processed else 0.0,
+        "promptTokens": prompt_tokens,
+        "completionTokens": completion_tokens,
+        "costUsd": round(cost, 6),
+        "costPerIdeaUsd": round(cost / processed, 6) if processed else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="CSV or JSONL file of ideas")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL file to append results to")
+    parser.add_argument("--concurrency", type=int, default=4, help="Ideas analyzed at once")
+    parser.add_argument("--search-rpm", type=float, default=100, help="Serper requests per minute")
+    parser.add_argument("--timeout", type=int, default=240, help="Per-idea analysis timeout in seconds")
+    parser.add_argument("--input-price", type=float, default=DEFAULT_INPUT_PRICE, help="USD per 1M prompt tokens")
+    parser.add_argument("--output-price", type=float, default=DEFAULT_OUTPUT_PRICE, help="USD per 1M completion tokens")
+    args = parser.parse_args()
+
+    workflow = StartupResearchWorkflow()
+    if workflow.search_tool is not None:
+        workflow.search_tool.limiter = RateLimiter(args.search_rpm)
+
+    summary = run_batch(
+        read_ideas(args.input), args.output, workflow,
+        concurrency=args.concurrency, timeout=args.timeout,
+        input_price=args.input_price, output_price=args.output_price
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
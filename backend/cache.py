@@ -0,0 +1,189 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def normalize_idea(idea):
+    """Normalize idea text so trivial edits (case, whitespace) share a cache entry"""
+    return " ".join(str(idea).lower().split())
+
+
+def make_key(*parts):
+    """Build a content-addressed cache key from the given parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """In-memory LRU cache with TTL and an optional on-disk SQLite tier
+
+    Values must be JSON serializable. Entries found only on disk are promoted
+    back into memory on read. The disk tier is pruned every 100 writes to at
+    most max_disk_entries, dropping the entries closest to expiry first.
+    """
+
+    def __init__(self, max_entries=256, ttl=24 * 3600, db_path=None, max_disk_entries=100000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._disk_writes = 0
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+            self._prune_disk()
+            self._db.commit()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        """Store value under key for ttl seconds (defaults to the cache TTL)"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at)
+                )
+                self._disk_writes += 1
+                if self._disk_writes % 100 == 0:
+                    self._prune_disk()
+                self._db.commit()
+
+    def invalidate(self, key):
+        """Drop key from both tiers"""
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._db.commit()
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+                self._db.commit()
+
+    def stats(self):
+        """Return hit/miss counters and the current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "diskHits": self.disk_hits,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries)
+            }
+
+    def _prune_disk(self):
+        """Drop expired rows, then the rows closest to expiry beyond max_disk_entries"""
+        self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        self._db.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires_at DESC "
+            "LIMIT -1 OFFSET ?)", (self.max_disk_entries,)
+        )
+
+    def _remember(self, key, value, expires_at):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution
+
+    The first caller for a key runs the function. Callers that arrive with the
+    same key while it is still running wait for it and receive its result,
+    or its exception. Nothing is remembered once the call finishes, so a
+    failure is not cached and the next caller simply tries again. A waiter
+    that hits an exception listed in retry_on (e.g. the first caller's own
+    deadline) runs the call again itself instead of inheriting the error.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, retry_on=(), **kwargs):
+        """Run fn(*args, **kwargs), or join the identical call already in flight"""
+        while True:
+            with self._lock:
+                future = self._pending.get(key)
+                leader = future is None
+                if leader:
+                    future = self._pending[key] = Future()
+                    self.calls += 1
+                else:
+                    self.shared += 1
+
+            if not leader:
+                try:
+                    return future.result()
+                except retry_on:
+                    continue
+
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+
+    def stats(self):
+        """Return how many calls ran and how many joined one in flight"""
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared, "inFlight": len(self._pending)}
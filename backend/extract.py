@@ -0,0 +1,314 @@
+"""Pull JSON out of noisy LLM output and check it against a section's schema.
+
+Models wrap their JSON in markdown fences, add prose before or after it, leave
+trailing commas, use Python literals or stop mid-object. extract_json finds
+the first complete JSON value in the text with a single bracket-matching scan,
+repairs the common slips, and IncrementalExtractor does the same over streamed
+chunks. Schemas are the example structures from the task templates; values
+are coerced towards them where the intent is unambiguous and anything else is
+reported so only that task needs to be asked again.
+"""
+import re
+import ast
+import json
+from typing import List
+
+from pydantic import create_model
+
+_OPENERS = {"{": "}", "[": "]"}
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_JSON_LITERALS = re.compile(r"\b(true|false|null)\b")
+_PY_LITERALS = {"true": "True", "false": "False", "null": "None"}
+
+
+class ExtractionError(ValueError):
+    """Raised when no JSON value can be recovered from the text"""
+
+
+def loads_lenient(candidate):
+    """json.loads, falling back to fixes for trailing commas, smart quotes and Python literals"""
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        pass
+    fixed = _TRAILING_COMMA.sub(r"\1", candidate.translate(_SMART_QUOTES))
+    try:
+        return json.loads(fixed)
+    except json.JSONDecodeError:
+        pass
+    # Single quotes and True/False/None: read it as a Python literal instead
+    try:
+        value = ast.literal_eval(_JSON_LITERALS.sub(lambda m: _PY_LITERALS[m.group(1)], fixed))
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        raise ExtractionError("Could not parse the JSON block") from None
+    if not isinstance(value, (dict, list)):
+        raise ExtractionError("Could not parse the JSON block")
+    return value
+
+
+class IncrementalExtractor:
+    """Find the first complete JSON object or array in text fed in chunks
+
+    feed() returns the parsed value as soon as its closing bracket arrives,
+    and None until then. Each character is scanned once, except after a
+    bracketed span that turns out not to be JSON (e.g. "[1]" in prose), where
+    scanning resumes just after its opening bracket. finish() closes whatever
+    is still open, which recovers output cut off mid-object. Values that
+    accept(value) rejects are skipped like any other non-JSON span.
+    """
+
+    def __init__(self, accept=None):
+        self.accept = accept
+        self.buffer = ""
+        self.value = None
+        self._pos = 0
+        self._reset(None)
+
+    def _reset(self, start):
+        self._start = start
+        self._closers = []
+        self._in_string = None
+        self._escape = False
+
+    def feed(self, chunk):
+        """Add a chunk of text; return the value once one is complete"""
+        if self.value is not None:
+            return self.value
+        self.buffer += chunk
+        text = self.buffer
+        while self._pos < len(text):
+            char = text[self._pos]
+            self._pos += 1
+            if self._start is None:
+                if char in _OPENERS:
+                    self._reset(self._pos - 1)
+                    self._closers.append(_OPENERS[char])
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == self._in_string:
+                    self._in_string = None
+            elif char in "\"'“":
+                self._in_string = "”" if char == "“" else char
+            elif char in _OPENERS:
+                self._closers.append(_OPENERS[char])
+            elif char in "}]":
+                if char != self._closers.pop():
+                    self._retry_after_start()
+                    continue
+                if not self._closers:
+                    try:
+                        value = loads_lenient(text[self._start:self._pos])
+                    except ExtractionError:
+                        value = None
+                    if value is not None and self._accepts(value):
+                        self.value = value
+                        return value
+                    self._retry_after_start()
+        return None
+
+    def finish(self):
+        """Return the value, closing a JSON block the text left unterminated"""
+        if self.value is not None:
+            return self.value
+        while self._start is not None:
+            value = _close_truncated(self.buffer[self._start:])
+            if value is not None and self._accepts(value):
+                self.value = value
+                return value
+            self._retry_after_start()
+            self.feed("")
+            if self.value is not None:
+                return self.value
+        raise ExtractionError("No JSON object or array found in the output")
+
+    def _accepts(self, value):
+        return self.accept is None or self.accept(value)
+
+    def _retry_after_start(self):
+        self._pos = self._start + 1
+        self._reset(None)
+
+
+def _open_state(text):
+    """Brackets left open at the end of text, and the quote of an unclosed string"""
+    closers, in_string, escape = [], None, False
+    for char in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == in_string:
+                in_string = None
+        elif char in "\"'“":
+            in_string = "”" if char == "“" else char
+        elif char in _OPENERS:
+            closers.append(_OPENERS[char])
+        elif char in "}]" and closers:
+            closers.pop()
+    return closers, in_string
+
+
+def _close_truncated(tail, max_cuts=3):
+    """Parse output that stopped mid-value by closing it, dropping the last partial item if needed"""
+    for _ in range(max_cuts + 1):
+        closers, in_string = _open_state(tail)
+        closed = tail + (in_string or "")
+        # A cut-off output usually ends mid-item; drop the dangling comma or colon
+        closed = closed.rstrip().rstrip(",:")
+        try:
+            return loads_lenient(closed + "".join(reversed(closers)))
+        except ExtractionError:
+            cut = tail.rfind(",")
+            if cut <= 0:
+                return None
+            tail = tail[:cut]
+    return None
+
+
+def holds_objects(value):
+    """Whether value is an object or a list with an object in it, unlike citations such as [1]"""
+    return isinstance(value, dict) or any(isinstance(item, dict) for item in value)
+
+
+def extract_json(text, accept=None):
+    """Return the first JSON object or array in text, raising ExtractionError if there is none
+
+    With accept, JSON values it rejects are skipped.
+    """
+    text = str(text)
+    stripped = text.strip()
+    if stripped[:1] in _OPENERS:
+        # Fast path for clean output
+        try:
+            value = json.loads(stripped)
+            if accept is None or accept(value):
+                return value
+        except json.JSONDecodeError:
+            pass
+    extractor = IncrementalExtractor(accept)
+    value = extractor.feed(text)
+    return value if value is not None else extractor.finish()
+
+
+def schema_from_example(example):
+    """Build a schema from a template's example structure
+
+    The templates describe fields as "string" or number, so the JSON part of
+    expected_output parses once bare `number` placeholders are quoted.
+    """
+    start = min(i for i in (example.find("{"), example.find("[")) if i >= 0)
+    return json.loads(re.sub(r":\s*number\b", ': "number"', example[start:]))
+
+
+def model_from_schema(name, schema):
+    """Build a pydantic model of a dict schema, for LLMs that can constrain output to one
+
+    "number" fields become floats; nested objects get models of their own,
+    named after the path to them.
+    """
+    def field_type(value, path):
+        if isinstance(value, dict):
+            return create_model(path, **{key: (field_type(child, path + key[:1].upper() + key[1:]), ...)
+                                         for key, child in value.items()})
+        if isinstance(value, list):
+            return List[field_type(value[0], path + "Item")] if value else list
+        return float if value == "number" else str
+
+    return field_type(schema, name)
+
+
+def _camel(key):
+    return re.sub(r"[_\s-]+(\w)", lambda m: m.group(1).upper(), key.strip())
+
+
+def _matches_keys(value, schema):
+    names = {key.lower() for key in schema}
+    return any(_camel(key).lower() in names for key in value)
+
+
+def _coerce(value, schema, path, errors):
+    """Return value shaped like schema where the intent is clear, recording what is not"""
+    if isinstance(schema, dict):
+        if isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict):
+            value = value[0]
+        if not isinstance(value, dict):
+            errors.append(f"{path or 'output'} should be an object")
+            return value
+        if len(value) == 1 and not _matches_keys(value, schema):
+            # {"swotAnalysis": {...}}: unwrap a single wrapper key
+            inner = next(iter(value.values()))
+            if isinstance(inner, dict):
+                value = inner
+        # Match keys case-insensitively and across snake_case/camelCase
+        by_name = {_camel(key).lower(): key for key in value}
+        result, used = {}, set()
+        for key, child in schema.items():
+            source = key if key in value else by_name.get(key.lower())
+            if source is None:
+                errors.append(f"{path}{key} is missing")
+                continue
+            used.add(source)
+            result[key] = _coerce(value[source], child, f"{path}{key}.", errors)
+        # Keep extra keys; renderers ignore them
+        result.update((key, item) for key, item in value.items() if key not in used)
+        return result
+
+    if isinstance(schema, list):
+        if isinstance(value, dict):
+            # A single item where a list was expected, or {"roles": [...]}
+            lists = [item for item in value.values() if isinstance(item, list)]
+            item_like = schema and isinstance(schema[0], dict) and _matches_keys(value, schema[0])
+            value = lists[0] if len(lists) == 1 and not item_like else [value]
+        elif isinstance(value, str) and schema and schema[0] == "string":
+            value = [value]
+        if not isinstance(value, list):
+            errors.append(f"{path.rstrip('.') or 'output'} should be a list")
+            return value
+        item_schema = schema[0] if schema else None
+        if item_schema is None:
+            return value
+        return [_coerce(item, item_schema, f"{path.rstrip('.')}[{i}].", errors)
+                for i, item in enumerate(value)]
+
+    name = path.rstrip(".")
+    if schema == "number":
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            try:
+                number = float(str(value).replace(",", "").strip())
+            except ValueError:
+                errors.append(f"{name} should be a number")
+                return value
+            value = int(number) if number.is_integer() else number
+        elif isinstance(value, float) and value.is_integer():
+            # Schema-constrained output sends every number as a float: 2024.0
+            value = int(value)
+        return value
+    if isinstance(value, (dict, list)):
+        errors.append(f"{name} should be a string")
+        return value
+    return value if isinstance(value, str) else str(value)
+
+
+def validate(value, schema):
+    """Coerce value towards schema; return (value, list of problems left)"""
+    errors = []
+    value = _coerce(value, schema, "", errors)
+    return value, errors
+
+
+def parse_structured(text, schema):
+    """Extract and validate a task's output; return (value, errors)
+
+    value is None when no JSON could be found at all.
+    """
+    try:
+        value = extract_json(text, accept=holds_objects)
+    except ExtractionError as e:
+        return None, [str(e)]
+    return validate(value, schema)
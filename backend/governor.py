@@ -0,0 +1,366 @@
+"""Requests/min and tokens/min quota for the LLM, shared by every process.
+
+API workers, job workers and batch runs each call Gemini on their own, so a
+per-process rate limiter can't keep them under the project's quota together.
+QuotaGovernor keeps one token bucket for requests and one for tokens in a
+SQLite database that all of them open (LLM_QUOTA_DB).
+
+A task reserves what it is expected to use before it starts. A reservation
+is always granted: it takes its units from the buckets at once, even into
+debt, and the caller sleeps until the buckets have refilled to cover it. So
+callers queue in the order they asked instead of getting 429s from the
+provider, and a large task can't be starved by small ones. As the task's LLM
+calls complete, their actual usage is charged against the reservation, and
+whatever it didn't use is handed back when it is settled.
+
+The buckets refill at LLM_QUOTA_TARGET of the limits and hold at most the
+rest, so reservations made in any one minute stay within the limits even
+after an idle spell.
+"""
+import os
+import math
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+LLM_QUOTA_DB = os.getenv("LLM_QUOTA_DB", "llm_quota.db")
+# Gemini 2.0 Flash tier 1 limits; 0 turns a limit off
+LLM_RPM = float(os.getenv("LLM_RPM", "2000"))
+LLM_TPM = float(os.getenv("LLM_TPM", "4000000"))
+# Share of each limit the buckets refill at; the rest is the burst they can hold
+LLM_QUOTA_TARGET = float(os.getenv("LLM_QUOTA_TARGET", "0.8"))
+# Seconds of quota history kept for utilization reports
+QUOTA_LOG_RETENTION = 3600
+# Rough English average, used until a task's real usage has been seen
+CHARS_PER_TOKEN = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_buckets (
+    name TEXT PRIMARY KEY,
+    level REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quota_log (
+    at REAL NOT NULL,
+    key TEXT,
+    requests REAL NOT NULL,
+    tokens REAL NOT NULL,
+    wait REAL
+);
+CREATE INDEX IF NOT EXISTS quota_log_at ON quota_log (at);
+CREATE TABLE IF NOT EXISTS usage_profiles (
+    key TEXT PRIMARY KEY,
+    requests REAL NOT NULL,
+    tokens REAL NOT NULL,
+    runs INTEGER NOT NULL
+);
+"""
+
+
+def estimate_tokens(text):
+    """Token count of text by the characters-per-token rule of thumb"""
+    return math.ceil(len(str(text)) / CHARS_PER_TOKEN)
+
+
+class RateLimiter:
+    """Token bucket allowing `per_minute` requests per minute across this process's threads
+
+    For providers without a quota shared between processes, such as Serper
+    in a batch run; LLM calls go through QuotaGovernor instead.
+    """
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute / 60.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class QuotaWaitExceeded(Exception):
+    """The quota could not cover a reservation within the caller's max_wait"""
+
+
+class Reservation:
+    """Units taken from the governor's buckets for one task
+
+    consume() charges the task's actual usage against the reservation and
+    only goes to the buckets for usage beyond it; settle() returns what was
+    left unused. Usage reported after settling is charged directly.
+    """
+
+    def __init__(self, governor, key, requests, tokens, wait):
+        self.governor = governor
+        self.key = key
+        self.requests = requests
+        self.tokens = tokens
+        self.wait = wait
+        self.used_requests = 0
+        self.used_tokens = 0
+        self.settled = False
+        self._lock = threading.Lock()
+
+    def consume(self, requests=1, tokens=0):
+        with self._lock:
+            spare_requests = 0 if self.settled else max(self.requests - self.used_requests, 0)
+            spare_tokens = 0 if self.settled else max(self.tokens - self.used_tokens, 0)
+            self.used_requests += requests
+            self.used_tokens += tokens
+        over_requests, over_tokens = max(requests - spare_requests, 0), max(tokens - spare_tokens, 0)
+        if over_requests or over_tokens:
+            self.governor.charge(over_requests, over_tokens, self.key)
+
+    def settle(self, learn=True):
+        """Hand back the unused part and, with learn, remember what the task really used"""
+        with self._lock:
+            if self.settled:
+                return
+            self.settled = True
+            unused_requests = max(self.requests - self.used_requests, 0)
+            unused_tokens = max(self.tokens - self.used_tokens, 0)
+        if unused_requests or unused_tokens:
+            self.governor.charge(-unused_requests, -unused_tokens, self.key)
+        if learn and self.key and self.used_requests:
+            self.governor.learn(self.key, self.used_requests, self.used_tokens)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.settle(learn=exc_info[0] is None)
+
+
+class QuotaGovernor:
+    """Token buckets for LLM requests and tokens, shared through a SQLite database
+
+    rpm and tpm are allowed per period seconds (a minute, unless a benchmark
+    wants a shorter one).
+    """
+
+    def __init__(self, db_path=LLM_QUOTA_DB, rpm=LLM_RPM, tpm=LLM_TPM, target=LLM_QUOTA_TARGET, period=60):
+        self.db_path = db_path
+        self.limits = {"requests": rpm, "tokens": tpm}
+        self.target = target
+        self.period = period
+        self.stats = {"reservations": 0, "queued": 0, "waitSeconds": 0.0, "maxWait": 0.0, "rejected": 0}
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._db = None
+        self._reservations_since_prune = 0
+
+    @property
+    def db(self):
+        """The connection, opened on first use so importing never creates the file"""
+        if self._db is None:
+            with self._open_lock:
+                if self._db is None:
+                    db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=30)
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("PRAGMA synchronous=NORMAL")
+                    db.executescript(SCHEMA)
+                    self._db = db
+        return self._db
+
+    @property
+    def enabled(self):
+        return any(limit > 0 for limit in self.limits.values())
+
+    @contextmanager
+    def _transaction(self):
+        """Take the database write lock up front so read-then-update is atomic across processes"""
+        db = self.db
+        with self._lock:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def _rate(self, bucket):
+        """Units per second the bucket refills at"""
+        return self.limits[bucket] * self.target / self.period
+
+    def _capacity(self, bucket):
+        return self.limits[bucket] * (1 - self.target)
+
+    def _levels(self, db, now):
+        """Current bucket levels, refilled up to now"""
+        levels = {}
+        rows = dict((name, (level, updated)) for name, level, updated in
+                    db.execute("SELECT name, level, updated_at FROM quota_buckets"))
+        for bucket, limit in self.limits.items():
+            if limit <= 0:
+                continue
+            level, updated = rows.get(bucket, (self._capacity(bucket), now))
+            levels[bucket] = min(self._capacity(bucket), level + max(now - updated, 0) * self._rate(bucket))
+        return levels
+
+    def _store(self, db, levels, now):
+        db.executemany(
+            "INSERT OR REPLACE INTO quota_buckets (name, level, updated_at) VALUES (?, ?, ?)",
+            [(bucket, level, now) for bucket, level in levels.items()]
+        )
+
+    def reserve(self, requests, tokens, key=None, max_wait=None):
+        """Take requests and tokens from the buckets, sleeping until they are covered
+
+        Raises QuotaWaitExceeded, without taking anything, when that would
+        mean sleeping longer than max_wait seconds.
+        """
+        requests, tokens = max(requests, 0), max(math.ceil(tokens), 0)
+        wait = 0.0
+        if self.enabled:
+            units = {"requests": requests, "tokens": tokens}
+            with self._transaction() as db:
+                now = time.time()
+                levels = self._levels(db, now)
+                wait = max([(units[bucket] - level) / self._rate(bucket)
+                            for bucket, level in levels.items()] + [0.0])
+                if max_wait is not None and wait > max_wait:
+                    self.stats["rejected"] += 1
+                    raise QuotaWaitExceeded(
+                        f"LLM quota needs {wait:.1f}s to cover {requests} requests and {tokens} tokens")
+                # Every bucket is charged as of when the reservation goes ahead, so a bucket that
+                # isn't the bottleneck can't refill past its capacity while the caller sleeps
+                self._store(db, {bucket: min(max(self._capacity(bucket), units[bucket]),
+                                             level + wait * self._rate(bucket)) - units[bucket] - wait * self._rate(bucket)
+                                 for bucket, level in levels.items()}, now)
+                db.execute("INSERT INTO quota_log (at, key, requests, tokens, wait) VALUES (?, ?, ?, ?, ?)",
+                           (now, key, requests, tokens, wait))
+                self._reservations_since_prune += 1
+                if self._reservations_since_prune >= 1000:
+                    self._reservations_since_prune = 0
+                    db.execute("DELETE FROM quota_log WHERE at < ?", (now - QUOTA_LOG_RETENTION,))
+        with self._lock:
+            self.stats["reservations"] += 1
+            if wait > 0:
+                self.stats["queued"] += 1
+                self.stats["waitSeconds"] += wait
+                self.stats["maxWait"] = max(self.stats["maxWait"], wait)
+        if wait > 0:
+            time.sleep(wait)
+        return Reservation(self, key, requests, tokens, wait)
+
+    def charge(self, requests, tokens, key=None):
+        """Take (or, when negative, give back) units without waiting"""
+        if not self.enabled or not (requests or tokens):
+            return
+        units = {"requests": requests, "tokens": tokens}
+        with self._transaction() as db:
+            now = time.time()
+            levels = self._levels(db, now)
+            self._store(db, {bucket: min(self._capacity(bucket), level - units[bucket])
+                             for bucket, level in levels.items()}, now)
+            db.execute("INSERT INTO quota_log (at, key, requests, tokens, wait) VALUES (?, ?, ?, ?, NULL)",
+                       (now, key, requests, tokens))
+
+    def learn(self, key, requests, tokens, weight=0.3):
+        """Fold one task's real usage into the moving average estimate() returns for key"""
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO usage_profiles (key, requests, tokens, runs) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (key) DO UPDATE SET requests = requests + ? * (excluded.requests - requests), "
+                "tokens = tokens + ? * (excluded.tokens - tokens), runs = runs + 1",
+                (key, requests, tokens, weight, weight)
+            )
+
+    def estimate(self, key, requests, tokens):
+        """(requests, tokens) a task is expected to use: what tasks with this key used
+        before, or the given template-based guess for the first one
+        """
+        db = self.db
+        with self._lock:
+            row = db.execute("SELECT requests, tokens FROM usage_profiles WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return requests, tokens
+        return max(1, round(row[0])), math.ceil(row[1])
+
+    def utilization(self, window=60):
+        """Units charged in the last window seconds, as a share of what the limits allow in that time"""
+        since = time.time() - window
+        db = self.db
+        with self._lock:
+            requests, tokens = db.execute(
+                "SELECT COALESCE(SUM(requests), 0), COALESCE(SUM(tokens), 0) FROM quota_log WHERE at >= ?",
+                (since,)
+            ).fetchone()
+        used = {"requests": requests, "tokens": tokens}
+        return {
+            bucket: {"used": used[bucket], "limit": limit * window / self.period,
+                     "utilization": used[bucket] / (limit * window / self.period) if limit > 0 else 0.0}
+            for bucket, limit in self.limits.items()
+        }
+
+    def report(self, window=60):
+        """Queueing in this process and quota use across all of them"""
+        db = self.db
+        with self._lock:
+            waits = [row[0] for row in db.execute(
+                "SELECT wait FROM quota_log WHERE wait IS NOT NULL AND at >= ? ORDER BY wait",
+                (time.time() - window,)
+            )]
+        stats = dict(self.stats)
+        stats["meanWait"] = stats["waitSeconds"] / stats["reservations"] if stats["reservations"] else 0.0
+        return {
+            "process": stats,
+            "window": window,
+            "waits": {
+                "count": len(waits),
+                "queued": sum(wait > 0 for wait in waits),
+                "p50": waits[len(waits) // 2] if waits else 0.0,
+                "p95": waits[min(len(waits) - 1, int(0.95 * len(waits)))] if waits else 0.0,
+                "max": waits[-1] if waits else 0.0
+            },
+            "quota": self.utilization(window)
+        }
+
+    def reset(self):
+        """Forget bucket levels, history and learned estimates"""
+        with self._transaction() as db:
+            db.execute("DELETE FROM quota_buckets")
+            db.execute("DELETE FROM quota_log")
+            db.execute("DELETE FROM usage_profiles")
+
+
+# Reservations of running tasks by crewai task id, so the LLM call events the
+# tracing listener sees can be charged to the task that made them
+_tracked = OrderedDict()
+_tracked_lock = threading.Lock()
+
+
+def track(task_id, reservation, max_tracked=1000):
+    """Charge LLM calls reported for task_id to reservation"""
+    with _tracked_lock:
+        _tracked[str(task_id)] = reservation
+        while len(_tracked) > max_tracked:
+            _tracked.popitem(last=False)
+
+
+def untrack(task_id):
+    with _tracked_lock:
+        return _tracked.pop(str(task_id), None)
+
+
+def record_call(task_id, tokens):
+    """Charge one finished LLM call to its task's reservation, if the task has one"""
+    with _tracked_lock:
+        reservation = _tracked.get(str(task_id)) if task_id else None
+    if reservation is not None:
+        reservation.consume(1, tokens)
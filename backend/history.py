@@ -0,0 +1,355 @@
+"""History of finished analyses, so past results can be looked up instead of re-run.
+
+Every analysis StartupResearchWorkflow finishes (and every report of
+StartupAnalysisOrchestrator given a history) is kept as one row of a SQLite
+database: the idea, its hash and industry, one column per category score and
+the full result as JSON. Rows are indexed for listing by idea, industry, time
+or score, and an FTS5 table covers the idea text and competitor names.
+
+Recording only queues the row; a writer thread inserts queued rows in
+batches, so the analysis that produced them never waits on the database.
+Listings page with a cursor rather than an offset, so the thousandth page
+costs the same as the first.
+"""
+import os
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+from cache import make_key, normalize_idea
+
+HISTORY_DB = os.getenv("HISTORY_DB", "history.db")
+# Rows written per transaction, and the longest a recorded row waits to be written
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "500"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1"))
+
+# Category scores of orchestrator reports, one indexed column each
+SCORES = ["market", "financial", "competition", "risk", "overall"]
+ORDERS = ["createdAt", *SCORES]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    idea TEXT NOT NULL,
+    idea_hash TEXT NOT NULL,
+    name TEXT,
+    industry TEXT,
+    created_at REAL NOT NULL,
+    market_score REAL,
+    financial_score REAL,
+    competition_score REAL,
+    risk_score REAL,
+    overall_score REAL,
+    competitors TEXT NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_idea ON analyses (idea_hash, created_at);
+CREATE INDEX IF NOT EXISTS analyses_industry ON analyses (industry, created_at);
+CREATE INDEX IF NOT EXISTS analyses_created ON analyses (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5(
+    idea, competitors, content='analyses', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS analyses_fts_insert AFTER INSERT ON analyses BEGIN
+    INSERT INTO analyses_fts (rowid, idea, competitors) VALUES (new.id, new.idea, new.competitors);
+END;
+CREATE TRIGGER IF NOT EXISTS analyses_fts_delete AFTER DELETE ON analyses BEGIN
+    INSERT INTO analyses_fts (analyses_fts, rowid, idea, competitors)
+    VALUES ('delete', old.id, old.idea, old.competitors);
+END;
+"""
+
+# Each score is indexed on its own and within an industry, so either ordering reads one page of an index
+SCHEMA += "".join(
+    f"CREATE INDEX IF NOT EXISTS analyses_{score} ON analyses ({score}_score);\n"
+    f"CREATE INDEX IF NOT EXISTS analyses_industry_{score} ON analyses (industry, {score}_score);\n"
+    for score in SCORES
+)
+
+SUMMARY_COLUMNS = ("id, source, idea, name, industry, created_at, "
+                   + ", ".join(f"{score}_score" for score in SCORES) + ", competitors")
+
+
+def idea_hash(idea):
+    """Hash of the normalized idea text, shared by trivially different phrasings"""
+    return make_key(normalize_idea(idea))
+
+
+def workflow_row(idea, results, created_at=None):
+    """Row values for a StartupResearchWorkflow result"""
+    market = results.get("marketResearch")
+    competitors = market.get("competitors", []) if isinstance(market, dict) else []
+    names = [c["name"] for c in competitors if isinstance(c, dict) and c.get("name")]
+    result = {section: data for section, data in results.items() if section != "rawResults"}
+    return ("workflow", idea, None, None, created_at, dict.fromkeys(SCORES), names, result)
+
+
+def report_row(startup_data, report, created_at=None):
+    """Row values for a StartupAnalysisOrchestrator report
+
+    Its competitor analysis is free text, so that text is indexed in place
+    of a list of names.
+    """
+    scores = {result.get("category"): result.get("score") for result in report["analysis_results"]}
+    scores["overall"] = report.get("overall_score")
+    competition = next((result for result in report["analysis_results"]
+                        if result.get("category") == "competition"), {})
+    competitors = [str(competition["competitor_list"])] if competition.get("competitor_list") else []
+    idea = startup_data.get("description") or startup_data["name"]
+    return ("orchestrator", idea, startup_data["name"], startup_data.get("industry"), created_at,
+            {score: scores.get(score) for score in SCORES}, competitors, report)
+
+
+def fts_query(text):
+    """Quote every word so user input can't be read as FTS5 query syntax"""
+    terms = ['"' + term.replace('"', '""') + '"' for term in str(text).split()]
+    return " ".join(terms)
+
+
+class AnalysisHistory:
+    """Finished analyses in a SQLite database, written in batches off the request path
+
+    record() and record_report() return at once; call flush() to wait until
+    everything recorded so far can be read back. Several processes (the API
+    and job workers) may share one database file.
+    """
+
+    def __init__(self, db_path=HISTORY_DB, batch_size=HISTORY_BATCH_SIZE, flush_interval=HISTORY_FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = {"recorded": 0, "written": 0, "batches": 0, "failed": 0}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._db = None
+        self._writer = None
+
+    @property
+    def db(self):
+        """The connection, opened on first use so importing never creates the file"""
+        if self._db is None:
+            with self._open_lock:
+                if self._db is None:
+                    db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+                    db.row_factory = sqlite3.Row
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("PRAGMA synchronous=NORMAL")
+                    db.executescript(SCHEMA)
+                    self._db = db
+        return self._db
+
+    def record(self, idea, results):
+        """Queue a StartupResearchWorkflow result for writing"""
+        self._enqueue(workflow_row(idea, results, time.time()))
+
+    def record_report(self, startup_data, report):
+        """Queue a StartupAnalysisOrchestrator report for writing"""
+        self._enqueue(report_row(startup_data, report, time.time()))
+
+    def write_many(self, rows):
+        """Insert rows from workflow_row() or report_row() in one transaction"""
+        values = [(source, idea, idea_hash(idea), name, industry, time.time() if created_at is None else created_at,
+                   *(scores[score] for score in SCORES), json.dumps(competitors), json.dumps(result, default=str))
+                  for source, idea, name, industry, created_at, scores, competitors, result in rows]
+        db = self.db
+        with self._lock:
+            with db:
+                db.executemany(
+                    "INSERT INTO analyses (source, idea, idea_hash, name, industry, created_at, "
+                    + ", ".join(f"{score}_score" for score in SCORES) + ", competitors, result) "
+                    "VALUES (" + ", ".join("?" * (8 + len(SCORES))) + ")", values
+                )
+        self.stats["written"] += len(values)
+        self.stats["batches"] += 1
+
+    def flush(self, timeout=None):
+        """Wait until every row recorded so far has been written"""
+        if self._writer is not None:
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait(timeout)
+
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._writer = None
+
+    def get(self, analysis_id):
+        """One stored analysis with its full result, or None"""
+        db = self.db
+        with self._lock:
+            row = db.execute(
+                f"SELECT {SUMMARY_COLUMNS}, result FROM analyses WHERE id = ?", (analysis_id,)
+            ).fetchone()
+        return analysis_dict(row, with_result=True) if row else None
+
+    def list(self, idea=None, industry=None, order="createdAt", descending=True, limit=50, cursor=None):
+        """One page of stored analyses without their results, newest (or best) first
+
+        Filter by idea text (matched by hash) or industry, or order by a
+        category score, in which case analyses without one are left out.
+        Pass the returned "next" cursor back to get the following page.
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Unknown order {order!r}; use one of {', '.join(ORDERS)}")
+        column = "created_at" if order == "createdAt" else f"{order}_score"
+        conditions, params = [], []
+        if idea is not None:
+            conditions.append("idea_hash = ?")
+            params.append(idea_hash(idea))
+        if industry is not None:
+            conditions.append("industry = ?")
+            params.append(industry)
+        if column != "created_at":
+            conditions.append(f"{column} IS NOT NULL")
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            conditions.append(f"({column}, id) {'<' if descending else '>'} (?, ?)")
+            params += [value, last_id]
+        direction = "DESC" if descending else "ASC"
+        sql = (f"SELECT {SUMMARY_COLUMNS} FROM analyses"
+               + (" WHERE " + " AND ".join(conditions) if conditions else "")
+               + f" ORDER BY {column} {direction}, id {direction} LIMIT ?")
+        db = self.db
+        with self._lock:
+            rows = db.execute(sql, (*params, limit + 1)).fetchall()
+        items = [analysis_dict(row) for row in rows[:limit]]
+        last = rows[limit - 1] if len(rows) > limit else None
+        return {"items": items, "next": encode_cursor(last[column], last["id"]) if last else None}
+
+    def search(self, text, field=None, limit=50, cursor=None):
+        """Analyses whose idea or competitor names contain every word of text, newest first
+
+        field restricts the match to "idea" or "competitors". Pages work as in list().
+        """
+        if field not in (None, "idea", "competitors"):
+            raise ValueError(f"Unknown search field {field!r}; use idea or competitors")
+        match = fts_query(text)
+        if not match:
+            return {"items": [], "next": None}
+        if field:
+            match = f"{field} : ({match})"
+        params = [match]
+        condition = ""
+        if cursor:
+            condition = " AND rowid < ?"
+            params.append(decode_cursor(cursor)[1])
+        db = self.db
+        with self._lock:
+            ids = [row[0] for row in db.execute(
+                f"SELECT rowid FROM analyses_fts WHERE analyses_fts MATCH ?{condition} ORDER BY rowid DESC LIMIT ?",
+                (*params, limit + 1)
+            )]
+            rows = {row["id"]: row for row in db.execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM analyses WHERE id IN ({', '.join('?' * len(ids[:limit]))})",
+                ids[:limit]
+            )} if ids else {}
+        items = [analysis_dict(rows[i]) for i in ids[:limit] if i in rows]
+        return {"items": items, "next": encode_cursor(ids[limit - 1], ids[limit - 1]) if len(ids) > limit else None}
+
+    def compare(self, left_id, right_id):
+        """Two stored analyses side by side, with their score and competitor differences
+
+        Returns None when either one does not exist.
+        """
+        left, right = self.get(left_id), self.get(right_id)
+        if left is None or right is None:
+            return None
+        scores = {
+            score: {"left": left["scores"][score], "right": right["scores"][score],
+                    "delta": (round(right["scores"][score] - left["scores"][score], 4)
+                              if left["scores"][score] is not None and right["scores"][score] is not None else None)}
+            for score in SCORES
+        }
+        left_names = {name.lower(): name for name in left["competitors"]}
+        right_names = {name.lower(): name for name in right["competitors"]}
+        competitors = {
+            "shared": [name for key, name in left_names.items() if key in right_names],
+            "onlyLeft": [name for key, name in left_names.items() if key not in right_names],
+            "onlyRight": [name for key, name in right_names.items() if key not in left_names]
+        }
+        sections = sorted(set(left["result"]) | set(right["result"]))
+        changed = [section for section in sections if left["result"].get(section) != right["result"].get(section)]
+        return {"left": left, "right": right, "scores": scores, "competitors": competitors,
+                "changedSections": changed}
+
+    def count(self):
+        db = self.db
+        with self._lock:
+            return db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+    def _enqueue(self, row):
+        self.stats["recorded"] += 1
+        if self._writer is None or not self._writer.is_alive():
+            with self._open_lock:
+                if self._writer is None or not self._writer.is_alive():
+                    self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+                    self._writer.start()
+                    atexit.register(self.close)
+        self._queue.put(row)
+
+    def _write_loop(self):
+        """Drain the queue in batches of up to batch_size rows"""
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                    # A flush writes what is queued now instead of waiting out the interval
+                    deadline = 0
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0)) if deadline else \
+                        self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.write_many(batch)
+                except Exception as e:
+                    print(f"Error writing {len(batch)} analyses to history: {e}")
+                    self.stats["failed"] += len(batch)
+            for waiter in waiters:
+                waiter.set()
+
+
+def encode_cursor(value, last_id):
+    return f"{value!r}:{last_id}"
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor: the last row's sort value and id"""
+    value, _, last_id = str(cursor).rpartition(":")
+    try:
+        return float(value), int(last_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor {cursor!r}") from None
+
+
+def analysis_dict(row, with_result=False):
+    analysis = {
+        "id": row["id"],
+        "source": row["source"],
+        "idea": row["idea"],
+        "name": row["name"],
+        "industry": row["industry"],
+        "createdAt": row["created_at"],
+        "scores": {score: row[f"{score}_score"] for score in SCORES},
+        "competitors": json.loads(row["competitors"])
+    }
+    if with_result:
+        analysis["result"] = json.loads(row["result"])
+    return analysis
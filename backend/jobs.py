@@ -0,0 +1,500 @@
+"""Durable background jobs for long-running analyses.
+
+An analysis takes minutes, so the web tier only records a job and returns its
+id. Worker processes claim queued jobs from a SQLite database, run them
+through StartupResearchWorkflow and write each section back as it finishes;
+clients poll the job for its status and partial or final result. The queue
+lives on disk, so a browser refresh or an API restart loses nothing, and the
+job of a worker that dies is queued again once its heartbeat goes stale.
+
+Workers run next to the API (JOB_WORKERS processes, started by api.py) or on
+their own, so they scale separately from the front end:
+
+    python jobs.py worker --processes 4
+    python jobs.py submit "A marketplace for ..."
+    python jobs.py status <job id>
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import argparse
+import importlib
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from cache import make_key, normalize_idea
+
+JOB_DB = os.getenv("JOB_DB", "jobs.db")
+# Worker processes started alongside the API; 0 when workers run on their own
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# "module:callable" returning the workflow workers run, e.g. a stubbed one in benchmarks
+JOB_WORKFLOW = os.getenv("JOB_WORKFLOW")
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+# Seconds before a failed attempt runs again, multiplied by the attempts so far
+JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "10"))
+# Seconds finished jobs and their results are kept
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))
+# Seconds without a heartbeat before a running job counts as abandoned
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", "60"))
+# Seconds between heartbeats, which is also how quickly a running job notices a cancel
+HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "2"))
+ANALYSIS_TIMEOUT = int(os.getenv("ANALYSIS_TIMEOUT", "240"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    idea TEXT NOT NULL,
+    idea_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    timeout INTEGER,
+    detail TEXT NOT NULL DEFAULT 'standard',
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_idea ON jobs (idea_key, status);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+"""
+
+
+class JobQueue:
+    """Analysis jobs in a SQLite database shared by the API and worker processes
+
+    Jobs go queued -> running -> succeeded, failed or cancelled. A failed
+    attempt is queued again until max_attempts is reached. Every process
+    opens its own JobQueue; WAL mode lets readers poll while a worker writes.
+    """
+
+    def __init__(self, db_path=JOB_DB):
+        self.db_path = db_path
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        # Databases created before jobs had a detail level
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "detail" not in columns:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN detail TEXT NOT NULL DEFAULT 'standard'")
+
+    @contextmanager
+    def _transaction(self):
+        """Take the database write lock up front so read-then-update is atomic across processes"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def submit(self, idea, max_attempts=JOB_MAX_ATTEMPTS, timeout=None, dedupe=True, detail="standard"):
+        """Queue an analysis at a detail level (see Agents.DETAIL_LEVELS) and return the job
+
+        With dedupe, an idea that is already queued or running (after
+        normalization) at the same detail level returns that job instead of
+        queueing a second one.
+        """
+        idea_key = make_key(normalize_idea(idea))
+        now = time.time()
+        with self._transaction() as db:
+            if dedupe:
+                row = db.execute(
+                    "SELECT * FROM jobs WHERE idea_key = ? AND detail = ? AND status IN (?, ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (idea_key, detail, QUEUED, RUNNING)
+                ).fetchone()
+                if row is not None:
+                    return job_dict(row)
+            job_id = uuid.uuid4().hex
+            db.execute(
+                "INSERT INTO jobs (id, idea, idea_key, status, max_attempts, timeout, detail, created_at, "
+                "available_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, idea, idea_key, QUEUED, max(1, max_attempts), timeout, detail, now, now)
+            )
+            return job_dict(db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def get(self, job_id, with_result=True):
+        """Return the job as a dict, or None if it doesn't exist (or was purged)"""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return job_dict(row, with_result) if row is not None else None
+
+    def list(self, status=None, limit=50):
+        """The newest jobs, optionally with one status, without their results"""
+        query, params = "SELECT * FROM jobs", []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY created_at DESC LIMIT ?", params + [limit]).fetchall()
+        return [job_dict(row, with_result=False) for row in rows]
+
+    def stats(self):
+        """Number of jobs per status"""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys((QUEUED, RUNNING) + FINISHED, 0)
+        counts.update((status, count) for status, count in rows)
+        return counts
+
+    def claim(self, worker):
+        """Mark the oldest ready job as running on worker and return it, or None"""
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT id FROM jobs WHERE status = ? AND available_at <= ? ORDER BY available_at LIMIT 1",
+                (QUEUED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, worker = ?, started_at = ?, "
+                "heartbeat_at = ? WHERE id = ?",
+                (RUNNING, worker, now, now, row["id"])
+            )
+            return job_dict(db.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+    def heartbeat(self, job_id, worker, progress=None):
+        """Record that worker is still on the job, saving partial results
+
+        Returns False when the worker should stop: the job was cancelled, or
+        it was requeued and may belong to another worker by now.
+        """
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET heartbeat_at = ?, result = COALESCE(?, result) "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (time.time(), json.dumps(progress) if progress is not None else None, job_id, worker, RUNNING)
+            )
+            row = db.execute("SELECT status, worker, cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return (row is not None and row["status"] == RUNNING and row["worker"] == worker
+                and not row["cancel_requested"])
+
+    def complete(self, job_id, worker, result):
+        """Store the result of a job worker still owns; returns whether it did"""
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (SUCCEEDED, json.dumps(result), time.time(), job_id, worker, RUNNING)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker, error, backoff=JOB_RETRY_BACKOFF):
+        """Queue the job again after backoff, or fail it once it is out of attempts"""
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT attempts, max_attempts, cancel_requested FROM jobs "
+                "WHERE id = ? AND worker = ? AND status = ?", (job_id, worker, RUNNING)
+            ).fetchone()
+            if row is None:
+                return False
+            if row["cancel_requested"]:
+                db.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                           (CANCELLED, error, now, job_id))
+            elif row["attempts"] < row["max_attempts"]:
+                db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, worker = NULL, available_at = ? WHERE id = ?",
+                    (QUEUED, error, now + backoff * row["attempts"], job_id)
+                )
+            else:
+                db.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                           (FAILED, error, now, job_id))
+        return True
+
+    def cancel(self, job_id):
+        """Cancel a job and return it, or None if it doesn't exist
+
+        A queued job is cancelled at once. A running one is flagged and its
+        worker marks it cancelled at its next heartbeat. Finished jobs are
+        returned unchanged.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                       (CANCELLED, now, job_id, QUEUED))
+            db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return job_dict(row, with_result=False) if row is not None else None
+
+    def mark_cancelled(self, job_id, worker):
+        """Called by the worker that saw a cancel request on its job"""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND worker = ? AND status = ? "
+                "AND cancel_requested = 1", (CANCELLED, time.time(), job_id, worker, RUNNING)
+            )
+
+    def retry(self, job_id):
+        """Queue a failed or cancelled job again with fresh attempts; returns the job or None"""
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, cancel_requested = 0, error = NULL, result = NULL, "
+                "worker = NULL, available_at = ?, started_at = NULL, finished_at = NULL "
+                "WHERE id = ? AND status IN (?, ?)", (QUEUED, now, job_id, FAILED, CANCELLED)
+            )
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return job_dict(row, with_result=False) if row is not None else None
+
+    def requeue_stale(self, stale_after=JOB_STALE_AFTER):
+        """Release running jobs whose worker stopped sending heartbeats"""
+        return self._release("heartbeat_at < ?", time.time() - stale_after)
+
+    def release(self, worker):
+        """Release the running jobs of a worker process known to be dead"""
+        return self._release("worker = ?", worker)
+
+    def _release(self, condition, value):
+        now = time.time()
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET "
+                "status = CASE WHEN cancel_requested THEN ? WHEN attempts < max_attempts THEN ? ELSE ? END, "
+                "finished_at = CASE WHEN cancel_requested OR attempts >= max_attempts THEN ? END, "
+                "error = 'Worker stopped responding', worker = NULL, available_at = ? "
+                f"WHERE status = ? AND {condition}",
+                (CANCELLED, QUEUED, FAILED, now, now, RUNNING, value)
+            )
+        return cursor.rowcount
+
+    def purge(self, retention=JOB_RETENTION):
+        """Delete finished jobs older than retention seconds; returns how many"""
+        with self._transaction() as db:
+            cursor = db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?",
+                FINISHED + (time.time() - retention,)
+            )
+        return cursor.rowcount
+
+
+def job_dict(row, with_result=True):
+    """A job row in the camelCase shape the API returns"""
+    job = {
+        "id": row["id"],
+        "idea": row["idea"],
+        "status": row["status"],
+        "attempts": row["attempts"],
+        "maxAttempts": row["max_attempts"],
+        "worker": row["worker"],
+        "cancelRequested": bool(row["cancel_requested"]),
+        "error": row["error"],
+        "createdAt": row["created_at"],
+        "startedAt": row["started_at"],
+        "finishedAt": row["finished_at"],
+        "timeout": row["timeout"],
+        "detail": row["detail"]
+    }
+    if with_result:
+        # While running, this holds the sections finished so far
+        job["result"] = json.loads(row["result"]) if row["result"] else None
+    return job
+
+
+def worker_name(pid=None):
+    return f"{socket.gethostname()}:{pid or os.getpid()}"
+
+
+def load_workflow(factory=None):
+    """Build the workflow a worker runs jobs with; factory is "module:callable" """
+    if not factory:
+        from Agents import StartupResearchWorkflow
+        return StartupResearchWorkflow()
+    module, _, name = factory.partition(":")
+    return getattr(importlib.import_module(module), name)()
+
+
+def run_job(queue, workflow, job, worker, heartbeat_interval=HEARTBEAT_INTERVAL):
+    """Run one claimed job to completion; returns False if it had to be abandoned
+
+    The analysis runs on a thread while this one sends heartbeats with the
+    sections finished so far. A crew can't be interrupted, so on cancellation
+    the job is marked cancelled and the caller must exit the process to stop
+    the abandoned threads.
+    """
+    from Agents import SECTIONS
+
+    timeout = job["timeout"] or ANALYSIS_TIMEOUT
+    results, outcome = {}, {}
+
+    def analyze():
+        try:
+            for section, data in workflow.iter_analysis(job["idea"], timeout=timeout, detail=job["detail"]):
+                results[section] = data
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=analyze, name=f"job-{job['id'][:8]}", daemon=True)
+    thread.start()
+    # The workflow returns timeout markers at its deadline; this only catches a hung task
+    hard_limit = time.monotonic() + timeout + 60
+    while True:
+        thread.join(heartbeat_interval)
+        if not thread.is_alive():
+            break
+        if not queue.heartbeat(job["id"], worker, progress=dict(results)):
+            queue.mark_cancelled(job["id"], worker)
+            return False
+        if time.monotonic() > hard_limit:
+            queue.fail(job["id"], worker, f"Analysis still running {timeout + 60}s after it started")
+            return False
+
+    if "error" in outcome:
+        queue.fail(job["id"], worker, f"Analysis failed: {outcome['error']}")
+    else:
+        result = {section: results.get(section) for section in SECTIONS}
+        result["rawResults"] = ""
+        queue.complete(job["id"], worker, result)
+    return True
+
+
+def work(db_path=JOB_DB, factory=JOB_WORKFLOW, poll_interval=1.0, once=False):
+    """Worker process loop: claim, run and record jobs until killed
+
+    With once, return when the queue has nothing ready instead of polling.
+    """
+    queue = JobQueue(db_path)
+    workflow = load_workflow(factory)
+    worker = worker_name()
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        if not run_job(queue, workflow, job, worker):
+            # os._exit skips atexit, so write out the analyses recorded so far first
+            history = getattr(workflow, "history", None)
+            if history is not None:
+                history.flush(timeout=5)
+            # Exit so the abandoned crew threads die with the process; the pool starts a new one
+            os._exit(0)
+
+
+class WorkerPool:
+    """Keep worker processes running and the queue tidy
+
+    Dead workers are replaced and their jobs released at once; jobs whose
+    heartbeat went stale (a worker on another host, or a hung process) are
+    released after JOB_STALE_AFTER, and old finished jobs are purged hourly.
+    """
+
+    def __init__(self, processes=JOB_WORKERS, db_path=JOB_DB, factory=JOB_WORKFLOW,
+                 poll_interval=1.0, check_interval=5.0):
+        self.processes = processes
+        self.db_path = db_path
+        self.factory = factory
+        self.poll_interval = poll_interval
+        self.check_interval = check_interval
+        # Forking a process that already runs crew threads is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._workers = []
+        self._stop = threading.Event()
+        self._monitor = None
+
+    def start(self):
+        if self.processes <= 0 or self._monitor is not None:
+            return self
+        self._workers = [self._spawn() for _ in range(self.processes)]
+        self._monitor = threading.Thread(target=self._supervise, name="job-supervisor", daemon=True)
+        self._monitor.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        for process in self._workers:
+            process.terminate()
+        for process in self._workers:
+            process.join(timeout)
+        self._workers = []
+
+    def join(self):
+        """Block until interrupted, e.g. when running workers on their own"""
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            self.stop()
+
+    def _spawn(self):
+        process = self._context.Process(
+            target=work, args=(self.db_path, self.factory, self.poll_interval),
+            name="analysis-worker", daemon=True
+        )
+        process.start()
+        return process
+
+    def _supervise(self):
+        queue = JobQueue(self.db_path)
+        last_purge = 0.0
+        while not self._stop.wait(self.check_interval):
+            for i, process in enumerate(self._workers):
+                if not process.is_alive() and not self._stop.is_set():
+                    queue.release(worker_name(process.pid))
+                    self._workers[i] = self._spawn()
+            queue.requeue_stale()
+            if time.time() - last_purge > 3600:
+                queue.purge()
+                last_purge = time.time()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=JOB_DB, help="SQLite job database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    worker = commands.add_parser("worker", help="Run worker processes until interrupted")
+    worker.add_argument("--processes", type=int, default=max(1, JOB_WORKERS), help="Worker processes")
+    submit = commands.add_parser("submit", help="Queue an analysis")
+    submit.add_argument("idea")
+    submit.add_argument("--timeout", type=int, default=None, help="Analysis timeout in seconds")
+    submit.add_argument("--detail", choices=["basic", "standard", "comprehensive"], default="standard",
+                        help="Analysis detail level")
+    for name in ("status", "cancel", "retry"):
+        command = commands.add_parser(name, help=f"{name.capitalize()} a job")
+        command.add_argument("job_id")
+    commands.add_parser("list", help="Show the newest jobs")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        pool = WorkerPool(args.processes, args.db).start()
+        print(f"{args.processes} workers on {args.db}; Ctrl+C to stop")
+        pool.join()
+        return
+
+    queue = JobQueue(args.db)
+    if args.command == "submit":
+        output = queue.submit(args.idea, timeout=args.timeout, detail=args.detail)
+    elif args.command == "list":
+        output = {"stats": queue.stats(), "jobs": queue.list()}
+    else:
+        output = {"status": queue.get, "cancel": queue.cancel, "retry": queue.retry}[args.command](args.job_id)
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
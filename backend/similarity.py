@@ -0,0 +1,317 @@
+"""Near-duplicate detection over previously analyzed startup ideas.
+
+Each idea becomes a set of content words (lowercased, stopwords dropped,
+plurals and common synonyms folded), summarized by a MinHash signature whose agreement with
+another signature estimates the Jaccard similarity of the two word sets.
+Locality-sensitive hashing splits every signature into bands; ideas that
+share at least one band become candidates, and only those candidates are
+compared. Band hashes live in one sorted array, so a lookup is a single
+vectorized binary search whatever the number of stored ideas. The MinHash
+estimate (standard deviation about 0.05 at 96 permutations) only ranks the
+candidates; the best few are compared on their exact word sets.
+
+The index is local: numpy in memory plus an optional SQLite file, no
+external service.
+"""
+import re
+import json
+import time
+import sqlite3
+import threading
+import zlib
+
+import numpy as np
+
+from cache import make_key, normalize_idea
+
+# 32 bands of 3 rows: ideas at a similarity of 0.5 become candidates 98% of the time
+NUM_PERM = 96
+BANDS = 32
+# Recently added ideas are scanned directly until this many are merged into the sorted bands
+MERGE_EVERY = 1024
+# Bumped whenever idea_terms changes, so signatures stored under the old terms are dropped
+TERMS_VERSION = 2
+# Candidates whose estimate is within this of the threshold get an exact comparison,
+# at most RERANK of them; 0.15 is three standard deviations of the estimate
+ESTIMATE_MARGIN = 0.15
+RERANK = 16
+
+_MERSENNE = (1 << 31) - 1
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the their this to
+was were will with which who how about over than our your we you app platform startup based using
+""".split()) | frozenset(
+    # Phrasing founders vary without changing the idea
+    "aimed built designed featuring offer offers offering provide provides providing help helps helping "
+    "lets allows targeting focused people".split()
+)
+
+# Words founders use interchangeably for the same audience or offering, each
+# folded onto the first of its group ("meal kit for busy professionals" and
+# "meal delivery for busy workers" become the same four terms)
+_SYNONYMS = {word: group[0] for group in (
+    ("worker", "professional", "employee", "staff"),
+    ("delivery", "kit", "box"),
+    ("customer", "client", "consumer", "user"),
+    ("business", "company", "firm", "enterprise", "smb"),
+    ("senior", "elderly", "retiree"),
+    ("student", "learner"),
+) for word in group}
+
+
+def idea_terms(idea):
+    """Content words of an idea, with plurals folded onto their singular and synonyms onto one word"""
+    terms = set()
+    for word in _WORD.findall(str(idea).lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 4 and word.endswith(("xes", "ches", "shes", "sses")):
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.add(_SYNONYMS.get(word, word))
+    return terms
+
+
+class IdeaIndex:
+    """MinHash/LSH index mapping past ideas to a JSON value (e.g. their research)
+
+    lookup() returns the most similar stored idea at or above a threshold.
+    Similarity is the exact Jaccard similarity of the two ideas' content
+    words; signatures only find and rank the candidates. Entries older than max_age seconds, or
+    stored under another version (prompt template, model), are never
+    returned. Adding an idea that normalizes to a stored one replaces it.
+    """
+
+    def __init__(self, db_path=None, version="", max_age=None, num_perm=NUM_PERM, bands=BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.version = f"{version}/terms{TERMS_VERSION}"
+        self.max_age = max_age
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.lookups = 0
+        self.hits = 0
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE, num_perm, dtype=np.uint64)
+        # Odd multipliers mixing a band's rows (and the band number) into one 64-bit key
+        self._mix = rng.integers(1, 1 << 62, self.rows + 1, dtype=np.uint64) | np.uint64(1)
+        self._band_numbers = np.arange(bands, dtype=np.uint64)
+
+        self._ideas = []
+        self._terms = []
+        self._values = []
+        self._ids = {}
+        # Row buffers with spare capacity; only the first len(self._ideas) rows are used
+        self._signatures = np.empty((16, num_perm), dtype=np.uint32)
+        self._band_rows = np.empty((16, bands), dtype=np.uint64)
+        self._created = np.empty(16, dtype=np.float64)
+        self._alive = np.empty(16, dtype=bool)
+        # Band keys of every merged entry, sorted, with the entry each belongs to
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._owners = np.empty(0, dtype=np.int32)
+        self._merged = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ideas (key TEXT NOT NULL, version TEXT NOT NULL, "
+                "idea TEXT NOT NULL, signature BLOB NOT NULL, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (key, version))"
+            )
+            self._db.commit()
+            self._load()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def signature(self, idea):
+        """MinHash signature of an idea's content words, or None if it has none"""
+        terms = idea_terms(idea)
+        if not terms:
+            return None
+        hashes = np.fromiter((zlib.crc32(term.encode("utf-8")) for term in terms),
+                             dtype=np.uint64, count=len(terms))
+        # (a * x + b) mod p fits in 64 bits since a, b < 2^31 and x < 2^32
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % np.uint64(_MERSENNE)
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signatures):
+        """One 64-bit key per band; the band number is mixed in so bands never collide"""
+        rows = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        keys = self._band_numbers * self._mix[-1]
+        for row in range(self.rows):
+            keys = keys ^ (rows[:, :, row] * self._mix[row])
+            keys = keys * np.uint64(0x9E3779B97F4A7C15)
+        return keys
+
+    def add(self, idea, value, created_at=None):
+        """Store value for idea and return whether the idea had words to index"""
+        signature = self.signature(idea)
+        if signature is None:
+            return False
+        created_at = time.time() if created_at is None else created_at
+        key = make_key(normalize_idea(idea))
+        with self._lock:
+            self._append(key, idea, signature, value, created_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ideas (key, version, idea, signature, value, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, self.version, idea, signature.tobytes(), json.dumps(value), created_at)
+                )
+                self._db.commit()
+        return True
+
+    def remove(self, idea):
+        """Forget a stored idea; returns whether it was there"""
+        key = make_key(normalize_idea(idea))
+        with self._lock:
+            index = self._ids.pop(key, None)
+            if index is None:
+                return False
+            self._alive[index] = False
+            self._values[index] = None
+            if self._db is not None:
+                self._db.execute("DELETE FROM ideas WHERE key = ? AND version = ?", (key, self.version))
+                self._db.commit()
+            return True
+
+    def lookup(self, idea, threshold):
+        """Return the most similar stored idea at or above threshold, or None
+
+        The match is a dict with the stored idea, its similarity, value and
+        createdAt time. Every call counts towards the hit rate.
+        """
+        terms = idea_terms(idea)
+        signature = self.signature(idea)
+        match = None
+        with self._lock:
+            if signature is not None:
+                match = self._best(terms, signature, threshold)
+            self.lookups += 1
+            self.hits += match is not None
+        return match
+
+    def stats(self):
+        """Stored ideas, lookups, hits and hit rate"""
+        with self._lock:
+            return {
+                "ideas": len(self._ids),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hitRate": self.hits / self.lookups if self.lookups else 0.0
+            }
+
+    def _best(self, terms, signature, threshold):
+        candidates = self._candidates(signature)
+        candidates = candidates[self._alive[candidates]]
+        if self.max_age is not None:
+            candidates = candidates[self._created[candidates] >= time.time() - self.max_age]
+        if not len(candidates):
+            return None
+        estimates = np.count_nonzero(self._signatures[candidates] == signature, axis=1) / self.num_perm
+        likely = np.flatnonzero(estimates >= threshold - ESTIMATE_MARGIN)
+        likely = likely[np.argsort(-estimates[likely], kind="stable")[:RERANK]]
+        best, best_similarity = None, 0.0
+        for position in likely:
+            stored = self._terms[int(candidates[position])]
+            similarity = len(terms & stored) / len(terms | stored)
+            if similarity > best_similarity:
+                best, best_similarity = int(candidates[position]), similarity
+        if best is None or best_similarity < threshold:
+            return None
+        index = best
+        return {
+            "idea": self._ideas[index],
+            "similarity": round(best_similarity, 3),
+            "value": self._values[index],
+            "createdAt": float(self._created[index])
+        }
+
+    def _candidates(self, signature):
+        """Entries sharing a band with signature: a binary search per band, plus a scan of the unmerged tail"""
+        keys = self._band_keys(signature[None, :])[0]
+        found = []
+        if len(self._keys):
+            lo = np.searchsorted(self._keys, keys, side="left")
+            hi = np.searchsorted(self._keys, keys, side="right")
+            found.extend(self._owners[start:end] for start, end in zip(lo, hi) if end > start)
+        if self._merged < len(self._ideas):
+            tail = self._band_rows[self._merged:len(self._ideas)]
+            hits = np.flatnonzero((tail == keys).any(axis=1))
+            if len(hits):
+                found.append(hits + self._merged)
+        if not found:
+            return np.empty(0, dtype=np.int32)
+        # Sort-and-compare is several times faster than np.unique on these sizes
+        found = np.sort(np.concatenate(found))
+        return found[np.concatenate(([True], found[1:] != found[:-1]))]
+
+    def _append(self, key, idea, signature, value, created_at):
+        index = self._ids.get(key)
+        if index is not None:
+            # Same normalized idea: retire the old entry so the new one wins
+            self._alive[index] = False
+            self._values[index] = None
+        index = len(self._ideas)
+        if index == len(self._signatures):
+            self._signatures, self._band_rows, self._created, self._alive = (
+                _grow(self._signatures), _grow(self._band_rows), _grow(self._created), _grow(self._alive))
+        self._ids[key] = index
+        self._ideas.append(idea)
+        self._terms.append(idea_terms(idea))
+        self._values.append(value)
+        self._signatures[index] = signature
+        self._band_rows[index] = self._band_keys(signature[None, :])[0]
+        self._created[index] = created_at
+        self._alive[index] = True
+        if len(self._ideas) - self._merged >= MERGE_EVERY:
+            self._merge()
+
+    def _merge(self):
+        """Fold the unmerged tail into the sorted band keys"""
+        start = self._merged
+        tail_keys = self._band_rows[start:len(self._ideas)]
+        owners = np.repeat(np.arange(start, len(self._ideas), dtype=np.int32), self.bands)
+        tail_keys = tail_keys.ravel()
+        order = np.argsort(tail_keys)
+        # Sorting only the tail and inserting it is one pass over the merged keys
+        positions = np.searchsorted(self._keys, tail_keys[order])
+        self._keys = np.insert(self._keys, positions, tail_keys[order])
+        self._owners = np.insert(self._owners, positions, owners[order])
+        self._merged = len(self._ideas)
+
+    def _load(self):
+        rows = self._db.execute(
+            "SELECT key, idea, signature, value, created_at FROM ideas WHERE version = ? "
+            "ORDER BY created_at", (self.version,)
+        ).fetchall()
+        if not rows:
+            return
+        signatures = [np.frombuffer(row[2], dtype=np.uint32) for row in rows]
+        if any(len(signature) != self.num_perm for signature in signatures):
+            # Stored with other MinHash settings; those entries can't be compared
+            return
+        self._ideas = [row[1] for row in rows]
+        self._terms = [idea_terms(idea) for idea in self._ideas]
+        self._values = [json.loads(row[3]) for row in rows]
+        self._ids = {row[0]: i for i, row in enumerate(rows)}
+        self._signatures = np.vstack(signatures)
+        self._band_rows = self._band_keys(self._signatures)
+        self._created = np.array([row[4] for row in rows], dtype=np.float64)
+        self._alive = np.ones(len(rows), dtype=bool)
+        self._merge()
+
+
+def _grow(array):
+    """Copy array into a buffer twice its length"""
+    grown = np.empty((2 * len(array),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
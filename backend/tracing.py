@@ -0,0 +1,296 @@
+"""Spans and metrics for the analysis workflow.
+
+Every analysis, crew run, task, LLM call and tool call is recorded as a span
+with its duration and attributes (section, agent role, token counts, retries,
+cache hits). Finished spans are kept in memory, optionally appended to a JSON
+Lines trace file (TRACE_FILE), and folded into a metrics registry whose
+latency histograms and counters render in the Prometheus text format.
+
+Set VERBOSE=false to silence crewai's per-step console output in production.
+"""
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+VERBOSE = os.getenv("VERBOSE", "true").strip().lower() not in ("0", "false", "no", "off")
+
+# Seconds; LLM-backed tasks run from well under a second to several minutes
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+METRIC_HELP = {
+    "startup_span_duration_seconds": ("histogram", "Duration of traced operations by kind and name"),
+    "startup_spans_total": ("counter", "Traced operations by kind, name and status"),
+    "startup_llm_tokens_total": ("counter", "LLM tokens used by model, section and token type"),
+    "startup_cache_requests_total": ("counter", "Cache lookups by cache and result"),
+    "startup_retries_total": ("counter", "Retried tool calls and correction prompts"),
+    "startup_http_request_duration_seconds": ("histogram", "API request latency by route and status"),
+    "startup_llm_quota_wait_seconds": ("histogram", "Time tasks queued for the shared LLM quota by section")
+}
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (0-1)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, count in zip(self.buckets, self.counts):
+            if count >= rank:
+                return bound
+        return float("inf")
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class MetricsRegistry:
+    """In-process counters and histograms keyed by metric name and labels"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, metric, value=1, **labels):
+        """Add value to a counter"""
+        with self._lock:
+            series = self._counters.setdefault(metric, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, metric, value, **labels):
+        """Record one observation in a histogram"""
+        with self._lock:
+            series = self._histograms.setdefault(metric, {})
+            key = _label_key(labels)
+            if key not in series:
+                series[key] = Histogram(self.buckets)
+            series[key].observe(value)
+
+    def histogram(self, metric, **labels):
+        """Return the histogram for a metric and labels, or None"""
+        return self._histograms.get(metric, {}).get(_label_key(labels))
+
+    def snapshot(self):
+        """Counters, plus count/sum/p50/p95 per histogram, as plain dicts"""
+        with self._lock:
+            counters = {
+                name: {_format_labels(key) or "total": value for key, value in series.items()}
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: {
+                    _format_labels(key) or "total": {
+                        "count": hist.count,
+                        "sum": round(hist.sum, 6),
+                        "p50": hist.quantile(0.5),
+                        "p95": hist.quantile(0.95)
+                    }
+                    for key, hist in series.items()
+                }
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, "counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, "histogram")
+                for key, hist in series.items():
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _header(self, lines, name, kind):
+        kind, help_text = METRIC_HELP.get(name, (kind, name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+class Span:
+    """One timed operation; start is wall-clock epoch seconds"""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start",
+                 "duration", "status", "attributes", "_started")
+
+    def __init__(self, name, kind, parent=None, attributes=None, start=None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time() if start is None else start
+        self.duration = None
+        self.status = "ok"
+        self.attributes = dict(attributes or {})
+        self._started = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentId": self.parent_id,
+            "start": self.start,
+            "duration": self.duration,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    """Creates spans, remembers recent ones and feeds their metrics
+
+    The active span is tracked per thread and per asyncio task through a
+    context variable. Work handed to another thread keeps its parent when
+    wrapped with within().
+    """
+
+    def __init__(self, metrics, trace_file=None, max_spans=10000):
+        self.metrics = metrics
+        self.trace_file = trace_file
+        self.spans = deque(maxlen=max_spans)
+        self._current = contextvars.ContextVar("current_span", default=None)
+        self._links = OrderedDict()
+        self._lock = threading.Lock()
+
+    def current(self):
+        return self._current.get()
+
+    def start_span(self, name, kind, parent=None, **attributes):
+        """Start a span without making it current; finish it with end_span"""
+        return Span(name, kind, parent or self.current(), attributes)
+
+    def end_span(self, span, error=None):
+        span.duration = time.perf_counter() - span._started
+        if error is not None:
+            span.status = "error"
+            span.attributes["error"] = str(error)
+        self._finish(span)
+
+    @contextmanager
+    def span(self, name, kind, parent=None, **attributes):
+        """Time the block as a child of the current (or given) span"""
+        span = self.start_span(name, kind, parent, **attributes)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self._current.reset(token)
+            self.end_span(span, e)
+            raise
+        self._current.reset(token)
+        self.end_span(span)
+
+    def within(self, parent, fn, *args, **kwargs):
+        """Call fn with parent as the current span, e.g. on a pool thread"""
+        token = self._current.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._current.reset(token)
+
+    def record(self, name, kind, start, end, parent=None, status="ok", **attributes):
+        """Add a span timed elsewhere, e.g. from a library event"""
+        span = Span(name, kind, parent, attributes, start=start)
+        span.duration = max(0.0, end - start)
+        span.status = status
+        self._finish(span)
+        return span
+
+    def link(self, key, span, max_links=1000, **attributes):
+        """Remember span, plus attributes for its children, under an external id such as a crewai task id"""
+        with self._lock:
+            self._links[key] = (span, attributes)
+            while len(self._links) > max_links:
+                self._links.popitem(last=False)
+
+    def linked(self, key):
+        """Return (span, attributes) remembered under key, or (None, {})"""
+        with self._lock:
+            return self._links.get(key, (None, {}))
+
+    def export(self, path):
+        """Write every remembered span to path as one JSON document"""
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"spans": spans}, f, indent=2, default=str)
+        return len(spans)
+
+    def _finish(self, span):
+        attrs = span.attributes
+        self.metrics.observe("startup_span_duration_seconds", span.duration, kind=span.kind, name=span.name)
+        self.metrics.inc("startup_spans_total", kind=span.kind, name=span.name, status=span.status)
+        for token_type in ("prompt", "completion"):
+            if attrs.get(f"{token_type}Tokens"):
+                self.metrics.inc("startup_llm_tokens_total", attrs[f"{token_type}Tokens"],
+                                 model=span.name, section=attrs.get("section", ""), type=token_type)
+        if attrs.get("retries"):
+            self.metrics.inc("startup_retries_total", attrs["retries"], kind=span.kind, name=span.name)
+        with self._lock:
+            self.spans.append(span)
+            if self.trace_file:
+                with open(self.trace_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+def record_cache(cache, hit):
+    """Count one lookup in the named cache"""
+    metrics.inc("startup_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+# Process-wide registry and tracer. Set TRACE_FILE to append finished spans as JSON Lines.
+metrics = MetricsRegistry()
+tracer = Tracer(metrics, trace_file=os.getenv("TRACE_FILE"))
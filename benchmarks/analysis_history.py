@@ -0,0 +1,127 @@
+"""Query latency of the analysis history store at a million analyses.
+
+--analyses synthetic analyses (workflow results and orchestrator reports, with
+competitor names and category scores) are loaded into an AnalysisHistory
+(backend/history.py) on a scratch file, then every query the API serves is
+timed: fetching one analysis, the newest page and a deep page, filtering by
+idea and industry, ordering by a score, full-text search over ideas and
+competitor names, and comparing two analyses. It also times record() as the
+request path sees it and the batched writes behind it.
+
+    python benchmarks/analysis_history.py --analyses 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import stubs  # noqa: F401  (puts backend/ on sys.path)
+from history import SCORES, AnalysisHistory, report_row, workflow_row
+from idea_similarity import random_idea
+
+INDUSTRIES = ["AI/ML", "Fintech", "Healthtech", "Food delivery", "Edtech", "Climate tech",
+              "E-commerce", "Cybersecurity", "Gaming", "Logistics"]
+COMPETITORS = [f"{prefix}{suffix}" for prefix in ("Fresh", "Green", "Quick", "Smart", "Blue", "Urban", "Nova", "Peak")
+               for suffix in ("ly", "Hub", "Box", "Labs", "Go", "Works", "Mart", "Base")]
+
+
+def synthetic_row(i, rng, created_at):
+    idea = random_idea(rng)
+    competitors = [{"name": name, "description": "A competitor", "strengths": ["Scale"]}
+                   for name in rng.sample(COMPETITORS, 4)]
+    if i % 4:
+        return workflow_row(idea, {
+            "marketResearch": {"marketSize": {"value": "$20B", "year": 2024, "cagr": "12%"},
+                               "competitors": competitors, "trends": ["Health-conscious eating"]},
+            "teamResources": [{"role": "CTO", "priority": "High"}],
+            "swotAnalysis": {"strengths": ["Brand"], "weaknesses": ["Cost"]}
+        }, created_at)
+    results = [{"category": category, "score": round(rng.random(), 2), "analysis_summary": "Score: 0.5"}
+               for category in ("market", "financial", "competition", "risk")]
+    results[2]["competitor_list"] = ", ".join(c["name"] for c in competitors)
+    return report_row({"name": f"Startup {i}", "industry": rng.choice(INDUSTRIES), "description": idea},
+                      {"analysis_results": results, "overall_score": round(rng.random(), 2)}, created_at)
+
+
+def timed(fn, repeat):
+    """Median and p99 of repeat calls, in milliseconds, and the last result"""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))], result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--analyses", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per query")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    path = os.path.join(tempfile.mkdtemp(prefix="history-"), "history.db")
+    history = AnalysisHistory(path, batch_size=5000, flush_interval=0.05)
+    start = time.perf_counter()
+    now = time.time()
+    ideas = []
+    for first in range(0, args.analyses, 10000):
+        rows = [synthetic_row(i, rng, now - (args.analyses - i)) for i in range(first, min(first + 10000, args.analyses))]
+        ideas += [row[1] for row in rows[::100]]
+        history.write_many(rows)
+    load = time.perf_counter() - start
+    print(f"{history.count()} analyses loaded in {load:.0f}s, {os.path.getsize(path) / 2**20:.0f} MiB on disk\n")
+
+    newest = history.list(limit=50)
+    deep = {"cursor": newest["next"]}
+
+    def next_page():
+        page = history.list(limit=50, cursor=deep["cursor"])
+        deep["cursor"] = page["next"]
+        return page
+
+    # Walk a few thousand pages in, so the timed pages sit deep in the table
+    for _ in range(2000):
+        next_page()
+    queries = {
+        "get one": lambda: history.get(rng.randint(1, args.analyses)),
+        "newest page": lambda: history.list(limit=50),
+        "deep page": next_page,
+        "by idea": lambda: history.list(idea=rng.choice(ideas)),
+        "by industry": lambda: history.list(industry=rng.choice(INDUSTRIES)),
+        "by score": lambda: history.list(order=rng.choice(SCORES)),
+        "industry by score": lambda: history.list(industry=rng.choice(INDUSTRIES), order="market"),
+        "search idea": lambda: history.search(rng.choice(("meal kit", "tutoring berlin", "pet care seniors"))),
+        "search competitor": lambda: history.search(rng.choice(COMPETITORS), field="competitors"),
+        "compare": lambda: history.compare(rng.randint(1, args.analyses), rng.randint(1, args.analyses))
+    }
+    print(f"{'query':<18} {'p50 ms':>7} {'p99 ms':>7} {'rows':>5}")
+    for name, query in queries.items():
+        p50, p99, result = timed(query, args.repeat)
+        rows = len(result["items"]) if isinstance(result, dict) and "items" in result else 1
+        print(f"{name:<18} {p50:>7.2f} {p99:>7.2f} {rows:>5}")
+
+    # What the request path pays to record an analysis, and the writes behind it
+    rows = [synthetic_row(args.analyses + i, rng, None) for i in range(2000)]
+    latencies = []
+    start = time.perf_counter()
+    for source, idea, name, industry, created_at, scores, competitors, result in rows:
+        began = time.perf_counter()
+        if source == "workflow":
+            history.record(idea, result)
+        else:
+            history.record_report({"name": name, "industry": industry, "description": idea}, result)
+        latencies.append((time.perf_counter() - began) * 1e6)
+    history.flush()
+    drained = time.perf_counter() - start
+    print(f"\nrecord(): p50 {statistics.median(latencies):.0f} us; 2000 analyses written in "
+          f"{history.stats['batches'] - args.analyses // 10000} batches, {drained * 1000:.0f} ms in all")
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
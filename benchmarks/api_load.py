@@ -0,0 +1,78 @@
+"""Load test for the /api/analyze endpoint against a stubbed LLM.
+
+Requests go through httpx's in-process ASGI transport, so the numbers cover
+the FastAPI app and its analysis pool but not network or uvicorn overhead.
+
+    python benchmarks/api_load.py --latency 0.2 --concurrency 1 10 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from stubs import SAMPLE_IDEA, StubLLM
+import api
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_level(client, concurrency, total):
+    """Fire `total` requests with at most `concurrency` in flight"""
+    latencies = []
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/api/analyze", json={"idea": SAMPLE_IDEA})
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "failures": failures,
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 99)
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per stubbed LLM call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=0, help="Requests per level (default 2x concurrency, min 10)")
+    args = parser.parse_args()
+
+    api.workflow.llm = StubLLM(model="stub", latency=args.latency)
+    api.workflow.search_tool = None
+    # Every request sends the same idea, so bypass the result cache
+    api.workflow.cache = None
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        print(f"analysis pool size: {api.MAX_CONCURRENT_ANALYSES}")
+        print(f"{'clients':>8} {'reqs':>6} {'fail':>5} {'req/s':>8} {'p50 (s)':>9} {'p99 (s)':>9}")
+        for concurrency in args.concurrency:
+            total = args.requests or max(10, 2 * concurrency)
+            row = await run_level(client, concurrency, total)
+            print(f"{row['concurrency']:>8} {row['requests']:>6} {row['failures']:>5} "
+                  f"{row['rps']:>8.2f} {row['p50']:>9.3f} {row['p99']:>9.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,242 @@
+"""Record and replay LLM and HTTP traffic of the agent pipelines.
+
+A cassette is a JSON Lines file of interactions: the request (LLM messages,
+or an HTTP method, URL and body), the response, and how long the live call
+took. In record mode every call goes to the real provider and
+is appended to the cassette; in replay mode calls are answered from it, after
+the recorded latency (optionally scaled) or a fixed one, and a request the
+cassette doesn't hold raises CassetteMiss instead of reaching the network.
+
+Two wrappers cover the two pipelines:
+
+- CassetteLLM stands in for StartupResearchWorkflow.llm and for the LLM of
+  each agent the ai_agents analyzers create.
+- Cassette.patch_http() intercepts every requests call (Serper, Firecrawl,
+  page revalidation), and with it the analyzers' tool calls. Request headers,
+  and with them API keys, are never stored.
+
+Identical requests are answered in the order they were recorded, the last
+answer repeating once they run out. Request bodies are matched as canonical
+JSON, so key order doesn't matter, but any prompt change (a template edit, a
+crewai upgrade) is a miss: record the cassette again.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM, llm_call_context
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request that was never recorded"""
+
+
+def request_key(kind, request):
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{kind}\x1f{canonical}".encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Interactions of one recording session, keyed by kind and request
+
+    mode is "record" or "replay". In replay, latency=None waits the recorded
+    time multiplied by scale; a number waits that many seconds instead.
+    """
+
+    def __init__(self, path, mode="replay", latency=None, scale=1.0, meta=None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.scale = scale
+        self.meta = dict(meta or {})
+        self.stats = defaultdict(int)
+        self._interactions = defaultdict(list)
+        self._served = defaultdict(int)
+        self._lock = threading.Lock()
+        if mode == "record":
+            # Start a fresh recording; the first line holds the metadata
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"kind": "meta", "meta": self.meta}) + "\n")
+        else:
+            self._load()
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["kind"] == "meta":
+                    self.meta.update(entry["meta"])
+                else:
+                    self._interactions[entry["key"]].append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._interactions.values())
+
+    def record(self, kind, request, response, seconds, **extra):
+        entry = {"kind": kind, "key": request_key(kind, request), "request": request,
+                 "response": response, "seconds": round(seconds, 4), **extra}
+        with self._lock:
+            self._interactions[entry["key"]].append(entry)
+            self.stats[f"{kind}.recorded"] += 1
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        return entry
+
+    def lookup(self, kind, request):
+        """Return the next recorded interaction for request, or raise CassetteMiss"""
+        key = request_key(kind, request)
+        with self._lock:
+            entries = self._interactions.get(key)
+            if not entries:
+                self.stats[f"{kind}.missed"] += 1
+                raise CassetteMiss(f"No recorded {kind} interaction for {_describe(request)}")
+            index = min(self._served[key], len(entries) - 1)
+            self._served[key] += 1
+            self.stats[f"{kind}.replayed"] += 1
+        return entries[index]
+
+    def delay(self, entry):
+        """Seconds to wait before answering entry in replay"""
+        if self.latency is not None:
+            return self.latency
+        return entry["seconds"] * self.scale
+
+    def serve(self, kind, request, call, encode=lambda response: response, error=RuntimeError):
+        """Answer request from the cassette, or run call() and record it
+
+        encode turns a live response into what is stored. A call that raised
+        is recorded too and replayed by raising `error` with its message.
+        """
+        if self.mode == "replay":
+            entry = self.lookup(kind, request)
+            time.sleep(self.delay(entry))
+            if "error" in entry:
+                raise error(entry["error"])
+            return entry["response"]
+        start = time.perf_counter()
+        try:
+            response = encode(call())
+        except Exception as e:
+            self.record(kind, request, None, time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+            raise
+        self.record(kind, request, response, time.perf_counter() - start)
+        return response
+
+    @contextmanager
+    def patch_http(self):
+        """Route every request made through requests via the cassette"""
+        original = HTTPAdapter.send
+        cassette = self
+
+        def send(adapter, prepared, *args, **kwargs):
+            request = {"method": prepared.method, "url": prepared.url, "body": _body(prepared.body)}
+
+            def live():
+                return original(adapter, prepared, *args, **kwargs)
+
+            stored = cassette.serve("http", request, live, encode=_encode_response,
+                                    error=requests.ConnectionError)
+            return _decode_response(stored, prepared)
+
+        HTTPAdapter.send = send
+        try:
+            yield self
+        finally:
+            HTTPAdapter.send = original
+
+
+def _describe(request):
+    if isinstance(request, dict) and "url" in request:
+        return f"{request['method']} {request['url']}"
+    text = json.dumps(request, default=str)
+    return text[:120] + ("..." if len(text) > 120 else "")
+
+
+def _body(body):
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        return json.loads(body)
+    except (TypeError, ValueError):
+        return body
+
+
+def _encode_response(response):
+    return {
+        "status": response.status_code,
+        "reason": response.reason,
+        "headers": dict(response.headers),
+        "body": response.content.decode("utf-8", errors="replace")
+    }
+
+
+def _decode_response(stored, prepared):
+    response = requests.Response()
+    response.status_code = stored["status"]
+    response.reason = stored.get("reason")
+    # The body is stored decoded, so it must not be decompressed again
+    headers = {key: value for key, value in stored["headers"].items()
+               if key.lower() not in ("content-encoding", "transfer-encoding", "content-length")}
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = stored["body"].encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = prepared.url
+    response.request = prepared
+    return response
+
+
+def _messages(messages):
+    if isinstance(messages, str):
+        return messages
+    return [{"role": message.get("role"), "content": str(message.get("content", ""))} for message in messages]
+
+
+class CassetteLLM(BaseLLM):
+    """LLM that records the calls of `inner`, or replays them without it"""
+
+    cassette: Any = None
+    inner: Any = None
+
+    def call(self, messages, *args, from_task=None, from_agent=None, **kwargs):
+        request = {"model": self.model, "messages": _messages(messages)}
+        if self.cassette.mode == "record":
+            # The agent sets its stop words on the LLM it was given
+            self.inner.stop = self.stop
+            before = self.inner.get_token_usage_summary()
+            start = time.perf_counter()
+            response = self.inner.call(messages, *args, from_task=from_task, from_agent=from_agent, **kwargs)
+            after = self.inner.get_token_usage_summary()
+            usage = {
+                "prompt_tokens": after.prompt_tokens - before.prompt_tokens,
+                "completion_tokens": after.completion_tokens - before.completion_tokens,
+                "total_tokens": after.total_tokens - before.total_tokens
+            }
+            self._track_token_usage_internal(usage)
+            self.cassette.record("llm", request, response, time.perf_counter() - start, usage=usage)
+            return response
+
+        with llm_call_context():
+            # Emit the same events as the recorded provider so tracing sees the call
+            self._emit_call_started_event(messages=messages, from_task=from_task, from_agent=from_agent)
+            entry = self.cassette.lookup("llm", request)
+            time.sleep(self.cassette.delay(entry))
+            usage = entry.get("usage") or {}
+            self._track_token_usage_internal(usage)
+            self._emit_call_completed_event(response=entry["response"], call_type=LLMCallType.LLM_CALL,
+                                            from_task=from_task, from_agent=from_agent, usage=usage)
+        return entry["response"]
@@ -0,0 +1,119 @@
+"""N identical concurrent analyses with and without request coalescing.
+
+Backend: N threads call StartupResearchWorkflow.run_analysis for the same idea
+(with differing case and whitespace) with the result caches disabled, so only
+coalescing can prevent duplicate work. StubLLM counts the LLM calls made.
+
+ai_agents: N identical analyze_startup coroutines are gathered on one
+orchestrator whose agents are stubbed. A failing run is shared by every waiter
+and not remembered, and cancelling one waiter leaves the others running.
+
+    python benchmarks/coalescing.py --requests 8 --latency 0.5
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stubs import SAMPLE_IDEA, StubAgent, StubLLM, stub_agents
+from Agents import StartupResearchWorkflow
+from cache import SingleFlight
+from orchestrator import StartupAnalysisOrchestrator
+
+STARTUP = {
+    "name": "TechStart",
+    "industry": "AI/ML",
+    "description": "AI-powered business analytics platform"
+}
+
+
+def variants(idea, count):
+    """Copies of idea that normalize to the same text"""
+    forms = [idea, idea.upper(), "  " + idea.replace(" ", "   ") + "\n"]
+    return [forms[i % len(forms)] for i in range(count)]
+
+
+def run_backend(args, flights):
+    workflow = StartupResearchWorkflow(cache=None, task_cache=None, flights=flights)
+    workflow.llm = StubLLM(model="stub", latency=args.latency)
+    workflow.search_tool = None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.requests) as executor:
+        results = list(executor.map(workflow.run_analysis, variants(SAMPLE_IDEA, args.requests)))
+    elapsed = time.perf_counter() - start
+    assert all("error" not in result["swotAnalysis"] for result in results)
+    return workflow.llm.get_token_usage_summary().successful_requests, elapsed
+
+
+async def run_orchestrator(args):
+    orchestrator = StartupAnalysisOrchestrator()
+    stub_agents(orchestrator, args.latency)
+    requests = [dict(STARTUP, name=name) for name in variants(STARTUP["name"], args.requests)]
+
+    StubAgent.reset()
+    start = time.perf_counter()
+    reports = await asyncio.gather(*(orchestrator.analyze_startup(data) for data in requests))
+    elapsed = time.perf_counter() - start
+    assert all(report is reports[0] for report in reports)
+    print(f"orchestrator: {args.requests} requests -> {StubAgent.calls} agent calls "
+          f"(one analysis makes 12) in {elapsed:.2f}s, flights {orchestrator.flights.calls} "
+          f"run / {orchestrator.flights.shared} shared")
+
+    # Cancelling one waiter detaches it; the others still get the report
+    StubAgent.reset()
+    waiters = [asyncio.ensure_future(orchestrator.analyze_startup(STARTUP)) for _ in range(3)]
+    await asyncio.sleep(args.latency / 2)
+    waiters[0].cancel()
+    done = await asyncio.gather(*waiters, return_exceptions=True)
+    assert isinstance(done[0], asyncio.CancelledError) and done[1] is done[2]
+    print(f"  cancel one of 3 waiters: others completed, {StubAgent.calls} agent calls")
+
+    # Cancelling every waiter cancels the shared run
+    waiters = [asyncio.ensure_future(orchestrator.analyze_startup(STARTUP)) for _ in range(3)]
+    await asyncio.sleep(args.latency / 2)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    assert not orchestrator.flights._tasks
+    print("  cancel all waiters: shared run cancelled and forgotten")
+
+
+def failure_is_shared_not_cached():
+    flights = SingleFlight()
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        time.sleep(0.2)
+        if len(calls) == 1:
+            raise RuntimeError("provider unavailable")
+        return "ok"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flights.do, "key", flaky) for _ in range(4)]
+        errors = sum(1 for future in futures if future.exception() is not None)
+    assert errors == 4 and len(calls) == 1
+    assert flights.do("key", flaky) == "ok" and len(calls) == 2
+    print("  failure: all 4 waiters got the error, the next call ran again and succeeded")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=8, help="Identical concurrent requests")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per stubbed call")
+    args = parser.parse_args()
+
+    llm_calls, elapsed = run_backend(args, flights=None)
+    print(f"backend without coalescing: {args.requests} requests -> {llm_calls} LLM calls in {elapsed:.2f}s")
+    flights = SingleFlight()
+    llm_calls, elapsed = run_backend(args, flights=flights)
+    print(f"backend with coalescing:    {args.requests} requests -> {llm_calls} LLM calls in {elapsed:.2f}s "
+          f"({flights.stats()})")
+    failure_is_shared_not_cached()
+
+    asyncio.run(run_orchestrator(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Cold-start cost of the backend: import time and time-to-first-request.
+
+Runs each measurement in a fresh interpreter, the way an autoscaled worker
+starts.
+
+- `python -X importtime -c "import Agents"` gives the total import time and
+  the slowest top-level imports.
+- A child process imports the API, serves one request against a stubbed LLM
+  and reports how long that took from interpreter start, then times a
+  second, warm request for comparison.
+
+    python benchmarks/cold_start.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.join(os.path.dirname(HERE), "backend")
+
+
+def import_profile(module, top):
+    """Return (total seconds, [(seconds, name)]) for importing module"""
+    env = dict(os.environ, GEMINI_API_KEY=os.environ.get("GEMINI_API_KEY", "stub"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Keep imports made directly by the module; deeper ones are indented further
+        depth = len(name) - len(name.lstrip()) - 1
+        if depth <= 2:
+            entries.append((int(cumulative) / 1e6, name.strip()))
+    total = next(seconds for seconds, name in entries if name == module)
+    direct = [entry for entry in entries if entry[1] != module]
+    return total, sorted(direct, reverse=True)[:top]
+
+
+def child():
+    """Serve one cold and one warm request, printing elapsed times"""
+    started = time.perf_counter()
+    from stubs import SAMPLE_IDEA, StubLLM
+    from fastapi.testclient import TestClient
+    import api
+    imported = time.perf_counter()
+
+    api.workflow.llm = StubLLM(model="stub", latency=0.0)
+    api.workflow.search_tool = None
+    api.workflow.cache = api.workflow.task_cache = None
+    client = TestClient(api.app)
+
+    client.post("/api/analyze", json={"idea": SAMPLE_IDEA}).raise_for_status()
+    first = time.perf_counter()
+    client.post("/api/analyze", json={"idea": SAMPLE_IDEA}).raise_for_status()
+    second = time.perf_counter()
+    print(f"RESULT {imported - started:.3f} {first - started:.3f} {second - first:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=10, help="How many slow imports to list")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    total, slowest = import_profile("Agents", args.top)
+    print(f"import Agents: {total:.3f}s")
+    for seconds, name in slowest:
+        print(f"  {seconds:7.3f}s  {name}")
+
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, __file__, "--child"], capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    result = next(line for line in proc.stdout.splitlines() if line.startswith("RESULT "))
+    imported, first, warm = (float(value) for value in result.split()[1:])
+    print(f"process start to first response: {wall:.3f}s wall "
+          f"({imported:.3f}s imports, {first - imported:.3f}s first request)")
+    print(f"warm request: {warm:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
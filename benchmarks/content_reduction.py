@@ -0,0 +1,96 @@
+"""Tokens and latency saved by reducing scraped pages before they reach the LLM.
+
+benchmarks/data/pages holds saved Firecrawl-style markdown pages about one
+startup idea, with the navigation, cookie banners, footers and syndicated
+press releases real pages carry. For each analyzer-style task the pages go
+into the prompt twice: raw, as the analyzers pass tool output today, and
+through ContentReducer (ai_agents/reduce.py) under a token budget.
+
+The report shows tokens in and out, whether the facts each task needs
+survived, and end-to-end latency of reduction plus one StubLLM call whose
+latency grows with the prompt (--per-1k-tokens seconds per 1,000 tokens).
+
+    python benchmarks/content_reduction.py --budget 1500
+"""
+import argparse
+import glob
+import os
+import time
+
+from stubs import StubLLM
+from reduce import ContentReducer, estimate_tokens
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "pages")
+
+# Queries in the spirit of the analyzers' prompts, with facts the answer needs
+TASKS = {
+    "market": ("market size growth rate CAGR trends regional share",
+               ["19.92 billion", "15.3%", "41.7%", "17.8%", "14.6 billion"]),
+    "competitors": ("competitors market share HelloFresh Blue Apron positioning pricing",
+                    ["more than 60%", "Wonder Group", "USD 11.50", "Sunbasket, Trifecta and Factor"]),
+    "financials": ("funding revenue unit economics margin acquisition cost investors",
+                   ["USD 45 million", "24%", "USD 95", "USD 68 million"]),
+    "risks": ("risks churn packaging waste regulation data privacy",
+              ["fewer than 20%", "BIPA", "extended producer responsibility", "61%"])
+}
+PROMPT = "Based on the research below, analyze the {task} of a meal kit startup.\n\n{research}"
+
+
+def load_pages(path=PAGES):
+    pages = []
+    for name in sorted(glob.glob(os.path.join(path, "*.md"))):
+        with open(name, encoding="utf-8") as f:
+            stem = os.path.splitext(os.path.basename(name))[0]
+            pages.append({"markdown": f.read(), "metadata": {"sourceURL": f"https://example.com/{stem}"}})
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=1500, help="Token budget per task")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fixed stub LLM latency in seconds")
+    parser.add_argument("--per-1k-tokens", type=float, default=0.2, help="Stub LLM seconds per 1,000 prompt tokens")
+    parser.add_argument("--input-price", type=float, default=0.10, help="USD per 1M prompt tokens")
+    args = parser.parse_args()
+
+    pages = load_pages()
+    raw_research = "\n\n".join(page["markdown"] for page in pages)
+    reducer = ContentReducer(args.budget)
+    llm = StubLLM(model="stub", latency=args.latency, prompt_token_latency=args.per_1k_tokens / 1000)
+
+    print(f"{len(pages)} pages, {estimate_tokens(raw_research)} tokens raw, budget {args.budget}\n")
+    print(f"{'task':<12} {'tokens in':>9} {'out':>5} {'saved':>6} {'dupes':>5} {'facts':>6} "
+          f"{'reduce ms':>9} {'raw s':>6} {'reduced s':>9}")
+    totals = {"raw": 0, "reduced": 0, "raw_seconds": 0.0, "reduced_seconds": 0.0, "facts": 0, "kept": 0}
+    for task, (query, facts) in TASKS.items():
+        start = time.perf_counter()
+        llm.call(PROMPT.format(task=task, research=raw_research))
+        raw_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reduced = reducer.reduce(query, pages)
+        reduce_seconds = time.perf_counter() - start
+        llm.call(PROMPT.format(task=task, research=reduced["content"]))
+        reduced_seconds = time.perf_counter() - start
+
+        stats = reduced["stats"]
+        kept = sum(fact in reduced["content"] for fact in facts)
+        print(f"{task:<12} {stats['tokensIn']:>9} {stats['tokensOut']:>5} "
+              f"{1 - stats['tokensOut'] / stats['tokensIn']:>6.0%} {stats['duplicates']:>5} "
+              f"{kept:>3}/{len(facts):<2} {reduce_seconds * 1e3:>9.1f} {raw_seconds:>6.2f} {reduced_seconds:>9.2f}")
+        totals["raw"] += stats["tokensIn"]
+        totals["reduced"] += stats["tokensOut"]
+        totals["raw_seconds"] += raw_seconds
+        totals["reduced_seconds"] += reduced_seconds
+        totals["facts"] += len(facts)
+        totals["kept"] += kept
+
+    cost = lambda tokens: tokens * args.input_price / 1e6
+    print(f"\ntotal: {totals['raw']} -> {totals['reduced']} prompt tokens "
+          f"({1 - totals['reduced'] / totals['raw']:.0%} fewer, ${cost(totals['raw']):.5f} -> "
+          f"${cost(totals['reduced']):.5f}), {totals['kept']}/{totals['facts']} facts kept, "
+          f"{totals['raw_seconds']:.2f}s -> {totals['reduced_seconds']:.2f}s end to end")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Latency and LLM usage of an analysis at each detail level.
+
+Runs --runs uncached analyses at the basic, standard and comprehensive levels
+(DETAIL_LEVELS in backend/Agents.py) on a stub LLM and search tool that
+behave like the real ones in time and size: every call takes --first-token
+seconds plus its answer at --tokens-per-second, agents with the search tool
+search --tool-steps times before answering, each search takes
+--search-latency seconds, and answers fill every list with --items items, or
+with as many as the prompt allows.
+
+For each level it reports the median wall time to a finished analysis, LLM
+calls, searches and prompt and completion tokens per analysis.
+
+    python benchmarks/detail_levels.py --runs 3
+"""
+import argparse
+import copy
+import json
+import os
+import re
+import statistics
+import time
+
+os.environ.setdefault("VERBOSE", "false")
+
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import llm_call_context
+from crewai.tools import BaseTool
+
+from stubs import SAMPLE_IDEA, StubLLM, canned_response, timed
+from Agents import DETAIL_LEVELS, SECTIONS, StartupResearchWorkflow, is_parsed
+
+SEARCH_TOOL_NAME = "Search the internet with Serper"
+
+
+def expand(value, items, index=0):
+    """Fill every list in a canned answer with `items` entries"""
+    if isinstance(value, dict):
+        return {key: expand(child, items, index) for key, child in value.items()}
+    if isinstance(value, list) and value:
+        return [expand(copy.deepcopy(value[i % len(value)]), items, i) for i in range(items)]
+    if isinstance(value, str) and index:
+        return f"{value} {index + 1}"
+    return value
+
+
+class TimedStubLLM(StubLLM):
+    """StubLLM whose calls take as long as a real model's would, and that uses its tools"""
+
+    first_token: float = 0.5
+    tokens_per_second: float = 150.0
+    tool_steps: int = 2
+    items: int = 6
+
+    def call(self, messages, *args, from_task=None, from_agent=None, **kwargs):
+        if isinstance(messages, str):
+            prompt = messages
+        else:
+            prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        with llm_call_context():
+            self._emit_call_started_event(messages=messages, from_task=from_task, from_agent=from_agent)
+            # The tool instructions quote "Observation:" once themselves
+            searches = prompt.count("Observation:") - prompt.count("Observation: the result of the action")
+            tool = re.search(r"Tool Name: (\S+)", prompt)
+            if tool and searches < self.tool_steps:
+                response = ("Thought: I should search for more information\n"
+                            f"Action: {tool.group(1)}\n"
+                            f'Action Input: {{"search_query": "startup research step {searches + 1}"}}')
+            else:
+                limit = re.search(r"at most (\d+) items", prompt)
+                answer = expand(canned_response(prompt), int(limit.group(1)) if limit else self.items)
+                response = f"Thought: I now know the final answer\nFinal Answer: {json.dumps(answer)}"
+            prompt_tokens, completion_tokens = len(prompt) // 4, len(response) // 4
+            time.sleep(self.first_token + completion_tokens / self.tokens_per_second)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+            self._track_token_usage_internal(usage)
+            self._emit_call_completed_event(response=response, call_type=LLMCallType.LLM_CALL,
+                                            from_task=from_task, from_agent=from_agent, usage=usage)
+        return response
+
+
+class StubSearchTool(BaseTool):
+    """Stands in for the Serper search tool, with a fixed latency"""
+
+    name: str = SEARCH_TOOL_NAME
+    description: str = "Search the internet for the given query and return the top results."
+    latency: float = 1.5
+    calls: int = 0
+
+    def _run(self, search_query: str) -> str:
+        time.sleep(self.latency)
+        self.calls += 1
+        return json.dumps({"organic": [
+            {"title": f"Result {i + 1}", "link": f"https://example.com/{i + 1}",
+             "snippet": f"What result {i + 1} says about {search_query}, in a sentence or two."}
+            for i in range(5)
+        ]})
+
+
+def run_level(detail, args):
+    """Median seconds and per-analysis usage of args.runs uncached analyses"""
+    seconds, calls, searches, prompt_tokens, completion_tokens, parsed = [], [], [], [], [], []
+    for run in range(args.runs):
+        workflow = StartupResearchWorkflow(cache=None, task_cache=None, flights=None, ideas=None,
+                                           history=None, governor=None)
+        workflow.llm = llm = TimedStubLLM(model="stub", first_token=args.first_token,
+                                          tokens_per_second=args.tokens_per_second,
+                                          tool_steps=args.tool_steps, items=args.items)
+        workflow.search_tool = tool = StubSearchTool(latency=args.search_latency)
+        results, elapsed = timed(workflow.run_analysis, f"{SAMPLE_IDEA} (run {run})", detail=detail)
+        usage = llm.get_token_usage_summary()
+        seconds.append(elapsed)
+        calls.append(usage.successful_requests)
+        searches.append(tool.calls)
+        prompt_tokens.append(usage.prompt_tokens)
+        completion_tokens.append(usage.completion_tokens)
+        parsed.append(sum(is_parsed(results[section]) for section in SECTIONS))
+    return {
+        "seconds": statistics.median(seconds),
+        "calls": statistics.mean(calls),
+        "searches": statistics.mean(searches),
+        "prompt": statistics.mean(prompt_tokens),
+        "completion": statistics.mean(completion_tokens),
+        "parsed": min(parsed)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="Analyses per level")
+    parser.add_argument("--first-token", type=float, default=0.5, help="Seconds before an answer starts")
+    parser.add_argument("--tokens-per-second", type=float, default=150.0, help="Answer tokens per second")
+    parser.add_argument("--search-latency", type=float, default=1.5, help="Seconds per search")
+    parser.add_argument("--tool-steps", type=int, default=2, help="Searches an agent makes before answering")
+    parser.add_argument("--items", type=int, default=6, help="Items per list when the prompt sets no limit")
+    args = parser.parse_args()
+
+    print(f"{args.runs} uncached analyses per level; {args.first_token:g}s to first token, "
+          f"{args.tokens_per_second:g} tokens/s, {args.search_latency:g}s per search\n")
+    print(f"{'level':<14} {'seconds':>7} {'LLM calls':>9} {'searches':>8} {'prompt tok':>10} "
+          f"{'answer tok':>10} {'parsed':>6}")
+    for detail in DETAIL_LEVELS:
+        row = run_level(detail, args)
+        print(f"{detail:<14} {row['seconds']:>7.1f} {row['calls']:>9.0f} {row['searches']:>8.0f} "
+              f"{row['prompt']:>10.0f} {row['completion']:>10.0f} {row['parsed']:>4}/{len(SECTIONS)}")
+
+
+if __name__ == "__main__":
+    main()
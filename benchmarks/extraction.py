@@ -0,0 +1,104 @@
+"""Parse success and latency on a corpus of messy task outputs.
+
+benchmarks/data/messy_outputs.jsonl holds outputs the way models actually
+return them: fenced, wrapped in prose, with trailing commas, Python literals,
+cut off mid-object, with keys renamed or missing, or with no JSON at all.
+
+1. Baseline: json.loads on the whole output, as parse_task_output used to do.
+   It counts anything json.loads accepts, even when the shape is wrong.
+2. Local: extraction, repair and schema validation (backend/extract.py).
+3. With correction: what is still invalid gets one correction prompt, answered
+   by StubLLM, through StartupResearchWorkflow._finish_section.
+
+The incremental extractor is also fed each output in chunks to show how early
+the JSON is available when prose follows it.
+
+    python benchmarks/extraction.py
+"""
+import argparse
+import json
+import os
+import time
+from types import SimpleNamespace
+
+from stubs import StubLLM
+from Agents import SCHEMAS, StartupResearchWorkflow, is_parsed
+from extract import IncrementalExtractor, holds_objects, parse_structured
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "messy_outputs.jsonl")
+
+
+def load_corpus(path=CORPUS):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def baseline(case):
+    try:
+        json.loads(case["text"])
+        return True
+    except json.JSONDecodeError:
+        return False
+
+
+def local(case):
+    value, problems = parse_structured(case["text"], SCHEMAS[case["section"]])
+    return value is not None and not problems
+
+
+def best_of(fn, case, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ok = fn(case)
+        best = min(best, time.perf_counter() - start)
+    return ok, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Timing runs per output, best kept")
+    parser.add_argument("--chunk", type=int, default=32, help="Characters per chunk for the incremental run")
+    parser.add_argument("-v", "--verbose", action="store_true", help="List every case")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    for name, fn in (("baseline json.loads", baseline), ("extract + repair", local)):
+        results = [best_of(fn, case, args.repeat) for case in corpus]
+        ok = sum(1 for success, _ in results if success)
+        latencies = sorted(seconds * 1e6 for _, seconds in results)
+        print(f"{name:<22} {ok:>2}/{len(corpus)} parsed ({ok / len(corpus):.0%})  "
+              f"median {latencies[len(latencies) // 2]:7.1f} us  max {latencies[-1]:7.1f} us")
+        if args.verbose:
+            for case, (success, _) in zip(corpus, results):
+                print(f"    {'ok ' if success else 'BAD'} {case['section']:<15} {case['case']}")
+
+    workflow = StartupResearchWorkflow(cache=None, task_cache=None)
+    workflow.llm = StubLLM(model="stub", latency=0)
+    workflow.search_tool = None
+    corrected = 0
+    start = time.perf_counter()
+    for case in corpus:
+        task = SimpleNamespace(output=SimpleNamespace(raw=case["text"]))
+        data = workflow._finish_section("idea", case["section"], task, use_cache=False)
+        corrected += is_parsed(data)
+    elapsed = time.perf_counter() - start
+    calls = workflow.llm.get_token_usage_summary().successful_requests
+    print(f"{'with one correction':<22} {corrected:>2}/{len(corpus)} parsed ({corrected / len(corpus):.0%})  "
+          f"{calls} correction prompts for {len(corpus)} outputs, {elapsed:.3f}s total")
+
+    trailing = [case for case in corpus if case["repairable"] and len(case["text"].rstrip()) > 0]
+    saved = []
+    for case in trailing:
+        extractor = IncrementalExtractor(accept=holds_objects)
+        text = case["text"]
+        for offset in range(0, len(text), args.chunk):
+            if extractor.feed(text[offset:offset + args.chunk]) is not None:
+                saved.append(len(text) - min(len(text), offset + args.chunk))
+                break
+    print(f"incremental ({args.chunk}-char chunks): {len(saved)}/{len(trailing)} outputs complete "
+          f"before the stream ends, up to {max(saved, default=0)} trailing characters not waited for")
+
+
+if __name__ == "__main__":
+    main()
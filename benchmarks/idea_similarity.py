@@ -0,0 +1,168 @@
+"""Lookup latency and hit rate of the near-duplicate idea index.
+
+Builds an IdeaIndex (backend/similarity.py) over --ideas synthetic startup
+ideas, then queries it with rewordings of stored ideas (plurals, word order,
+filler phrases, one word dropped or added) and with unseen ideas. It reports
+insert and lookup latency, the hit rate at the reuse and seed thresholds,
+how often a hit is the idea the query was reworded from (or, for unseen
+ideas, one with the same product and audience), and, for contrast,
+the latency of comparing the query against every stored signature. It first
+checks lookups on an index of two ideas.
+
+    python benchmarks/idea_similarity.py --ideas 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+import stubs  # noqa: F401  (puts backend/ on sys.path)
+from Agents import SIMILAR_IDEA_SEED_THRESHOLD, SIMILAR_IDEA_THRESHOLD
+from similarity import IdeaIndex
+
+ADJECTIVES = """healthy organic sustainable affordable premium local smart automated mobile
+personalized subscription on-demand eco-friendly plant-based ai-powered shared virtual
+secondhand refurbished modular""".split()
+PRODUCTS = """meal kit grocery delivery tutoring marketplace fitness coaching pet care
+laundry service bike rental coworking space language lessons home cleaning car sharing
+meal planning skincare box coffee roastery childcare booking tax preparation event ticketing
+plant nursery furniture rental music lessons dog walking elder care recipe app""".split("\n")
+PRODUCTS = [product for line in PRODUCTS for product in
+            [" ".join(pair) for pair in zip(line.split()[::2], line.split()[1::2])]]
+AUDIENCES = """busy professionals college students new parents seniors remote workers small
+businesses freelancers athletes pet owners renters commuters nurses teachers gamers travelers
+homeowners retirees startups restaurants farmers""".split()
+AUDIENCES = [" ".join(pair) for pair in zip(AUDIENCES[::2], AUDIENCES[1::2])]
+FEATURES = """weekly subscriptions, same-day delivery, a loyalty program, live video sessions,
+carbon-neutral shipping, flexible pricing, a referral program, expert reviews, smart
+scheduling, community events, recycled packaging, instant booking, progress tracking,
+multilingual support, group discounts""".replace("\n", " ").split(", ")
+REGIONS = """in Berlin, in rural Texas, across Southeast Asia, in London, in Lagos, across
+Latin America, in Toronto, in Sydney, in Mumbai, in Chicago, in Paris, across Scandinavia""".replace(
+    "\n", " ").split(", ")
+FILLERS = [("for", "aimed at"), ("with", "that offers"), ("with", "featuring"), ("for", "built for")]
+
+
+def random_idea(rng):
+    adjective = rng.choice(ADJECTIVES)
+    product = rng.choice(PRODUCTS)
+    audience = rng.choice(AUDIENCES)
+    feature = rng.choice(FEATURES)
+    region = rng.choice(REGIONS)
+    return f"{adjective.capitalize()} {product} for {audience} with {feature} {region}"
+
+
+def reword(idea, rng):
+    """A founder's second phrasing of the same idea"""
+    words = idea.split()
+    for old, new in rng.sample(FILLERS, 2):
+        if old in words:
+            position = words.index(old)
+            words[position:position + 1] = new.split()
+    edit = rng.choice(("plural", "drop", "add", "reorder"))
+    if edit == "plural":
+        words = [word + "s" if word.isalpha() and len(word) > 3 and not word.endswith("s")
+                 and rng.random() < 0.3 else word for word in words]
+    elif edit == "drop":
+        del words[rng.randrange(1, len(words))]
+    elif edit == "add":
+        words.insert(rng.randrange(1, len(words)), rng.choice(("simple", "trusted", "new", "fast")))
+    else:
+        # Move the region to the front
+        words = words[-2:] + words[:-2]
+    return " ".join(words)
+
+
+def business(idea):
+    """Product and audience of a generated idea, with the adjective, feature and region dropped"""
+    product, _, rest = idea.split(" ", 1)[1].partition(" for ")
+    return product, rest.split(" with ")[0]
+
+
+def check_small_index():
+    """Lookups on an index still small enough to hold every idea in its unmerged tail"""
+    index = IdeaIndex()
+    index.add("A subscription meal kit for busy professionals", {"id": 0})
+    assert index.lookup("Drone inspection of offshore wind turbines", 0.0) is None
+    assert index.lookup("Meal kits for busy professionals", 0.5)["value"] == {"id": 0}
+    # Synonyms fold: another phrasing of the same business seeds the research but isn't reused as is
+    index.add("meal kit for busy professionals", {"id": 1})
+    match = index.lookup("healthy meal delivery for busy workers", SIMILAR_IDEA_SEED_THRESHOLD)
+    assert match["value"] == {"id": 1} and match["similarity"] < SIMILAR_IDEA_THRESHOLD
+    print(f"small index: an unrelated idea misses, a rewording matches, "
+          f"a synonymous phrasing seeds ({match['similarity']})")
+
+
+def percentile(values, q):
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ideas", type=int, default=100000, help="Ideas stored in the index")
+    parser.add_argument("--queries", type=int, default=2000, help="Rewordings and unseen ideas each")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    check_small_index()
+    rng = random.Random(args.seed)
+    stored = list(dict.fromkeys(random_idea(rng) for _ in range(args.ideas)))
+    index = IdeaIndex()
+    start = time.perf_counter()
+    for i, idea in enumerate(stored):
+        index.add(idea, {"id": i})
+    build = time.perf_counter() - start
+    footprint = sum(array.nbytes for array in (index._signatures, index._band_rows, index._keys,
+                                               index._owners, index._created, index._alive))
+    print(f"{len(stored)} ideas indexed in {build:.1f}s ({build / len(stored) * 1e6:.0f} us each), "
+          f"arrays {footprint / 2**20:.0f} MiB")
+
+    sources = rng.sample(range(len(stored)), args.queries)
+    reworded = [(reword(stored[i], rng), i) for i in sources]
+    known = set(stored)
+    unseen = []
+    while len(unseen) < args.queries:
+        idea = random_idea(rng)
+        if idea not in known:
+            unseen.append((idea, None))
+
+    threshold = min(SIMILAR_IDEA_THRESHOLD, SIMILAR_IDEA_SEED_THRESHOLD)
+    print(f"\nthresholds: reuse {SIMILAR_IDEA_THRESHOLD}, seed {SIMILAR_IDEA_SEED_THRESHOLD}")
+    print(f"{'queries':<10} {'p50 us':>7} {'p99 us':>7} {'reuse':>6} {'seed':>6} {'miss':>6} {'same source':>11}")
+    print(f"{'':<42} {'(unseen: same business)':>11}")
+    for name, queries in (("reworded", reworded), ("unseen", unseen)):
+        latencies, outcomes, correct = [], {"reuse": 0, "seed": 0, "miss": 0}, 0
+        for query, source in queries:
+            start = time.perf_counter()
+            match = index.lookup(query, threshold)
+            latencies.append(time.perf_counter() - start)
+            if match is None:
+                outcomes["miss"] += 1
+                continue
+            outcomes["reuse" if match["similarity"] >= SIMILAR_IDEA_THRESHOLD else "seed"] += 1
+            if source is None:
+                correct += business(match["idea"]) == business(query)
+            else:
+                correct += match["value"]["id"] == source
+        hits = len(queries) - outcomes["miss"]
+        print(f"{name:<10} {percentile(latencies, 0.5) * 1e6:>7.0f} {percentile(latencies, 0.99) * 1e6:>7.0f} "
+              + " ".join(f"{outcomes[key] / len(queries):>6.1%}" for key in ("reuse", "seed", "miss"))
+              + (f" {correct / hits:>11.1%}" if hits else f" {'-':>11}"))
+
+    # Exhaustive comparison against every stored signature, what LSH avoids
+    signatures = index._signatures[:len(stored)]
+    latencies = []
+    for query, _ in reworded[:200]:
+        start = time.perf_counter()
+        signature = index.signature(query)
+        int(np.argmax((signatures == signature).mean(axis=1)))
+        latencies.append(time.perf_counter() - start)
+    print(f"{'brute force':<10} {statistics.median(latencies) * 1e6:>7.0f} {percentile(latencies, 0.99) * 1e6:>7.0f}")
+    stats = index.stats()
+    print(f"\nindex: {stats['lookups']} lookups, {stats['hits']} hits, hit rate {stats['hitRate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
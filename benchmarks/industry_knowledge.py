@@ -0,0 +1,106 @@
+"""Per-startup latency and agent calls with and without the industry knowledge base.
+
+--startups startups spread over --industries industries are analyzed one after
+another by StartupAnalysisOrchestrator, with every agent replaced by
+stubs.StubAgent, which sleeps --latency seconds and counts the call. Search
+and scrape steps are counted as tool steps. Three setups are compared:
+
+- inline: every analyzer researches its industry on every run (the old flow)
+- cold: a fresh knowledge base fills up as industries are first seen
+- warmed: KnowledgeRefresher warms the industries first, as it would off-peak
+
+It finishes with what the scheduler plans for entries of different ages at
+peak and off-peak hours.
+
+    python benchmarks/industry_knowledge.py --startups 40 --industries 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from stubs import StubAgent, stub_agents
+from knowledge_base import IndustryKnowledgeBase
+from orchestrator import StartupAnalysisOrchestrator
+from portfolio import Portfolio
+
+INDUSTRIES = ["AI/ML", "Fintech", "Healthtech", "Food delivery", "Edtech", "Climate tech",
+              "E-commerce", "Cybersecurity", "Gaming", "Logistics"]
+
+
+def build(latency, knowledge):
+    orchestrator = StartupAnalysisOrchestrator(knowledge=IndustryKnowledgeBase(), portfolio=Portfolio())
+    stub_agents(orchestrator, latency)
+    for analyzer in (orchestrator.market_analyzer, orchestrator.financial_analyzer,
+                     orchestrator.competitor_analyzer, orchestrator.risk_assessor):
+        analyzer.knowledge = orchestrator.knowledge if knowledge else None
+    return orchestrator
+
+
+async def run(orchestrator, startups):
+    StubAgent.reset()
+    latencies = []
+    for startup in startups:
+        start = time.perf_counter()
+        await orchestrator.analyze_startup(startup)
+        latencies.append(time.perf_counter() - start)
+    return {
+        "mean": statistics.mean(latencies),
+        "p50": statistics.median(latencies),
+        "calls": StubAgent.calls / len(startups),
+        "tools": StubAgent.tool_steps / len(startups)
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per stubbed agent call")
+    parser.add_argument("--startups", type=int, default=40)
+    parser.add_argument("--industries", type=int, default=5)
+    args = parser.parse_args()
+
+    industries = INDUSTRIES[:args.industries]
+    startups = [{"name": f"Startup {i}", "industry": industries[i % len(industries)],
+                 "description": f"Startup number {i}"} for i in range(args.startups)]
+
+    rows = {}
+    rows["inline"] = await run(build(args.latency, knowledge=False), startups)
+    cold = build(args.latency, knowledge=True)
+    rows["cold"] = await run(cold, startups)
+
+    warmed = build(args.latency, knowledge=True)
+    refresher = warmed.knowledge_refresher(off_peak=(0, 24), industries=industries, batch=4 * len(industries))
+    start = time.perf_counter()
+    counts = await refresher.run_once()
+    warm_seconds = time.perf_counter() - start
+    rows["warmed"] = await run(warmed, startups)
+
+    print(f"{args.startups} startups over {len(industries)} industries, {args.latency}s per agent call\n")
+    print(f"{'setup':<8} {'mean s':>7} {'p50 s':>6} {'calls':>6} {'tool steps':>10}")
+    for name, row in rows.items():
+        print(f"{name:<8} {row['mean']:>7.3f} {row['p50']:>6.3f} {row['calls']:>6.1f} {row['tools']:>10.1f}")
+    inline, warm = rows["inline"], rows["warmed"]
+    print(f"\nwarmed vs inline: {1 - warm['mean'] / inline['mean']:.0%} lower latency, "
+          f"{1 - warm['calls'] / inline['calls']:.0%} fewer agent calls, "
+          f"{1 - warm['tools'] / inline['tools']:.0%} fewer tool steps")
+    print(f"warming {counts['warmed']} entries took {warm_seconds:.2f}s; "
+          f"cold knowledge base hit rate {cold.knowledge.hit_rate():.0%}")
+
+    # What the scheduler picks up, by entry age and time of day
+    knowledge = warmed.knowledge
+    day = 24 * 3600
+    for age, industry in ((0.5 * day, industries[0]), (2 * day, industries[1 % len(industries)]),
+                          (6.5 * day, industries[2 % len(industries)])):
+        knowledge.put(industry, "market", {"market_data": "aged"}, updated_at=time.time() - age)
+    refresher = warmed.knowledge_refresher(off_peak=(0, 0), top_n=len(industries))
+    peak = refresher.plan()
+    refresher.off_peak = (0, 24)
+    off_peak = refresher.plan()
+    print(f"\nmarket entries aged 0.5, 2 and 6.5 days (stale after {knowledge.stale_after / day:g}, "
+          f"max age {knowledge.max_age / day:g} days):")
+    print(f"  peak hours refresh: {[industry for industry, _, _ in peak] or 'nothing'}")
+    print(f"  off-peak refresh:   {[industry for industry, _, _ in off_peak]}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
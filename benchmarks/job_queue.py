@@ -0,0 +1,130 @@
+"""Background jobs: queue overhead, worker throughput, cancellation and recovery.
+
+1. Queue operations on a scratch database (submit, claim, poll, complete).
+2. Distinct ideas drained by pools of worker processes running StubLLM, while
+   the API is polled for job status through httpx's in-process transport to
+   show the web tier stays responsive.
+3. A running job is cancelled, then a worker is killed mid-job to show its
+   job being released and finished by the replacement process.
+
+    python benchmarks/job_queue.py --jobs 12 --processes 1 4 --latency 0.3
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import tempfile
+import time
+
+import httpx
+
+DB_DIR = tempfile.mkdtemp(prefix="jobs-")
+os.environ["JOB_DB"] = os.path.join(DB_DIR, "api.db")
+os.environ["JOB_WORKFLOW"] = "stubs:stub_workflow"
+os.environ["JOB_HEARTBEAT_INTERVAL"] = "0.2"
+os.environ.setdefault("VERBOSE", "false")
+
+from stubs import SAMPLE_IDEA
+from jobs import FINISHED, RUNNING, JobQueue, WorkerPool, worker_name
+import api
+
+
+def time_operations(count):
+    queue = JobQueue(os.path.join(DB_DIR, "ops.db"))
+    timings = {"submit": [], "claim": [], "get": [], "complete": []}
+    for i in range(count):
+        for name, call in (("submit", lambda: queue.submit(f"{SAMPLE_IDEA} #{i}")),
+                           ("claim", lambda: queue.claim("bench")),
+                           ("get", lambda: queue.get(job["id"])),
+                           ("complete", lambda: queue.complete(job["id"], "bench", {"ok": True}))):
+            start = time.perf_counter()
+            result = call()
+            timings[name].append(time.perf_counter() - start)
+            if name == "claim":
+                job = result
+    for name, values in timings.items():
+        print(f"  {name:<9} median {statistics.median(values) * 1e6:7.1f} us")
+
+
+async def poll_until_done(job_ids):
+    """Poll every job through the API until all are finished; return poll latencies"""
+    latencies = []
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        pending = set(job_ids)
+        while pending:
+            for job_id in list(pending):
+                start = time.perf_counter()
+                response = await client.get(f"/api/jobs/{job_id}")
+                latencies.append(time.perf_counter() - start)
+                if response.json()["status"] in FINISHED:
+                    pending.discard(job_id)
+            await asyncio.sleep(0.1)
+    return latencies
+
+
+def wait_for(queue, job_id, statuses, limit=60):
+    deadline = time.monotonic() + limit
+    while time.monotonic() < deadline:
+        job = queue.get(job_id, with_result=False)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.05)
+    raise TimeoutError(f"job {job_id} still {job['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=12, help="Ideas per throughput run")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 4], help="Pool sizes to compare")
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub LLM latency in seconds")
+    parser.add_argument("--ops", type=int, default=500, help="Jobs for the queue-operation timings")
+    args = parser.parse_args()
+    os.environ["STUB_LATENCY"] = str(args.latency)
+
+    print(f"queue operations ({args.ops} jobs):")
+    time_operations(args.ops)
+
+    for processes in args.processes:
+        queue = api.job_queue = JobQueue(os.path.join(DB_DIR, f"pool-{processes}.db"))
+        pool = WorkerPool(processes, queue.db_path, check_interval=0.5).start()
+        # Let the workers import crewai before timing
+        warmup = queue.submit("warm up")
+        wait_for(queue, warmup["id"], FINISHED, limit=120)
+        start = time.perf_counter()
+        job_ids = [queue.submit(f"{SAMPLE_IDEA} #{i}")["id"] for i in range(args.jobs)]
+        submitted = time.perf_counter() - start
+        latencies = asyncio.run(poll_until_done(job_ids))
+        elapsed = time.perf_counter() - start
+        succeeded = sum(queue.get(job_id, with_result=False)["status"] == "succeeded" for job_id in job_ids)
+        print(f"\n{processes} worker process(es): {succeeded}/{args.jobs} succeeded in {elapsed:.2f}s "
+              f"({60 * args.jobs / elapsed:.0f} jobs/min); submitting all took {submitted * 1e3:.1f} ms")
+        print(f"  API status polls: {len(latencies)}, median {statistics.median(latencies) * 1e3:.2f} ms, "
+              f"max {max(latencies) * 1e3:.2f} ms")
+        pool.stop()
+
+    queue = JobQueue(os.path.join(DB_DIR, "recovery.db"))
+    pool = WorkerPool(1, queue.db_path, check_interval=0.5).start()
+    wait_for(queue, queue.submit("warm up")["id"], FINISHED, limit=120)
+
+    job = queue.submit(f"{SAMPLE_IDEA} (cancel me)")
+    wait_for(queue, job["id"], (RUNNING,))
+    start = time.perf_counter()
+    queue.cancel(job["id"])
+    job = wait_for(queue, job["id"], FINISHED)
+    print(f"\ncancel: job {job['status']} {time.perf_counter() - start:.2f}s after the request")
+
+    job = queue.submit(f"{SAMPLE_IDEA} (crash me)")
+    job = wait_for(queue, job["id"], (RUNNING,), limit=120)
+    victim = next(process for process in pool._workers if worker_name(process.pid) == job["worker"])
+    start = time.perf_counter()
+    os.kill(victim.pid, signal.SIGKILL)
+    job = wait_for(queue, job["id"], FINISHED, limit=120)
+    print(f"crash: worker killed mid-job, job {job['status']} after {job['attempts']} attempts, "
+          f"{time.perf_counter() - start:.2f}s later")
+    pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Several worker processes sharing one LLM quota, with and without the governor.
+
+--processes processes each run --analyses uncached analyses on StubLLM, as job
+workers would, first each on their own and then sharing a QuotaGovernor
+(backend/governor.py) through one SQLite file. To keep the run short, a quota
+"minute" lasts --minute seconds: --rpm and --tpm apply per --minute.
+
+For each setup it reports the busiest --minute window against the limits,
+how many calls went over the quota (the provider would have answered those
+with 429s, and crewai would have retried them), queue waits and utilization.
+It ends with the template estimate of each task next to the usage the
+governor learned.
+
+    python benchmarks/llm_quota.py --processes 4 --analyses 4 --rpm 30 --tpm 10000 --minute 6
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("VERBOSE", "false")
+
+import stubs
+from stubs import SAMPLE_IDEA, StubLLM
+from governor import QuotaGovernor
+
+
+class LoggingStubLLM(StubLLM):
+    """StubLLM that notes when each call reached the "provider" and its tokens"""
+
+    calls: list = []
+
+    def call(self, messages, *args, **kwargs):
+        started = time.time()
+        response = super().call(messages, *args, **kwargs)
+        prompt = messages if isinstance(messages, str) else "\n".join(
+            str(message.get("content", "")) for message in messages)
+        self.calls.append((started, len(prompt) // 4 + len(response) // 4))
+        return response
+
+
+def run_worker(options):
+    index, args, db_path = options
+    from Agents import StartupResearchWorkflow
+
+    governor = None
+    if db_path:
+        governor = QuotaGovernor(db_path, rpm=args.rpm, tpm=args.tpm, period=args.minute)
+    workflow = StartupResearchWorkflow(cache=None, task_cache=None, flights=None, ideas=None, history=None,
+                                       governor=governor)
+    workflow.llm = llm = LoggingStubLLM(model="stub", latency=args.latency)
+    workflow.search_tool = None
+    for i in range(args.analyses):
+        workflow.run_analysis(f"{SAMPLE_IDEA} (worker {index}, idea {i})")
+    return llm.calls
+
+
+def busiest_window(calls, minute):
+    """Most requests and most tokens sent within any `minute` seconds"""
+    times = [at for at, _ in calls]
+    most_requests = most_tokens = 0
+    start = 0
+    tokens = 0
+    for end, (at, used) in enumerate(calls):
+        tokens += used
+        while times[start] <= at - minute:
+            tokens -= calls[start][1]
+            start += 1
+        most_requests = max(most_requests, end - start + 1)
+        most_tokens = max(most_tokens, tokens)
+    return most_requests, most_tokens
+
+
+def over_quota(calls, minute, rpm, tpm):
+    """Calls that found the window before them already at a limit"""
+    over = 0
+    start = 0
+    tokens = 0
+    admitted = []
+    for at, used in calls:
+        while start < len(admitted) and admitted[start][0] <= at - minute:
+            tokens -= admitted[start][1]
+            start += 1
+        if len(admitted) - start >= rpm or tokens + used > tpm:
+            over += 1
+            continue
+        admitted.append((at, used))
+        tokens += used
+    return over
+
+
+def run(args, db_path):
+    context = multiprocessing.get_context("fork")
+    start = time.time()
+    with context.Pool(args.processes) as pool:
+        logs = pool.map(run_worker, [(index, args, db_path) for index in range(args.processes)])
+    duration = time.time() - start
+    calls = sorted(call for log in logs for call in log)
+    requests, tokens = busiest_window(calls, args.minute)
+    minutes = duration / args.minute
+    return {
+        "seconds": duration,
+        "calls": len(calls),
+        "peak requests": requests / args.rpm,
+        "peak tokens": tokens / args.tpm,
+        "over quota": over_quota(calls, args.minute, args.rpm, args.tpm),
+        "requests used": len(calls) / (args.rpm * minutes),
+        "tokens used": sum(used for _, used in calls) / (args.tpm * minutes)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--analyses", type=int, default=4, help="Analyses per process")
+    parser.add_argument("--rpm", type=float, default=30, help="Requests allowed per --minute")
+    parser.add_argument("--tpm", type=float, default=10000, help="Tokens allowed per --minute")
+    parser.add_argument("--minute", type=float, default=6, help="Seconds a quota minute lasts")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per stubbed LLM call")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="quota-"), "quota.db")
+    rows = {"ungoverned": run(args, None), "governed": run(args, db_path)}
+
+    print(f"{args.processes} processes x {args.analyses} analyses, limits {args.rpm:g} requests and "
+          f"{args.tpm:g} tokens per {args.minute:g}s\n")
+    print(f"{'setup':<11} {'seconds':>7} {'calls':>5} {'peak req':>8} {'peak tok':>8} {'over quota':>10} "
+          f"{'req used':>8} {'tok used':>8}")
+    for name, row in rows.items():
+        print(f"{name:<11} {row['seconds']:>7.1f} {row['calls']:>5} {row['peak requests']:>8.0%} "
+              f"{row['peak tokens']:>8.0%} {row['over quota']:>10} {row['requests used']:>8.0%} "
+              f"{row['tokens used']:>8.0%}")
+    print("peak: busiest window as a share of the limit; used: share of the quota over the whole run")
+
+    governor = QuotaGovernor(db_path, rpm=args.rpm, tpm=args.tpm, period=args.minute)
+    waits = [row[0] for row in governor.db.execute("SELECT wait FROM quota_log WHERE wait IS NOT NULL")]
+    queued = [wait for wait in waits if wait > 0]
+    print(f"\ngoverned queue: {len(queued)} of {len(waits)} reservations waited, "
+          f"p50 {statistics.median(waits):.2f}s, p95 {sorted(waits)[int(0.95 * (len(waits) - 1))]:.2f}s, "
+          f"max {max(waits):.2f}s")
+
+    from Agents import SECTIONS, StartupResearchWorkflow
+    workflow = StartupResearchWorkflow(governor=None)
+    workflow.llm = StubLLM(model="stub")
+    workflow.search_tool = None
+    fresh = QuotaGovernor(":memory:")
+    tasks = workflow.create_tasks(workflow.get_agents(), SAMPLE_IDEA)
+    print("\ntokens per task: template estimate vs learned")
+    for section, task in zip(SECTIONS, tasks):
+        workflow.governor = fresh
+        key, _, estimate = workflow.estimate_task(task, section)
+        workflow.governor = governor
+        _, _, learned = workflow.estimate_task(task, section)
+        print(f"  {section:<15} {estimate:>6} {learned:>6}")
+
+
+if __name__ == "__main__":
+    main()
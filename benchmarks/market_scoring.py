@@ -0,0 +1,75 @@
+"""Scalar versus batch scoring in MarketAnalyzer.
+
+Random market snapshots (0-8 trends each) are scored one dict at a time with
+analyze_market_data and in one call with analyze_market_data_batch. The batch
+results must equal the scalar results exactly. The scalar path is timed on at
+most --scalar-rows rows and extrapolated beyond that.
+
+    python benchmarks/market_scoring.py --rows 10000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+import stubs  # noqa: F401  (puts ai_agents/ on sys.path)
+from market_analyzer import MarketAnalyzer, market_columns
+
+BATCH_FIELDS = ["market_score", "trend_impact_score", "growth_potential"]
+
+
+def random_markets(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = rng.lognormal(20, 2, rows)
+    growth = rng.uniform(-0.05, 0.4, rows)
+    counts = rng.integers(0, 9, rows)
+    impacts = rng.uniform(-1, 1, counts.sum())
+    markets, start = [], 0
+    for size, rate, count in zip(sizes.tolist(), growth.tolist(), counts.tolist()):
+        trends = [{"name": f"trend {i}", "impact": impact}
+                  for i, impact in enumerate(impacts[start:start + count].tolist())]
+        markets.append({"market_size": size, "growth_rate": rate, "trends": trends})
+        start += count
+    return markets
+
+
+def scalar_scores(analyzer, markets):
+    columns = {field: np.empty(len(markets)) for field in BATCH_FIELDS}
+    for i, market in enumerate(markets):
+        analysis = analyzer.analyze_market_data(market, "AI/ML")
+        columns["market_score"][i] = analysis["market_score"]
+        columns["trend_impact_score"][i] = analysis["market_metrics"]["trends"]["trend_impact_score"]
+        columns["growth_potential"][i] = analysis["growth_potential"]
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 1000000])
+    parser.add_argument("--scalar-rows", type=int, default=100000, help="Most rows to score one by one")
+    args = parser.parse_args()
+
+    analyzer = MarketAnalyzer()
+    for rows in args.rows:
+        markets = random_markets(rows)
+        columns = market_columns(markets)
+
+        start = time.perf_counter()
+        batch = analyzer.analyze_market_data_batch(**columns)
+        batch_seconds = time.perf_counter() - start
+
+        sample = markets[:args.scalar_rows]
+        start = time.perf_counter()
+        scalar = scalar_scores(analyzer, sample)
+        scalar_seconds = (time.perf_counter() - start) * rows / len(sample)
+
+        for field in BATCH_FIELDS:
+            assert np.array_equal(batch[field][:len(sample)], scalar[field], equal_nan=True), field
+        estimated = " (extrapolated)" if len(sample) < rows else ""
+        print(f"{rows:>9} rows: scalar {scalar_seconds:8.2f}s{estimated}  "
+              f"batch {batch_seconds:6.3f}s  speedup {scalar_seconds / batch_seconds:6.0f}x  "
+              f"exact match on {len(sample)} rows")
+
+
+if __name__ == "__main__":
+    main()
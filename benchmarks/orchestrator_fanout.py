@@ -0,0 +1,59 @@
+"""Sequential versus concurrent analyzers in StartupAnalysisOrchestrator.
+
+Each analyzer's agent is replaced by stubs.StubAgent, which sleeps for a
+fixed latency, so no search, scrape or LLM call leaves the machine. With no
+industry research stored yet each analyzer makes three agent calls, so the
+sequential baseline should take about 12 latencies and the concurrent
+orchestrator about 3.
+
+    python benchmarks/orchestrator_fanout.py --latency 0.5
+"""
+import argparse
+import asyncio
+import time
+
+from stubs import stub_agents
+from orchestrator import StartupAnalysisOrchestrator
+
+STARTUP = {
+    "name": "TechStart",
+    "industry": "AI/ML",
+    "description": "AI-powered business analytics platform"
+}
+
+
+async def sequential(orchestrator):
+    """The old behaviour: one analyzer after another"""
+    return [
+        await orchestrator.market_analyzer.analyze_market(STARTUP),
+        await orchestrator.financial_analyzer.analyze_financials(STARTUP),
+        await orchestrator.competitor_analyzer.analyze_competitors(STARTUP),
+        await orchestrator.risk_assessor.assess_risks(STARTUP)
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per stubbed agent call")
+    args = parser.parse_args()
+
+    orchestrator = StartupAnalysisOrchestrator()
+    stub_agents(orchestrator, args.latency)
+
+    start = time.perf_counter()
+    await sequential(orchestrator)
+    baseline = time.perf_counter() - start
+
+    # Research the industry again, as the sequential run did
+    orchestrator.knowledge.clear()
+    start = time.perf_counter()
+    report = await orchestrator.analyze_startup(STARTUP)
+    concurrent = time.perf_counter() - start
+
+    print(f"sequential analyzers: {baseline:6.2f}s")
+    print(f"concurrent analyzers: {concurrent:6.2f}s  ({baseline / concurrent:.1f}x faster)")
+    print(f"overall score: {report['overall_score']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
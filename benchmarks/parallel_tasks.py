@@ -0,0 +1,34 @@
+"""Compare sequential and parallel execution of StartupResearchWorkflow.
+
+Every LLM call is served by StubLLM with a fixed latency, so the sequential
+crew should take roughly three latencies and the parallel mode roughly one.
+
+    python benchmarks/parallel_tasks.py --latency 1.0
+"""
+import argparse
+
+from stubs import SAMPLE_IDEA, StubLLM, timed
+from Agents import StartupResearchWorkflow
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per stubbed LLM call")
+    args = parser.parse_args()
+
+    workflow = StartupResearchWorkflow()
+    workflow.llm = StubLLM(model="stub", latency=args.latency)
+    workflow.search_tool = None
+
+    for parallel in (False, True):
+        results, elapsed = timed(workflow.run_analysis, SAMPLE_IDEA, parallel=parallel,
+                                  use_cache=False)
+        mode = "parallel" if parallel else "sequential"
+        sections = [key for key in ("marketResearch", "teamResources", "swotAnalysis") if results.get(key)]
+        print(f"{mode:>10}: {elapsed:6.2f}s  sections={len(sections)}")
+
+    print(f"slowest single task: ~{args.latency:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
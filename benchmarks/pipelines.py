@@ -0,0 +1,264 @@
+"""End-to-end benchmark of both agent pipelines, replayed from a cassette.
+
+Three stages run against benchmarks/data/cassettes/pipelines.jsonl, with no
+network access and no API keys:
+
+- workflow: StartupResearchWorkflow.run_analysis, LLM (and Serper) calls replayed
+- orchestrator: StartupAnalysisOrchestrator.analyze_startup on real crewai
+  agents, their LLM calls and tool HTTP calls replayed
+- tools: ToolRegistry search and scrape_pages, HTTP replayed
+
+For each stage it reports wall time, time per step (tasks, LLM calls and
+analyzers) and the peak Python memory measured with tracemalloc in a second,
+zero-latency pass.
+
+    python benchmarks/pipelines.py                          # recorded latencies
+    python benchmarks/pipelines.py --latency 0              # pipeline overhead only
+    python benchmarks/pipelines.py --record live.jsonl      # live keys, new cassette
+    python benchmarks/pipelines.py --record data/cassettes/pipelines.jsonl --stub
+
+--stub records against StubLLM, AnalystStubLLM and a local page server
+instead of the providers; that is how the committed cassette was made. Record again
+whenever prompts, templates or the crewai version change, since a changed
+request no longer matches.
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("VERBOSE", "false")
+
+from crewai import LLM
+
+from stubs import SAMPLE_IDEA, StubLLM
+from cassette import Cassette, CassetteLLM
+from orchestrator_fanout import STARTUP
+from Agents import MODEL_NAME, SECTIONS, StartupResearchWorkflow, get_llm, get_search_tool, is_parsed
+from knowledge_base import IndustryKnowledgeBase
+from orchestrator import StartupAnalysisOrchestrator
+from portfolio import Portfolio
+from reduce import ContentReducer
+from tools import ToolRegistry
+from tracing import tracer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CASSETTE = os.path.join(HERE, "data", "cassettes", "pipelines.jsonl")
+PAGES = os.path.join(HERE, "data", "pages")
+TOOLS_QUERY = "meal kit delivery market size growth competitors packaging"
+
+
+class AnalystStubLLM(StubLLM):
+    """StubLLM for the analyzers' agents: searches the web once when the task
+    asks for a search, then answers with a score"""
+
+    def respond(self, prompt):
+        task = prompt.split("Current Task:", 1)[-1].strip().splitlines()[0]
+        # The tool instructions quote "Observation:" once themselves
+        searched = "Observation:" in prompt.replace("Observation: the result of the action", "")
+        if task.startswith("Search") and not searched:
+            return ("Thought: I should search the web first\nAction: search_the_web\n"
+                    f"Action Input: {json.dumps({'query': task})}")
+        return f"Thought: I now know the final answer\nFinal Answer: Stubbed answer for: {task}\nScore: 0.7"
+
+
+class PageServer(BaseHTTPRequestHandler):
+    """Serper- and Firecrawl-style endpoints over the saved pages, for --stub recording"""
+
+    protocol_version = "HTTP/1.1"
+    latency = 0.1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._send(200, headers={"ETag": '"v1"'})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.latency)
+        base = f"http://{self.headers['Host']}"
+        if self.path == "/search":
+            body = {"organic": [
+                {"title": name[:-3].replace("-", " ").title(), "link": f"{base}/pages/{name[:-3]}",
+                 "snippet": f"Result {i + 1} for {payload['q']}"}
+                for i, name in enumerate(sorted(os.listdir(PAGES)))
+            ]}
+        else:
+            name = payload["url"].rsplit("/", 1)[-1]
+            with open(os.path.join(PAGES, f"{name}.md"), encoding="utf-8") as f:
+                body = {"data": {"markdown": f.read(), "metadata": {"sourceURL": payload["url"]}}}
+        self._send(200, json.dumps(body).encode("utf-8"), {"Content-Type": "application/json"})
+
+
+def start_page_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def build_workflow(cassette, stub):
+    workflow = StartupResearchWorkflow(cache=None, task_cache=None)
+    if cassette.mode == "record":
+        inner = StubLLM(model="stub", latency=0.4, task_latency={"market": 0.8}) if stub else get_llm()
+        search_tool = None if stub else get_search_tool()
+        cassette.meta["searchTool"] = search_tool is not None
+    else:
+        inner = None
+        if cassette.meta.get("searchTool"):
+            # Replayed through the HTTP patch; the key never leaves the process
+            os.environ.setdefault("SERPER_API_KEY", "replay")
+        search_tool = get_search_tool() if cassette.meta.get("searchTool") else None
+    workflow.llm = CassetteLLM(model=MODEL_NAME, cassette=cassette, inner=inner)
+    workflow.search_tool = search_tool
+    return workflow
+
+
+def build_orchestrator(cassette, stub, base_url=None):
+    # A fresh knowledge base, so every pass researches the industry as recorded
+    orchestrator = StartupAnalysisOrchestrator(tools=build_registry(cassette, base_url), portfolio=Portfolio(),
+                                               knowledge=IndustryKnowledgeBase())
+
+    def inner_llm():
+        if cassette.mode == "replay":
+            return None
+        return AnalystStubLLM(model="stub", latency=0.3) if stub else LLM(model=MODEL_NAME)
+
+    for analyzer in (orchestrator.market_analyzer, orchestrator.financial_analyzer,
+                     orchestrator.competitor_analyzer, orchestrator.risk_assessor):
+        def create_agent(create=analyzer.create_agent):
+            # The analyzer's own agent and tools; only its LLM and the HTTP layer are swapped
+            agent = create()
+            agent.llm = CassetteLLM(model=MODEL_NAME, cassette=cassette, inner=inner_llm())
+            return agent
+        analyzer.create_agent = create_agent
+    return orchestrator
+
+
+def build_registry(cassette, base_url=None):
+    if cassette.mode == "record":
+        serper_url = f"{base_url}/search" if base_url else None
+        firecrawl_url = f"{base_url}/scrape" if base_url else None
+        cassette.meta.update(serperUrl=serper_url, firecrawlUrl=firecrawl_url)
+    urls = {key: cassette.meta.get(name) for key, name in (("serper_url", "serperUrl"),
+                                                            ("firecrawl_url", "firecrawlUrl"))}
+    # Provider quotas aren't what is measured here, so the rate limits are lifted
+    return ToolRegistry(reducer=ContentReducer(1500), rate_limits={"serper": 6000, "firecrawl": 6000},
+                        **{key: url for key, url in urls.items() if url})
+
+
+def run_workflow(workflow):
+    tracer.spans.clear()
+    results = workflow.run_analysis(SAMPLE_IDEA)
+    steps = defaultdict(float)
+    for span in list(tracer.spans):
+        if span.kind == "task":
+            steps[f"task {span.name}"] += span.duration
+        elif span.kind == "llm":
+            steps["llm calls (sum)"] += span.duration
+        elif span.kind == "tool":
+            steps["tool calls (sum)"] += span.duration
+    parsed = sum(is_parsed(results[section]) for section in SECTIONS)
+    return steps, f"{parsed}/{len(SECTIONS)} sections parsed"
+
+
+def run_orchestrator(orchestrator):
+    report = asyncio.run(orchestrator.analyze_startup(STARTUP))
+    steps = {f"analyzer {result['category']}": result["duration"] for result in report["analysis_results"]}
+    return steps, f"overall score {report['overall_score']}"
+
+
+def run_tools(registry):
+    steps = {}
+    start = time.perf_counter()
+    results = registry.search(TOOLS_QUERY)
+    steps["search"] = time.perf_counter() - start
+    start = time.perf_counter()
+    reduced = registry.scrape_pages([item["link"] for item in results["organic"]], TOOLS_QUERY)
+    steps["scrape_pages"] = time.perf_counter() - start
+    stats = reduced["stats"]
+    return steps, f"{stats['tokensIn']} -> {stats['tokensOut']} tokens"
+
+
+def run_stages(cassette, stub=False, base_url=None):
+    stages = {
+        "workflow": lambda: run_workflow(build_workflow(cassette, stub)),
+        "orchestrator": lambda: run_orchestrator(build_orchestrator(cassette, stub, base_url)),
+        "tools": lambda: run_tools(build_registry(cassette, base_url))
+    }
+    report = {}
+    with cassette.patch_http():
+        for name, stage in stages.items():
+            start = time.perf_counter()
+            steps, summary = stage()
+            report[name] = (time.perf_counter() - start, steps, summary)
+    return report
+
+
+def peak_memory(path):
+    """Peak traced Python memory per stage, replaying without delays"""
+    peaks = {}
+    cassette = Cassette(path, latency=0)
+    with cassette.patch_http():
+        for name, stage in (("workflow", lambda: run_workflow(build_workflow(cassette, False))),
+                            ("orchestrator", lambda: run_orchestrator(build_orchestrator(cassette, False))),
+                            ("tools", lambda: run_tools(build_registry(cassette)))):
+            tracemalloc.start()
+            stage()
+            peaks[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return peaks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cassette", default=CASSETTE, help="Cassette to replay")
+    parser.add_argument("--record", metavar="PATH", help="Record a new cassette instead of replaying")
+    parser.add_argument("--stub", action="store_true", help="Record against local stubs instead of the providers")
+    parser.add_argument("--latency", default="recorded", help="'recorded' or fixed seconds per replayed call")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for recorded latencies")
+    args = parser.parse_args()
+
+    if args.record:
+        os.makedirs(os.path.dirname(os.path.abspath(args.record)), exist_ok=True)
+        cassette = Cassette(args.record, mode="record", meta={"stub": args.stub})
+        server, base_url = start_page_server() if args.stub else (None, None)
+        report = run_stages(cassette, args.stub, base_url)
+        if server:
+            server.shutdown()
+        # Replay needs the metadata gathered while recording (search tool, provider URLs)
+        with open(args.record, encoding="utf-8") as f:
+            lines = f.readlines()
+        lines[0] = json.dumps({"kind": "meta", "meta": cassette.meta}) + "\n"
+        with open(args.record, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        print(f"recorded {len(cassette)} interactions to {args.record}")
+    else:
+        latency = None if args.latency == "recorded" else float(args.latency)
+        cassette = Cassette(args.cassette, latency=latency, scale=args.scale)
+        report = run_stages(cassette)
+
+    peaks = peak_memory(args.record or args.cassette)
+    for name, (seconds, steps, summary) in report.items():
+        print(f"\n{name:<13} {seconds:7.2f}s  peak {peaks[name] / 2**20:6.1f} MiB  ({summary})")
+        for step, step_seconds in steps.items():
+            print(f"  {step:<28} {step_seconds:7.2f}s")
+    counts = ", ".join(f"{key} {value}" for key, value in sorted(cassette.stats.items()))
+    print(f"\ncassette: {counts}")
+
+
+if __name__ == "__main__":
+    main()
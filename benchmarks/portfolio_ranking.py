@@ -0,0 +1,82 @@
+"""Re-weighting and ranking a portfolio of analyzed startups.
+
+Random category scores for --startups startups are loaded into a Portfolio.
+Ranking under a new weight vector is compared with rescoring every report
+dict with StartupAnalysisOrchestrator._calculate_overall_score, which is what
+re-weighting cost before the portfolio existed.
+
+    python benchmarks/portfolio_ranking.py --startups 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+import stubs  # noqa: F401  (puts ai_agents/ on sys.path)
+from orchestrator import StartupAnalysisOrchestrator
+from portfolio import CATEGORIES, Portfolio
+
+NEW_WEIGHTS = {"market": 0.4, "financial": 0.3, "competition": 0.2, "risk": 0.1}
+
+
+def timed_ms(fn, *args, repeat=5, **kwargs):
+    """Best of `repeat` runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--startups", type=int, default=100000)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    names = [f"startup-{i}" for i in range(args.startups)]
+    scores = rng.random((args.startups, len(CATEGORIES))).round(2)
+
+    portfolio = Portfolio()
+    _, load_ms = timed_ms(portfolio.upsert_many, names, scores, repeat=1)
+    print(f"load {args.startups} startups:          {load_ms:8.2f} ms")
+
+    top, rank_ms = timed_ms(portfolio.top_k, args.k, NEW_WEIGHTS)
+    print(f"top-{args.k} under new weights:         {rank_ms:8.2f} ms")
+    _, reweight_ms = timed_ms(portfolio.set_weights, NEW_WEIGHTS)
+    print(f"set_weights (rescore all):       {reweight_ms:8.2f} ms")
+    _, cached_ms = timed_ms(portfolio.top_k, args.k)
+    print(f"top-{args.k} under current weights:     {cached_ms:8.2f} ms")
+    _, pct_ms = timed_ms(portfolio.percentile_rank, names[0])
+    print(f"percentile rank of one startup:  {pct_ms:8.2f} ms")
+    _, p90_ms = timed_ms(portfolio.score_at_percentile, 90)
+    print(f"90th percentile score:           {p90_ms:8.2f} ms")
+
+    def reanalyze():
+        for i in range(1000):
+            portfolio.upsert(names[i], {"market": 0.9, "risk": 0.1})
+    _, update_ms = timed_ms(reanalyze, repeat=1)
+    print(f"1000 incremental re-analyses:    {update_ms:8.2f} ms")
+
+    # The old way: rescore every report with the orchestrator's weights loop
+    orchestrator = StartupAnalysisOrchestrator()
+    reports = [
+        [{"category": category, "score": score} for category, score in zip(CATEGORIES, row)]
+        for row in scores.tolist()
+    ]
+    def rescore_reports():
+        overall = [orchestrator._calculate_overall_score(results) for results in reports]
+        return sorted(zip(overall, names), reverse=True)[:args.k]
+    _, old_ms = timed_ms(rescore_reports, repeat=1)
+    print(f"rescore + sort report dicts:     {old_ms:8.2f} ms  "
+          f"({old_ms / rank_ms:.0f}x slower than top_k with new weights)")
+
+    expected = sorted(zip((scores @ np.array([NEW_WEIGHTS[c] for c in CATEGORIES])).tolist(),
+                          range(args.startups)), key=lambda pair: (-pair[0], pair[1]))[:args.k]
+    assert [name for name, _ in top] == [names[row] for _, row in expected]
+
+
+if __name__ == "__main__":
+    main()
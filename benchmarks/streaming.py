@@ -0,0 +1,74 @@
+"""Time-to-first-section for streamed analyses versus waiting for run_analysis.
+
+Each task gets a different stubbed latency, so the first section should arrive
+after the fastest task while run_analysis only returns after the slowest.
+
+    python benchmarks/streaming.py --latency market=2 team=0.5 swot=1
+"""
+import argparse
+import json
+import socket
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from stubs import SAMPLE_IDEA, StubLLM, timed
+import api
+
+
+def parse_latencies(pairs):
+    return {kind: float(seconds) for kind, seconds in (pair.split("=") for pair in pairs)}
+
+
+def serve_in_background():
+    """Start the API on a free local port and return its base URL
+
+    httpx's in-process ASGI transport buffers whole responses, so streaming has
+    to be measured against a real server.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(api.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def stream_timings(base_url):
+    """Return (section, seconds since request) for each streamed NDJSON line"""
+    timings = []
+    start = time.perf_counter()
+    with httpx.stream("POST", f"{base_url}/api/analyze/stream", json={"idea": SAMPLE_IDEA}, timeout=None) as response:
+        for line in response.iter_lines():
+            if line:
+                timings.append((json.loads(line).get("section"), time.perf_counter() - start))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", nargs="+", default=["market=2", "team=0.5", "swot=1"],
+                        help="Per-task stub latency as kind=seconds")
+    args = parser.parse_args()
+
+    workflow = api.workflow
+    workflow.llm = StubLLM(model="stub", task_latency=parse_latencies(args.latency))
+    workflow.search_tool = None
+    workflow.cache = workflow.task_cache = None
+
+    _, blocking = timed(workflow.run_analysis, SAMPLE_IDEA)
+    print(f"run_analysis (blocking): {blocking:6.2f}s until anything is shown")
+
+    start = time.perf_counter()
+    for section, _ in workflow.iter_analysis(SAMPLE_IDEA):
+        print(f"iter_analysis: {section:<15} after {time.perf_counter() - start:6.2f}s")
+
+    for section, elapsed in stream_timings(serve_in_background()):
+        print(f"/api/analyze/stream: {section:<15} after {elapsed:6.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Rerender time of the Streamlit results view for a large finished analysis.
+
+A job with --roles team roles and --competitors competitors is completed in a
+scratch job database, then backend/app.py is driven through Streamlit's
+AppTest with ?job=<id>, as a browser following that job would. Timed:
+
+- first render: the job is fetched from the queue and stored in the session
+- refetch rerun: a rerun with the session cleared, what every widget change
+  used to cost
+- session rerun: a full rerun drawing the results kept in the session
+- filter change: changing the team priority filter. AppTest reruns the whole
+  script for it, so this also times the team fragment on its own, which is
+  all a browser session reruns
+
+    python benchmarks/streamlit_rerender.py --roles 200 --competitors 100
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="rerender-")
+os.environ["JOB_DB"] = os.path.join(DB_DIR, "jobs.db")
+os.environ["JOB_WORKERS"] = "0"
+os.environ.setdefault("VERBOSE", "false")
+
+import stubs  # noqa: F401  (puts backend/ on sys.path)
+from streamlit.testing.v1 import AppTest
+from jobs import JobQueue
+
+APP = os.path.join(stubs.ROOT, "backend", "app.py")
+PRIORITIES = ["High", "Medium", "Low"]
+FRAGMENT = """
+import streamlit as st
+import app
+app.render_team_resources(st.session_state["team"])
+"""
+
+
+def large_result(roles, competitors):
+    return {
+        "marketResearch": {
+            "marketSize": {"value": "$20B", "year": 2024, "cagr": "12%"},
+            "competitors": [{"name": f"Competitor {i}", "description": "A regional meal kit service " * 4,
+                             "strengths": ["Scale", "Brand", "Logistics"]} for i in range(competitors)],
+            "trends": [f"Trend {i}" for i in range(20)],
+            "sources": [f"https://example.com/report/{i}" for i in range(10)]
+        },
+        "teamResources": [{"role": f"Role {i}", "description": "Owns a slice of the product " * 4,
+                           "keySkills": ["Python", "Growth", "Operations"], "estimatedSalary": "$120k",
+                           "priority": PRIORITIES[i % 3]} for i in range(roles)],
+        "swotAnalysis": {key: [f"{key} {i}" for i in range(15)]
+                         for key in ("strengths", "weaknesses", "opportunities", "threats")}
+    }
+
+
+def timed(run):
+    start = time.perf_counter()
+    app = run()
+    assert not app.exception, app.exception
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--roles", type=int, default=200)
+    parser.add_argument("--competitors", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    queue = JobQueue(os.environ["JOB_DB"])
+    queue.submit("Large analysis for the rerender benchmark", dedupe=False)
+    job = queue.claim("bench")
+    queue.complete(job["id"], "bench", large_result(args.roles, args.competitors))
+
+    app = AppTest.from_file(APP, default_timeout=120)
+    app.query_params["job"] = job["id"]
+    # The first run also imports the app and its dependencies
+    timings = {"first render": [timed(app.run)]}
+    filters = [PRIORITIES[:1], PRIORITIES[:2], PRIORITIES]
+    for i in range(args.repeat):
+        del app.session_state["analysis"]
+        timings.setdefault("refetch rerun", []).append(timed(app.run))
+        timings.setdefault("session rerun", []).append(timed(app.run))
+        priority = app.multiselect(key="team_priority_filter")
+        timings.setdefault("filter change", []).append(timed(priority.set_value(filters[i % 3]).run))
+
+    # What a filter change costs in a browser: the team fragment alone
+    fragment = AppTest.from_string(FRAGMENT, default_timeout=120)
+    fragment.session_state["team"] = large_result(args.roles, 0)["teamResources"]
+    fragment.run()
+    for i in range(args.repeat):
+        priority = fragment.multiselect(key="team_priority_filter")
+        timings.setdefault("team fragment", []).append(timed(priority.set_value(filters[i % 3]).run))
+
+    print(f"{args.roles} team roles, {args.competitors} competitors, median of {args.repeat} runs\n")
+    print(f"{'':<14} {'ms':>7}")
+    for name, values in timings.items():
+        print(f"{name:<14} {statistics.median(values) * 1000:>7.0f}")
+    full, fragment = statistics.median(timings["session rerun"]), statistics.median(timings["team fragment"])
+    print(f"\nfilter change in the browser: {fragment * 1000:.0f} ms instead of {full * 1000:.0f} ms "
+          f"({1 - fragment / full:.0%} less)")
+
+
+if __name__ == "__main__":
+    main()
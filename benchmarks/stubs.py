@@ -0,0 +1,191 @@
+"""Shared helpers for the offline benchmarks.
+
+The benchmarks never talk to Gemini or Serper. They swap the workflow's LLM
+for StubLLM, which sleeps for a fixed latency and returns canned JSON shaped
+like the expected_output of each task, and the ai_agents analyzers' agents
+for StubAgent.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for package_dir in ("backend", "ai_agents"):
+    path = os.path.join(ROOT, package_dir)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Keep crewai quiet and offline while benchmarking
+os.environ.setdefault("GEMINI_API_KEY", "stub")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+# Analyses benchmarks run are not worth keeping
+os.environ.setdefault("HISTORY_DB", ":memory:")
+os.environ.setdefault("LLM_QUOTA_DB", ":memory:")
+os.environ.setdefault("KNOWLEDGE_DB", ":memory:")
+
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM, llm_call_context
+
+SAMPLE_IDEA = (
+    "A subscription-based platform that delivers personalized healthy meal kits "
+    "to busy professionals, with AI-driven nutritional planning and zero-waste packaging"
+)
+
+CANNED_RESPONSES = {
+    "market": {
+        "marketSize": {"value": "$20B", "year": 2024, "cagr": "12%"},
+        "competitors": [
+            {"name": "HelloFresh", "description": "Meal kit leader", "strengths": ["Scale"]}
+        ],
+        "trends": ["Health-conscious eating"],
+        "sources": ["https://example.com/report"]
+    },
+    "team": [
+        {
+            "role": "CTO",
+            "description": "Owns the platform",
+            "keySkills": ["Python", "ML"],
+            "estimatedSalary": "$150k-$200k",
+            "priority": "High"
+        }
+    ],
+    "swot": {
+        "strengths": ["Personalisation"],
+        "weaknesses": ["Logistics cost"],
+        "opportunities": ["Corporate wellness"],
+        "threats": ["Incumbents"]
+    }
+}
+
+
+# Task kind answering each result section
+SECTION_KINDS = {"marketResearch": "market", "teamResources": "team", "swotAnalysis": "swot"}
+
+
+def task_kind(prompt):
+    """Tell which workflow task a prompt belongs to: market, team, swot or basic
+
+    Correction prompts only quote the expected format, so for those the
+    schema's own field names decide. Basic prompts ask for several sections
+    by key at once.
+    """
+    if "with these keys:" in prompt:
+        return "basic"
+    if "Expected format:" in prompt:
+        expected = prompt.split("Expected format:", 1)[1].split("Previous answer:", 1)[0]
+        if "opportunities" in expected:
+            return "swot"
+        return "team" if "keySkills" in expected else "market"
+    if "SWOT" in prompt:
+        return "swot"
+    if "team members" in prompt:
+        return "team"
+    return "market"
+
+
+def canned_response(prompt):
+    """Pick the canned JSON that matches the task described in the prompt"""
+    kind = task_kind(prompt)
+    if kind == "basic":
+        return {section: CANNED_RESPONSES[kind] for section, kind in SECTION_KINDS.items()
+                if f'"{section}"' in prompt}
+    return CANNED_RESPONSES[kind]
+
+
+class StubLLM(BaseLLM):
+    """LLM stand-in that waits `latency` seconds and returns canned JSON
+
+    task_latency overrides the latency per task kind, e.g. {"swot": 0.5}.
+    prompt_token_latency adds seconds per prompt token, for prompt-size effects.
+    """
+
+    latency: float = 1.0
+    task_latency: dict = {}
+    prompt_token_latency: float = 0.0
+
+    def call(self, messages, *args, from_task=None, from_agent=None, **kwargs):
+        if isinstance(messages, str):
+            prompt = messages
+        else:
+            prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        with llm_call_context():
+            # Emit the same events as a real provider so tracing sees the call
+            self._emit_call_started_event(messages=messages, from_task=from_task, from_agent=from_agent)
+            response = self.respond(prompt)
+            # Rough 4-characters-per-token estimate so cost reports are non-zero
+            prompt_tokens, completion_tokens = len(prompt) // 4, len(response) // 4
+            time.sleep(self.task_latency.get(task_kind(prompt), self.latency)
+                       + prompt_tokens * self.prompt_token_latency)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+            self._track_token_usage_internal(usage)
+            self._emit_call_completed_event(response=response, call_type=LLMCallType.LLM_CALL,
+                                            from_task=from_task, from_agent=from_agent, usage=usage)
+        return response
+
+    def respond(self, prompt):
+        """The model's reply to prompt: the canned JSON as a final answer"""
+        return f"Thought: I now know the final answer\nFinal Answer: {json.dumps(canned_response(prompt))}"
+
+
+class StubAgent:
+    """Stand-in for an ai_agents analyzer's agent
+
+    kickoff_async() waits `latency` seconds and answers with a score, or
+    raises when `fail` is set. Calls, and the search and scrape steps among
+    them, are counted across every instance; reset() zeroes the counts.
+    """
+
+    calls = 0
+    tool_steps = 0
+
+    def __init__(self, latency, fail=False):
+        self.latency = latency
+        self.fail = fail
+
+    @classmethod
+    def reset(cls):
+        cls.calls = cls.tool_steps = 0
+
+    async def kickoff_async(self, prompt):
+        StubAgent.calls += 1
+        if prompt.startswith(("Search", "Scrape")):
+            StubAgent.tool_steps += 1
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("provider unavailable")
+        return SimpleNamespace(raw=f"Stubbed answer for: {prompt.splitlines()[0]}\nScore: 0.7")
+
+
+def stub_agents(orchestrator, latency, fail=False):
+    """Give every analyzer of a StartupAnalysisOrchestrator StubAgents"""
+    for analyzer in (orchestrator.market_analyzer, orchestrator.financial_analyzer,
+                     orchestrator.competitor_analyzer, orchestrator.risk_assessor):
+        analyzer.create_agent = lambda: StubAgent(latency, fail)
+
+
+def timed(fn, *args, **kwargs):
+    """Return (result, elapsed seconds) for a single call"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def stub_workflow():
+    """Uncached workflow on StubLLM, e.g. for job workers (JOB_WORKFLOW=stubs:stub_workflow)
+
+    STUB_LATENCY sets the seconds each LLM call takes.
+    """
+    from Agents import StartupResearchWorkflow
+
+    workflow = StartupResearchWorkflow(cache=None, task_cache=None)
+    workflow.llm = StubLLM(model="stub", latency=float(os.getenv("STUB_LATENCY", "1.0")))
+    workflow.search_tool = None
+    return workflow
@@ -0,0 +1,139 @@
+"""Exercise the shared ToolRegistry against a local stub HTTP server.
+
+The stub serves SerperDev-style /search and Firecrawl-style /scrape endpoints,
+plus HEAD with an ETag for scraped pages, and records how many TCP connections
+were opened and how many requests were in flight at once.
+
+1. Uncached: many concurrent callers should reuse a handful of pooled
+   connections and never exceed the registry's concurrency limit.
+2. Cached: the same workload with only --distinct different queries and
+   URLs, run twice, should reach the provider once per distinct request.
+   Stale pages are then revalidated with a conditional HEAD instead of
+   being scraped again.
+
+    python benchmarks/tool_registry.py --requests 200 --callers 16 --max-concurrency 4
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import stubs  # noqa: F401  (puts ai_agents/ on sys.path)
+from tool_cache import ToolCache
+from tools import ToolRegistry
+
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    latency = 0.02
+    stats = {"connections": 0, "requests": 0, "in_flight": 0, "max_in_flight": 0, "head": 0, "not_modified": 0}
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with self.lock:
+            self.stats["connections"] += 1
+
+    def do_HEAD(self):
+        with self.lock:
+            self.stats["head"] += 1
+        if self.headers.get("If-None-Match") == '"v1"':
+            with self.lock:
+                self.stats["not_modified"] += 1
+            self.send_response(304)
+        else:
+            self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["in_flight"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+        time.sleep(self.latency)
+        if self.path == "/search":
+            body = {"organic": [{"title": f"Result for {payload['q']}", "link": "https://example.com"}]}
+        else:
+            body = {"success": True, "data": {"markdown": f"# {payload['url']}"}}
+        data = json.dumps(body).encode()
+        with self.lock:
+            self.stats["in_flight"] -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--callers", type=int, default=16, help="Concurrent calling threads")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Registry in-flight limit")
+    parser.add_argument("--rpm", type=float, default=60000, help="Per-provider requests per minute")
+    parser.add_argument("--distinct", type=int, default=20, help="Distinct requests in the cached run")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubProviderHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def make_registry(cache=None):
+        return ToolRegistry(
+            serper_api_key="stub", firecrawl_api_key="stub",
+            max_concurrency=args.max_concurrency,
+            rate_limits={"serper": args.rpm, "firecrawl": args.rpm},
+            serper_url=f"{base}/search", firecrawl_url=f"{base}/scrape",
+            cache=cache
+        )
+
+    def run(registry, distinct):
+        def call(i):
+            n = i % distinct
+            if i % 2:
+                # Scraped URLs point back at the stub so HEAD revalidation reaches it
+                return registry.scrape(f"{base}/page/{n}")
+            return registry.search(f"query {n}")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.callers) as executor:
+            results = list(executor.map(call, range(args.requests)))
+        assert len(results) == args.requests
+        return time.perf_counter() - start
+
+    stats = StubProviderHandler.stats
+    elapsed = run(make_registry(), args.requests)
+    assert stats["max_in_flight"] <= args.max_concurrency, "concurrency limit exceeded"
+    print("uncached")
+    print(f"  requests:        {stats['requests']} in {elapsed:.2f}s ({stats['requests'] / elapsed:.0f}/s)")
+    print(f"  TCP connections: {stats['connections']} (pool limit {args.max_concurrency} per provider)")
+    print(f"  max in flight:   {stats['max_in_flight']} (limit {args.max_concurrency})")
+
+    cache = ToolCache(ttls={"search": 3600, "scrape": 3600})
+    registry = make_registry(cache)
+    before = stats["requests"]
+    elapsed = run(registry, args.distinct) + run(registry, args.distinct)
+    print(f"cached, {args.distinct} distinct requests, workload run twice")
+    print(f"  calls:           {2 * args.requests} in {elapsed:.2f}s")
+    print(f"  provider hits:   {stats['requests'] - before}")
+    print(f"  cache stats:     {cache.stats} hit rate {cache.hit_rate():.1%}")
+
+    # Expire everything; pages come back through 304 revalidation, searches are refetched
+    cache._db.execute("UPDATE tool_cache SET expires_at = 0")
+    before = stats["requests"]
+    run(registry, args.distinct)
+    print("after expiry")
+    print(f"  provider hits:   {stats['requests'] - before} (searches only)")
+    print(f"  304 responses:   {stats['not_modified']}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Trace one analysis and show where the time goes.
+
+StubLLM gives each task its own latency, so the slowest section should stand
+out as the hot path. The run is written to a JSON trace file, spans are
+summarized per kind and name, and the Prometheus output is sampled. The cost
+of a span itself is measured last. The trace goes to the temp directory unless
+--trace says otherwise.
+
+    python benchmarks/tracing_report.py --trace /tmp/trace.json
+"""
+import argparse
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+os.environ.setdefault("VERBOSE", "false")
+
+from stubs import SAMPLE_IDEA, StubLLM
+from Agents import StartupResearchWorkflow
+from tracing import metrics, tracer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trace", default=os.path.join(tempfile.gettempdir(), "trace.json"), help="Where to write the JSON trace")
+    parser.add_argument("--spans", type=int, default=100000, help="Spans to create when timing overhead")
+    args = parser.parse_args()
+
+    workflow = StartupResearchWorkflow(cache=None, task_cache=None)
+    workflow.llm = StubLLM(model="stub", latency=0.2, task_latency={"market": 0.6, "swot": 0.3})
+    workflow.search_tool = None
+    workflow.run_analysis(SAMPLE_IDEA)
+    # crewai delivers LLM events on its own threads; give them a moment to land
+    time.sleep(0.5)
+
+    count = tracer.export(args.trace)
+    print(f"wrote {count} spans to {args.trace}\n")
+
+    totals = defaultdict(lambda: [0, 0.0, 0, 0])
+    for span in tracer.spans:
+        entry = totals[(span.kind, span.name)]
+        entry[0] += 1
+        entry[1] += span.duration
+        entry[2] += span.attributes.get("promptTokens", 0)
+        entry[3] += span.attributes.get("completionTokens", 0)
+    print(f"{'kind':<10} {'name':<16} {'count':>5} {'seconds':>8} {'tokens in/out':>14}")
+    for (kind, name), (n, seconds, prompt, completion) in sorted(totals.items(), key=lambda item: -item[1][1]):
+        print(f"{kind:<10} {name:<16} {n:>5} {seconds:>8.3f} {prompt:>7}/{completion:<6}")
+
+    print("\n/metrics sample:")
+    for line in metrics.render().splitlines():
+        if line.startswith(("startup_span_duration_seconds_sum", "startup_llm_tokens_total")):
+            print("  " + line)
+
+    tracer.spans.clear()
+    start = time.perf_counter()
+    for _ in range(args.spans):
+        with tracer.span("overhead", "benchmark"):
+            pass
+    per_span = (time.perf_counter() - start) / args.spans
+    print(f"\nspan overhead: {per_span * 1e6:.1f} us per span")
+
+
+if __name__ == "__main__":
+    main()
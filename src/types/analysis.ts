@@ -13,6 +13,11 @@ export interface MarketResearch {
     cagr: string;
   };
   sources: string[];
+  // Set when the research was reused from a near-identical earlier idea
+  reusedFrom?: {
+    idea: string;
+    similarity: number;
+  };
 }
 
 export interface TeamResource {